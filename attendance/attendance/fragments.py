@@ -0,0 +1,65 @@
+import time
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+# Version counters for cached template fragments. A fragment is cached
+# under the versions of the data it shows: every employee, one department
+# or one day's attendance. Writes bump the versions they touch, so a stale
+# fragment is never looked up again and simply expires. The counters live
+# in the fragment cache: with a shared backend every process sees a bump at
+# once, while with the default local memory cache other processes catch up
+# within TTL.
+
+DEFAULT_SETTINGS = {
+    'CACHE': 'default',
+    'TTL': 300,  # seconds a fragment is kept
+}
+
+EMPLOYEES_SCOPE = 'employees'
+
+
+def get_fragment_settings():
+    """Merge FRAGMENT_CACHE over the defaults"""
+    options = dict(DEFAULT_SETTINGS)
+    options.update(getattr(settings, 'FRAGMENT_CACHE', {}))
+    return options
+
+def department_scope(department):
+    return f'department:{department}'
+
+def attendance_scope(day):
+    return f'attendance:{day}'
+
+def _key(scope):
+    return f'fragment-version:{scope}'
+
+def get_fragment_versions(*scopes):
+    """Get the current version of each scope, starting the ones not seen yet"""
+    cache = caches[get_fragment_settings()['CACHE']]
+    found = cache.get_many([_key(scope) for scope in scopes])
+    versions = {}
+    for scope in scopes:
+        version = found.get(_key(scope))
+        if version is None:
+            # Start from the clock, so a counter that was evicted never
+            # comes back at a version that still has fragments cached
+            version = time.time_ns() // 1000
+            if not cache.add(_key(scope), version, timeout=None):
+                version = cache.get(_key(scope), version)
+        versions[scope] = version
+    return versions
+
+def bump_fragment_versions(*scopes):
+    """Move each scope to a new version, leaving its cached fragments behind"""
+    cache = caches[get_fragment_settings()['CACHE']]
+    for scope in scopes:
+        try:
+            cache.incr(_key(scope))
+        except ValueError:
+            pass  # Not started, so nothing is cached under it
+
+def bump_fragment_versions_on_commit(*scopes):
+    """Bump now, and again once committed in case a fragment was rendered from the old rows"""
+    bump_fragment_versions(*scopes)
+    transaction.on_commit(lambda: bump_fragment_versions(*scopes))
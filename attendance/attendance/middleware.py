@@ -0,0 +1,100 @@
+import logging
+import time
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connection
+
+logger = logging.getLogger(__name__)
+
+
+class QueryBudgetExceeded(Exception):
+    """Raised when a view runs more queries than its declared budget"""
+
+
+def _add_wrapper(wrapper):
+    """Install an execute wrapper on this thread's connection"""
+    connection.execute_wrappers.append(wrapper)
+
+def _remove_wrapper(wrapper):
+    """Remove an execute wrapper from this thread's connection"""
+    connection.execute_wrappers.remove(wrapper)
+
+
+def query_budget(max_queries):
+    """Decorator to declare the maximum number of queries a view may run.
+
+    Apply it as the outermost decorator so the budget stays visible on the
+    function the URL resolver sees.
+    """
+    def decorator(view_func):
+        view_func.query_budget = max_queries
+        return view_func
+    return decorator
+
+
+class QueryBudgetMiddleware:
+    """Record query count and database time per request and enforce view budgets.
+
+    Over-budget views are logged as warnings, or raise QueryBudgetExceeded
+    when QUERY_BUDGET_RAISE is enabled (as in the test suite).
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        stats = {'count': 0, 'duration': 0.0}
+        with connection.execute_wrapper(self.recorder(stats)):
+            response = self.get_response(request)
+        return self.finish(request, response, stats)
+
+    async def __acall__(self, request):
+        # Connections are per thread and async ORM queries run on the
+        # request's sync thread, so the wrapper is installed there
+        stats = {'count': 0, 'duration': 0.0}
+        record = self.recorder(stats)
+        await sync_to_async(_add_wrapper)(record)
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(_remove_wrapper)(record)
+        return self.finish(request, response, stats)
+
+    def recorder(self, stats):
+        """An execute wrapper adding every query to `stats`"""
+        def record(execute, sql, params, many, context):
+            start = time.perf_counter()
+            try:
+                return execute(sql, params, many, context)
+            finally:
+                stats['count'] += 1
+                stats['duration'] += time.perf_counter() - start
+        return record
+
+    def finish(self, request, response, stats):
+        """Add the timing headers and enforce the view's budget"""
+        response['X-Query-Count'] = str(stats['count'])
+        response['Server-Timing'] = f'db;dur={stats["duration"] * 1000:.1f};desc="{stats["count"]} queries"'
+
+        budget = getattr(request, 'query_budget', None)
+        if budget is not None and stats['count'] > budget:
+            message = (
+                f'{request.method} {request.path} ran {stats["count"]} queries '
+                f'({stats["duration"] * 1000:.1f} ms), budget is {budget}'
+            )
+            if getattr(settings, 'QUERY_BUDGET_RAISE', False):
+                raise QueryBudgetExceeded(message)
+            logger.warning(message)
+
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request.query_budget = getattr(view_func, 'query_budget', None)
@@ -10,7 +10,9 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
+from django.core.exceptions import ImproperlyConfigured
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -43,10 +45,13 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'attendance.staticfiles.StaticAssetMiddleware',
+    'attendance.middleware.QueryBudgetMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'employee.middleware.CurrentEmployeeMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -74,12 +79,61 @@ WSGI_APPLICATION = 'attendance.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+# Select the backend with ATTENDANCE_DB_ENGINE ('sqlite' or 'postgresql').
+
+DATABASE_ENGINE = os.environ.get('ATTENDANCE_DB_ENGINE', 'sqlite')
+
+if DATABASE_ENGINE == 'postgresql':
+    # Requires psycopg with its pool extra: uv pip install "attendance-v2[postgres]"
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.environ.get('POSTGRES_DB', 'attendance'),
+            'USER': os.environ.get('POSTGRES_USER', 'attendance'),
+            'PASSWORD': os.environ.get('POSTGRES_PASSWORD', ''),
+            'HOST': os.environ.get('POSTGRES_HOST', 'localhost'),
+            'PORT': os.environ.get('POSTGRES_PORT', '5432'),
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {},
+        }
     }
-}
+    if os.environ.get('POSTGRES_POOL', '1') == '1':
+        # Connections are borrowed from a per-process psycopg pool for each
+        # request; Django requires CONN_MAX_AGE = 0 when pooling
+        DATABASES['default']['OPTIONS']['pool'] = {
+            'min_size': int(os.environ.get('POSTGRES_POOL_MIN_SIZE', 2)),
+            'max_size': int(os.environ.get('POSTGRES_POOL_MAX_SIZE', 20)),
+            'timeout': 10,
+        }
+    else:
+        # Without a pool, keep each worker's connection open between requests
+        DATABASES['default']['CONN_MAX_AGE'] = int(os.environ.get('POSTGRES_CONN_MAX_AGE', 600))
+elif DATABASE_ENGINE == 'sqlite':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': BASE_DIR / 'db.sqlite3',
+            'CONN_MAX_AGE': 600,
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {
+                # Seconds a writer waits for the lock before "database is locked"
+                'timeout': 20,
+                # Take the write lock when a transaction starts, so concurrent
+                # read-then-write transactions wait on the busy timeout instead
+                # of failing when they try to upgrade their lock
+                'transaction_mode': 'IMMEDIATE',
+                # WAL lets readers run alongside the writer; NORMAL only syncs
+                # at checkpoints, which is still safe against corruption in WAL
+                'init_command': 'PRAGMA journal_mode=WAL; PRAGMA synchronous=NORMAL',
+            },
+        }
+    }
+    if os.environ.get('ATTENDANCE_SQLITE_TUNING', '1') != '1':
+        # Stock SQLite settings, kept for benchmark comparisons
+        DATABASES['default'].pop('CONN_MAX_AGE')
+        DATABASES['default']['OPTIONS'] = {}
+else:
+    raise ImproperlyConfigured(f"ATTENDANCE_DB_ENGINE must be 'sqlite' or 'postgresql', not {DATABASE_ENGINE!r}.")
 
 
 # Password validation
@@ -120,12 +174,107 @@ STATIC_URL = 'static/'
 STATICFILES_DIRS = [
     BASE_DIR / "static",
 ]
+STATIC_ROOT = BASE_DIR / 'staticfiles'
+
+# collectstatic writes content-hashed names and precompressed variants, which
+# StaticAssetMiddleware serves from STATIC_ROOT
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'attendance.staticfiles.CompressedManifestStaticFilesStorage',
+    },
+}
+
+# Static asset serving
+# Content-hashed names are cached by browsers for MAX_AGE seconds without
+# revalidation; original names for UNHASHED_MAX_AGE. Files with one of
+# COMPRESS_EXTENSIONS get gzip and, with the brotli package, brotli variants
+STATIC_ASSETS = {
+    'MAX_AGE': 365 * 24 * 60 * 60,  # seconds
+    'UNHASHED_MAX_AGE': 60,  # seconds
+    'COMPRESS_EXTENSIONS': ['css', 'js', 'json', 'map', 'svg', 'txt', 'xml', 'html'],
+    'GZIP_LEVEL': 9,
+    'BROTLI_QUALITY': 11,
+}
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Query budgets
+# Views over their declared query budget are logged; set to True to raise instead
+QUERY_BUDGET_RAISE = False
+
+# Per-process cache of the logged-in user's Employee profile (request.employee)
+EMPLOYEE_CACHE = {
+    'MAX_SIZE': 1024,
+    'TTL': 30,  # seconds
+}
+
+# Employee list pages, and the per-process cache of their totals by filter set
+EMPLOYEE_LIST = {
+    'PER_PAGE': 10,
+    'COUNT_TTL': 60,  # seconds
+    'COUNT_CACHE_SIZE': 256,
+}
+
+# Employee bulk activate/deactivate
+# Jobs run on a background thread, CHUNK_SIZE employees per transaction;
+# run_bulk_actions resumes jobs interrupted by a restart
+EMPLOYEE_BULK_ACTIONS = {
+    'BACKGROUND': True,
+    'CHUNK_SIZE': 500,
+}
+
+# Write-behind buffer for check-ins
+# When enabled, check-ins are acknowledged once appended to a local spill file
+# and written to the database in batches every FLUSH_INTERVAL_MS or MAX_BATCH events
+ATTENDANCE_CHECK_IN_BUFFER = {
+    'ENABLED': False,
+    'FLUSH_INTERVAL_MS': 200,
+    'MAX_BATCH': 500,
+    'SPILL_DIR': BASE_DIR / 'check_in_spill',
+    'FSYNC': True,
+}
+
+# Live dashboard feed (Server-Sent Events)
+# One poller thread per process reads check-ins written by other processes
+# every POLL_INTERVAL seconds while a dashboard is open; 0 turns polling off
+# for single-process deployments
+ATTENDANCE_LIVE_FEED = {
+    'POLL_INTERVAL': 2.0,
+    'KEEPALIVE': 15,  # seconds
+    'MAX_QUEUE': 1000,
+}
+
+# Shift policies
+# The compiled shift table is rebuilt after a policy changes in this process,
+# and at least every TTL seconds to pick up changes made by other processes
+ATTENDANCE_SHIFT_POLICIES = {
+    'TTL': 300,  # seconds
+}
+
+# Cached dashboard fragments
+# Fragments are keyed by version counters kept in CACHE and bumped on every
+# change; use a shared cache backend so bumps reach every process at once,
+# otherwise other processes serve a fragment for at most TTL seconds
+FRAGMENT_CACHE = {
+    'CACHE': 'default',
+    'TTL': 300,  # seconds
+}
+
+# Async check-in, check-out and live feed views
+# Off by default, also under ASGI. The async views do not hold a worker
+# thread while waiting on the database, so a burst of clients does not queue
+# behind a thread pool, but each write still hops to a thread and check-in
+# throughput drops to about a quarter (~50 req/s against ~190 for the sync
+# views in benchmark_asgi). Turn them on for deployments with many open live
+# dashboards or long database waits; under WSGI they only add overhead
+ATTENDANCE_ASYNC_VIEWS = os.environ.get('ATTENDANCE_ASYNC_VIEWS', '0') == '1'
+
 # Login URLs
 LOGIN_URL = '/login/'
 LOGIN_REDIRECT_URL = '/dashboard/'
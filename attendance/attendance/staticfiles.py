@@ -0,0 +1,248 @@
+import gzip
+import json
+import mimetypes
+import os
+from urllib.parse import urlsplit
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.exceptions import MiddlewareNotUsed, SuspiciousFileOperation
+from django.core.files.base import ContentFile
+from django.http import FileResponse, HttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date
+
+try:
+    import brotli
+except ImportError:  # Optional: pip install attendance-v2[brotli]
+    brotli = None
+
+# Static asset pipeline. collectstatic writes every file under a name
+# carrying a hash of its content (css/base.3f2a1c9d0b7e.css) next to the
+# original, records the mapping in staticfiles.json so {% static %} links the
+# hashed names, and stores gzip and, with the brotli package installed,
+# brotli variants of text files beside them. StaticAssetMiddleware serves
+# STATIC_ROOT itself, picking the best variant the browser accepts. A
+# hashed name never changes content, so it is served with a year-long
+# immutable Cache-Control and repeat page loads fetch no static bytes;
+# original names get a short max-age and revalidate.
+
+DEFAULT_SETTINGS = {
+    'MAX_AGE': 365 * 24 * 60 * 60,  # seconds, for content-hashed names
+    'UNHASHED_MAX_AGE': 60,  # seconds, for original names
+    'COMPRESS_EXTENSIONS': ['css', 'js', 'json', 'map', 'svg', 'txt', 'xml', 'html'],
+    'GZIP_LEVEL': 9,
+    'BROTLI_QUALITY': 11,
+}
+
+# Content-Encoding and file suffix of each variant, best first
+ENCODINGS = [('br', '.br'), ('gzip', '.gz')]
+
+# A variant is only kept if it saves at least this fraction of the file
+MIN_SAVING = 0.05
+
+
+def get_static_settings():
+    """Merge STATIC_ASSETS over the defaults"""
+    options = dict(DEFAULT_SETTINGS)
+    options.update(getattr(settings, 'STATIC_ASSETS', {}))
+    return options
+
+def compress(data, encoding, options):
+    """Compress bytes for a Content-Encoding, or None if it is not available"""
+    if encoding == 'gzip':
+        # A fixed mtime keeps the output identical between collectstatic runs
+        return gzip.compress(data, compresslevel=options['GZIP_LEVEL'], mtime=0)
+    if encoding == 'br' and brotli is not None:
+        return brotli.compress(data, quality=options['BROTLI_QUALITY'])
+    return None
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """Manifest storage that also writes precompressed variants of text files"""
+
+    def stored_name(self, name):
+        # Until collectstatic has written a manifest (development, tests)
+        # files are linked by their original names
+        if not self.hashed_files:
+            return name
+        return super().stored_name(name)
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+        names = set(paths) | set(self.hashed_files.values())
+        self.compress_files(sorted(names))
+
+    def compress_files(self, names):
+        options = get_static_settings()
+        extensions = {f'.{extension.lower()}' for extension in options['COMPRESS_EXTENSIONS']}
+        for name in names:
+            if os.path.splitext(name)[1].lower() not in extensions or not self.exists(name):
+                continue
+            with self.open(name) as original:
+                data = original.read()
+            for encoding, suffix in ENCODINGS:
+                compressed = compress(data, encoding, options)
+                if self.exists(name + suffix):
+                    self.delete(name + suffix)
+                if compressed is not None and len(compressed) <= len(data) * (1 - MIN_SAVING):
+                    self._save(name + suffix, ContentFile(compressed))
+
+
+class StaticAsset:
+    """A file under STATIC_ROOT with its precompressed variants"""
+
+    def __init__(self, path, immutable):
+        self.path = path
+        self.immutable = immutable
+        stat = os.stat(path)
+        self.size = stat.st_size
+        self.last_modified = int(stat.st_mtime)
+        content_type, _ = mimetypes.guess_type(path)
+        self.content_type = content_type or 'application/octet-stream'
+        if self.content_type.startswith('text/') or self.content_type == 'application/javascript':
+            self.content_type += '; charset=utf-8'
+        self.variants = {}
+        for encoding, suffix in ENCODINGS:
+            if os.path.isfile(path + suffix):
+                self.variants[encoding] = (path + suffix, os.path.getsize(path + suffix))
+
+    def etag(self, encoding):
+        # Strong per encoding, since each variant has its own bytes
+        suffix = f'-{encoding}' if encoding else ''
+        return f'"{self.last_modified:x}-{self.size:x}{suffix}"'
+
+
+def accepted_encodings(request):
+    """Content-Encodings the request accepts, with a q value above zero"""
+    accepted = set()
+    for part in request.headers.get('Accept-Encoding', '').split(','):
+        coding, _, params = part.strip().partition(';')
+        q = params.strip()
+        if q.startswith('q='):
+            try:
+                if float(q[2:]) <= 0:
+                    continue
+            except ValueError:
+                continue
+        if coding:
+            accepted.add(coding.strip().lower())
+    return accepted
+
+
+class StaticAssetMiddleware:
+    """Serve STATIC_URL from STATIC_ROOT with precompressed variants and long-lived caching.
+
+    Place it right after SecurityMiddleware so asset requests skip sessions
+    and authentication. Under DEBUG files are looked up on every request, so
+    a fresh collectstatic is picked up without a restart.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        static_url = urlsplit(settings.STATIC_URL or '')
+        # Nothing to serve, or assets come from another host
+        if not settings.STATIC_ROOT or not static_url.path or static_url.netloc:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+        self.root = str(settings.STATIC_ROOT)
+        self.prefix = '/' + static_url.path.lstrip('/')
+        self.autorefresh = settings.DEBUG
+        self.assets = {}
+        self.hashed_names = self.load_hashed_names()
+
+    def load_hashed_names(self):
+        """Content-hashed names listed in the collected manifest"""
+        try:
+            with open(os.path.join(self.root, CompressedManifestStaticFilesStorage.manifest_name)) as manifest:
+                return set(json.load(manifest).get('paths', {}).values())
+        except (OSError, ValueError):
+            return set()
+
+    def find(self, name):
+        """Get the asset served under a name, or None"""
+        if not self.autorefresh and name in self.assets:
+            return self.assets[name]
+        # Variants are only served through the file they compress
+        if not name or name.endswith(tuple(suffix for _, suffix in ENCODINGS)):
+            return None
+        try:
+            path = safe_join(self.root, name)
+        except SuspiciousFileOperation:
+            return None
+        if not os.path.isfile(path):
+            # Misses are not remembered, so unknown names cannot grow the index
+            return None
+        if self.autorefresh:
+            self.hashed_names = self.load_hashed_names()
+        asset = self.assets[name] = StaticAsset(path, name in self.hashed_names)
+        return asset
+
+    def asset_name(self, request):
+        """The name under STATIC_ROOT a request asks for, or None"""
+        if request.method in ('GET', 'HEAD') and request.path_info.startswith(self.prefix):
+            return request.path_info[len(self.prefix):]
+        return None
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        name = self.asset_name(request)
+        asset = self.find(name) if name is not None else None
+        if asset is not None:
+            return self.serve(request, asset)
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        # Only asset requests leave the event loop, for their file access
+        name = self.asset_name(request)
+        if name is not None:
+            response = await sync_to_async(self.serve_name)(request, name)
+            if response is not None:
+                return response
+        return await self.get_response(request)
+
+    def serve_name(self, request, name):
+        """Serve an asset by name, read in one go, or return None if there is none"""
+        asset = self.find(name)
+        # ASGI drains file iterators through a thread anyway, and assets are small
+        return self.serve(request, asset, stream=False) if asset is not None else None
+
+    def serve(self, request, asset, stream=True):
+        accepted = accepted_encodings(request)
+        encoding = next((encoding for encoding, _ in ENCODINGS if encoding in asset.variants and encoding in accepted), None)
+        path, size = asset.variants[encoding] if encoding else (asset.path, asset.size)
+
+        etag = asset.etag(encoding)
+        response = get_conditional_response(request, etag=etag, last_modified=asset.last_modified)
+        if response is None:
+            if request.method == 'HEAD':
+                response = HttpResponse(content_type=asset.content_type)
+            elif not stream:
+                with open(path, 'rb') as asset_file:
+                    response = HttpResponse(asset_file.read(), content_type=asset.content_type)
+            else:
+                response = FileResponse(open(path, 'rb'), content_type=asset.content_type)
+                response.headers.pop('Content-Disposition', None)
+            response['Content-Length'] = str(size)
+            if encoding:
+                response['Content-Encoding'] = encoding
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(asset.last_modified)
+
+        options = get_static_settings()
+        if asset.immutable:
+            response['Cache-Control'] = f"public, max-age={options['MAX_AGE']}, immutable"
+        else:
+            response['Cache-Control'] = f"public, max-age={options['UNHASHED_MAX_AGE']}"
+        if asset.variants:
+            patch_vary_headers(response, ['Accept-Encoding'])
+        return response
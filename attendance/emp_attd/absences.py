@@ -0,0 +1,50 @@
+from django.db import connection, transaction
+from django.utils import timezone
+from datetime import timedelta
+from employee.models import Employee
+from .models import Attendance
+
+# Absent rows for days that are over. Employees who never check in get no
+# attendance row, so each day is filled in with one INSERT ... SELECT that
+# adds an 'absent' row for every active employee hired by then who has no
+# row yet. Existing rows are never touched, so marking a day again only
+# fills the gaps and is safe to repeat.
+
+def get_working_days(start_date, end_date, include_weekends=False):
+    """Get the days of a date range, leaving out Saturdays and Sundays unless asked"""
+    days = []
+    day = start_date
+    while day <= end_date:
+        if include_weekends or day.weekday() < 5:
+            days.append(day)
+        day += timedelta(days=1)
+    return days
+
+def mark_absences(days):
+    """Insert absent rows for active employees without attendance on each day.
+
+    Returns the number of rows inserted per day.
+    """
+    ops = connection.ops
+    quote = ops.quote_name
+    attendance = {field.name: quote(field.column) for field in Attendance._meta.concrete_fields}
+    attendance['table'] = quote(Attendance._meta.db_table)
+    employee = {field.name: quote(field.column) for field in Employee._meta.concrete_fields}
+    employee['table'] = quote(Employee._meta.db_table)
+    sql = (
+        f'INSERT INTO {attendance["table"]} '
+        f'({attendance["employee"]}, {attendance["date"]}, {attendance["status"]}, '
+        f'{attendance["is_late"]}, {attendance["created_at"]}, {attendance["updated_at"]}) '
+        f'SELECT e.{employee["id"]}, %s, %s, %s, %s, %s FROM {employee["table"]} e '
+        f'WHERE e.{employee["is_active"]} = %s AND e.{employee["hire_date"]} <= %s '
+        f'AND NOT EXISTS (SELECT 1 FROM {attendance["table"]} a '
+        f'WHERE a.{attendance["employee"]} = e.{employee["id"]} AND a.{attendance["date"]} = %s)'
+    )
+    now = ops.adapt_datetimefield_value(timezone.now())
+    inserted = {}
+    with transaction.atomic(), connection.cursor() as cursor:
+        for day in days:
+            value = ops.adapt_datefield_value(day)
+            cursor.execute(sql, [value, 'absent', False, now, now, True, value, value])
+            inserted[day] = cursor.rowcount
+    return inserted
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Attendance
+from .models import ArchivedAttendance, Attendance, DailyAttendanceSummary, MonthlyTimesheet, ShiftPolicy
 
 # Register your models here.
 
@@ -10,3 +10,34 @@ class AttendanceAdmin(admin.ModelAdmin):
     search_fields = ['employee__user__first_name', 'employee__user__last_name', 'employee__employee_id']
     date_hierarchy = 'date'
     ordering = ['-date', '-check_in_time']
+    list_select_related = ['employee__user']
+
+@admin.register(DailyAttendanceSummary)
+class DailyAttendanceSummaryAdmin(admin.ModelAdmin):
+    list_display = ['date', 'department', 'present_count', 'late_count', 'checked_out_count', 'updated_at']
+    list_filter = ['department', 'date']
+    date_hierarchy = 'date'
+    ordering = ['-date', 'department']
+
+@admin.register(MonthlyTimesheet)
+class MonthlyTimesheetAdmin(admin.ModelAdmin):
+    list_display = ['month', 'employee', 'days_present', 'late_days', 'absent_days', 'worked_seconds', 'updated_at']
+    list_filter = ['month', 'employee__department']
+    search_fields = ['employee__user__first_name', 'employee__user__last_name', 'employee__employee_id']
+    ordering = ['-month', 'employee']
+    list_select_related = ['employee__user']
+
+@admin.register(ShiftPolicy)
+class ShiftPolicyAdmin(admin.ModelAdmin):
+    list_display = ['name', 'department', 'employee', 'weekday', 'check_in_start', 'check_in_end', 'late_after', 'check_out_after', 'minimum_hours', 'is_active']
+    list_filter = ['is_active', 'department', 'weekday']
+    search_fields = ['name', 'employee__employee_id']
+    raw_id_fields = ['employee']
+    list_select_related = ['employee__user']
+
+@admin.register(ArchivedAttendance)
+class ArchivedAttendanceAdmin(admin.ModelAdmin):
+    list_display = ['date', 'chunk', 'row_count', 'archived_at']
+    date_hierarchy = 'date'
+    ordering = ['-date', 'chunk']
+    exclude = ['entries']
@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class EmpAttdConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'emp_attd'
+
+    def ready(self):
+        # Connect the shift table invalidation signals
+        from . import shifts  # noqa: F401
+        # Connect the dashboard fragment invalidation signals
+        from . import fragments  # noqa: F401
@@ -0,0 +1,139 @@
+from datetime import datetime, time
+from django.db import transaction
+from employee.models import Employee
+from .models import ArchivedAttendance, Attendance
+
+# Cold storage for old attendance. archive_attendance moves each day before
+# the retention horizon out of the hot Attendance table into a few
+# ArchivedAttendance rows holding that day's rows packed as JSON, so the hot
+# table and its indexes only cover recent days. Nothing is summarized away:
+# timesheet rollups, daily summary rebuilds and exports read archived days
+# alongside the hot rows. Archiving a day again merges any rows written to
+# the hot table since, with the hot row winning.
+
+# Packed rows per ArchivedAttendance row
+ARCHIVE_CHUNK_SIZE = 5000
+
+_ENTRY_FIELDS = ['employee_id', 'check_in_time', 'check_out_time', 'status', 'is_late', 'notes']
+
+def _time_value(value):
+    return value.isoformat() if value is not None else None
+
+def _parse_time(value):
+    return time.fromisoformat(value) if value is not None else None
+
+def _unpack(entry):
+    """(employee pk, check-in, check-out, status, is late, notes) of a packed row"""
+    employee_pk, check_in_time, check_out_time, status, is_late, notes = entry
+    return employee_pk, _parse_time(check_in_time), _parse_time(check_out_time), status, bool(is_late), notes
+
+def archive_day(day):
+    """Move a day's attendance rows into the archive; returns the number of rows moved"""
+    with transaction.atomic():
+        hot = Attendance.objects.filter(date=day)
+        entries = {}
+        for chunk in ArchivedAttendance.objects.filter(date=day).order_by('chunk').values_list('entries', flat=True):
+            entries.update((entry[0], entry) for entry in chunk)
+        moved = 0
+        for employee_pk, check_in_time, check_out_time, status, is_late, notes in hot.order_by().values_list(*_ENTRY_FIELDS):
+            entries[employee_pk] = [employee_pk, _time_value(check_in_time), _time_value(check_out_time), status, int(is_late), notes]
+            moved += 1
+        if not moved:
+            return 0
+
+        packed = [entries[employee_pk] for employee_pk in sorted(entries)]
+        ArchivedAttendance.objects.filter(date=day).delete()
+        ArchivedAttendance.objects.bulk_create([
+            ArchivedAttendance(
+                date=day,
+                chunk=index,
+                entries=packed[start:start + ARCHIVE_CHUNK_SIZE],
+                row_count=len(packed[start:start + ARCHIVE_CHUNK_SIZE]),
+            )
+            for index, start in enumerate(range(0, len(packed), ARCHIVE_CHUNK_SIZE))
+        ])
+        hot.delete()
+    return moved
+
+def get_hot_days(before):
+    """Get the days before a date that still have rows in the hot table"""
+    return list(
+        Attendance.objects.filter(date__lt=before)
+        .order_by('date').values_list('date', flat=True).distinct()
+    )
+
+def get_archived_days(start_date, end_date):
+    """Get the days of a date range that have archived rows"""
+    return set(
+        ArchivedAttendance.objects.filter(date__range=(start_date, end_date))
+        .order_by().values_list('date', flat=True).distinct()
+    )
+
+def iter_archived_days(start_date, end_date):
+    """Iterate (day, rows) for the archived days of a date range, in date order.
+
+    Each day's rows are unpacked tuples ordered by employee pk. Chunks are
+    read one at a time, so only one day is held in memory.
+    """
+    chunks = (
+        ArchivedAttendance.objects.filter(date__range=(start_date, end_date))
+        .order_by('date', 'chunk').values_list('date', 'entries')
+        .iterator(chunk_size=1)
+    )
+    day, rows = None, []
+    for chunk_day, entries in chunks:
+        if chunk_day != day:
+            if rows:
+                yield day, rows
+            day, rows = chunk_day, []
+        rows.extend(_unpack(entry) for entry in entries)
+    if rows:
+        yield day, rows
+
+def get_employee_departments():
+    """Get every employee's current department by pk"""
+    return dict(Employee.objects.order_by().values_list('pk', 'department'))
+
+def get_archived_summary_rows(start_date, end_date):
+    """Get daily summary counts of archived days, in get_daily_summary_rows form"""
+    departments = None
+    counts = {}
+    for day, rows in iter_archived_days(start_date, end_date):
+        if departments is None:
+            departments = get_employee_departments()
+        for employee_pk, check_in_time, check_out_time, status, is_late, _ in rows:
+            department = departments.get(employee_pk)
+            if department is None:
+                continue  # The employee has been deleted
+            row = counts.setdefault((day, department), {
+                'date': day,
+                'employee__department': department,
+                'present_count': 0,
+                'late_count': 0,
+                'checked_out_count': 0,
+            })
+            row['present_count'] += status in ('present', 'late')
+            row['late_count'] += is_late
+            row['checked_out_count'] += check_out_time is not None
+    return list(counts.values())
+
+def get_archived_timesheet_rows(start_date, end_date):
+    """Get per-employee timesheet totals of archived days, in _timesheet_rows form"""
+    totals = {}
+    for day, rows in iter_archived_days(start_date, end_date):
+        for employee_pk, check_in_time, check_out_time, status, is_late, _ in rows:
+            row = totals.setdefault(employee_pk, {
+                'employee_id': employee_pk,
+                'days_present': 0,
+                'late_days': 0,
+                'absent_days': 0,
+                'worked_seconds': 0.0,
+            })
+            row['days_present'] += status in ('present', 'late')
+            row['late_days'] += is_late
+            row['absent_days'] += status == 'absent'
+            if check_in_time is not None and check_out_time is not None:
+                row['worked_seconds'] += (
+                    datetime.combine(day, check_out_time) - datetime.combine(day, check_in_time)
+                ).total_seconds()
+    return list(totals.values())
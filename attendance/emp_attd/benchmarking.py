@@ -0,0 +1,209 @@
+import datetime
+import math
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+from django.db import connection, connections, transaction
+from django.db.models import Count
+from django.test.utils import setup_databases, teardown_databases
+from django.utils import timezone
+from employee.models import Employee
+from .models import Attendance
+from .summary import get_daily_summary_rows
+
+# Shared helpers for the benchmark management commands. Benchmarks always
+# run against a throwaway copy of the database so they never touch real
+# attendance data.
+
+@contextmanager
+def benchmark_database(alias='default'):
+    """Create a throwaway test database for `alias` and remove it afterwards.
+
+    SQLite test databases default to a shared in-memory database, which
+    serializes differently from a real file, so a temporary file is used
+    instead to keep concurrency results meaningful.
+    """
+    test_settings = connections[alias].settings_dict.setdefault('TEST', {})
+    original_name = test_settings.get('NAME')
+    temp_dir = None
+    if connections[alias].vendor == 'sqlite':
+        temp_dir = tempfile.mkdtemp(prefix='attendance-bench-')
+        test_settings['NAME'] = os.path.join(temp_dir, 'benchmark.sqlite3')
+
+    old_config = setup_databases(verbosity=0, interactive=False, aliases={alias})
+    try:
+        yield connections[alias]
+    finally:
+        connections.close_all()
+        teardown_databases(old_config, verbosity=0)
+        test_settings['NAME'] = original_name
+        if temp_dir:
+            for name in os.listdir(temp_dir):
+                os.remove(os.path.join(temp_dir, name))
+            os.rmdir(temp_dir)
+
+# Rows per INSERT statement while seeding attendance history
+SEED_BATCH_SIZE = 100
+
+def seed_attendance_history(employee_pks, start_day, days, limit=None):
+    """Insert attendance rows for every employee on `days` consecutive days.
+
+    One row in ten is absent and one in ten is late; the rest are on time.
+    Stops after `limit` rows when given. Uses raw multi-row INSERTs, since
+    building a million model instances would take far longer. Returns the
+    last seeded day.
+    """
+    ops = connection.ops
+    quote = ops.quote_name
+    now = ops.adapt_datetimefield_value(timezone.now())
+    on_time = ops.adapt_timefield_value(datetime.time(8, 30))
+    late = ops.adapt_timefield_value(datetime.time(9, 30))
+    check_out = ops.adapt_timefield_value(datetime.time(17, 30))
+    columns = ['employee_id', 'date', 'check_in_time', 'check_out_time', 'status', 'is_late', 'created_at', 'updated_at']
+
+    def rows():
+        produced = 0
+        for offset in range(days):
+            day = ops.adapt_datefield_value(start_day + timedelta(days=offset))
+            for position, employee_pk in enumerate(employee_pks):
+                if produced == limit:
+                    return
+                kind = (position + offset) % 10
+                if kind == 0:
+                    yield (employee_pk, day, None, None, 'absent', False, now, now)
+                elif kind == 1:
+                    yield (employee_pk, day, late, check_out, 'late', True, now, now)
+                else:
+                    yield (employee_pk, day, on_time, check_out, 'present', False, now, now)
+                produced += 1
+
+    insert = 'INSERT INTO {} ({}) VALUES '.format(
+        quote(Attendance._meta.db_table), ', '.join(quote(column) for column in columns)
+    )
+    placeholder = '(' + ', '.join(['%s'] * len(columns)) + ')'
+    with transaction.atomic(), connection.cursor() as cursor:
+        batch = []
+        for row in rows():
+            batch.append(row)
+            if len(batch) == SEED_BATCH_SIZE:
+                cursor.execute(insert + ', '.join([placeholder] * len(batch)), [value for item in batch for value in item])
+                batch = []
+        if batch:
+            cursor.execute(insert + ', '.join([placeholder] * len(batch)), [value for item in batch for value in item])
+
+    return start_day + timedelta(days=days - 1)
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a list of numbers"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, math.ceil(pct / 100 * len(ordered)) - 1)
+    return ordered[index]
+
+def run_concurrently(tasks, concurrency, func):
+    """Run func(task) for every task on `concurrency` threads.
+
+    Tasks are dealt out round-robin so neighbouring tasks (such as duplicate
+    submissions) run on different threads at the same time. Returns a dict
+    with the elapsed wall time, per-call latencies in seconds and the
+    number of calls that raised.
+    """
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+
+    def worker(chunk):
+        local_latencies = []
+        local_errors = 0
+        try:
+            for task in chunk:
+                start = time.perf_counter()
+                try:
+                    func(task)
+                except Exception:
+                    local_errors += 1
+                local_latencies.append(time.perf_counter() - start)
+        finally:
+            connections.close_all()
+        with lock:
+            latencies.extend(local_latencies)
+            errors.append(local_errors)
+
+    threads = [threading.Thread(target=worker, args=(tasks[index::concurrency],)) for index in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    return summarize_latencies(latencies, sum(errors), elapsed)
+
+def summarize_latencies(latencies, errors, elapsed):
+    """Throughput and latency percentiles of a benchmark run, as reported by the commands"""
+    return {
+        'requests': len(latencies),
+        'elapsed': elapsed,
+        'requests_per_second': len(latencies) / elapsed if elapsed else 0.0,
+        'ok_per_second': (len(latencies) - errors) / elapsed if elapsed else 0.0,
+        'errors': errors,
+        'p50_ms': percentile(latencies, 50) * 1000,
+        'p95_ms': percentile(latencies, 95) * 1000,
+        'p99_ms': percentile(latencies, 99) * 1000,
+    }
+
+def format_result(name, result):
+    """One aligned line of benchmark output"""
+    line = (
+        f'{name:>20}: {result["requests_per_second"]:8.1f} req/s  {result["ok_per_second"]:8.1f} ok/s  '
+        f'p50 {result["p50_ms"]:6.1f} ms  p95 {result["p95_ms"]:6.1f} ms  '
+        f'p99 {result["p99_ms"]:6.1f} ms  errors {result["errors"]}'
+    )
+    if 'rows' in result:
+        line += f'  rows {result["rows"]}'
+    return line
+
+def get_hot_queries(day):
+    """The hot attendance and employee queries with the indexes that may serve them.
+
+    Returns (name, queryset, index names) tuples; `day` is the date the
+    per-day queries filter on. Where two indexes share a leading column the
+    planner may pick either, so each query lists every acceptable index.
+    """
+    date_indexes = ('attendance_date_status_idx', 'attendance_date_is_late_idx')
+    return [
+        (
+            'present count for a day',
+            Attendance.objects.filter(date=day, status__in=['present', 'late']).order_by().values('pk'),
+            ('attendance_date_status_idx',),
+        ),
+        (
+            'late count for a day',
+            Attendance.objects.filter(date=day, is_late=True).order_by().values('pk'),
+            ('attendance_date_is_late_idx',),
+        ),
+        (
+            'daily summary rebuild for a week',
+            get_daily_summary_rows(day - timedelta(days=6), day),
+            date_indexes,
+        ),
+        (
+            'headcount by department, role and status',
+            Employee.objects.order_by().values('department', 'role', 'is_active').annotate(count=Count('pk')),
+            ('employee_dept_role_active_idx',),
+        ),
+        (
+            'employee list filtered by department, role and status',
+            Employee.objects.filter(department='finance', role='staff', is_active=True)[:10],
+            ('employee_dept_role_active_idx', 'employee_dept_emp_id_idx'),
+        ),
+        (
+            'department colleagues',
+            Employee.objects.filter(department='finance').exclude(user_id=0),
+            ('employee_dept_emp_id_idx',),
+        ),
+    ]
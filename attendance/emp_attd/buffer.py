@@ -0,0 +1,278 @@
+import atexit
+import json
+import logging
+import os
+import threading
+from datetime import date, time
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from .checkins import upsert_check_ins
+from .summary import record_check_ins
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# Optional write-behind buffer for the morning check-in burst. Check-ins are
+# acknowledged as soon as they are appended (and fsynced) to a local spill
+# file, then written to the database in batches by a background thread.
+# Flushes are idempotent: the upsert skips rows that already have a
+# check-in and the summary only counts rows the upsert reports as new, so
+# replaying a spill file after a crash never double counts.
+
+DEFAULT_SETTINGS = {
+    'ENABLED': False,
+    'FLUSH_INTERVAL_MS': 200,
+    'MAX_BATCH': 500,
+    'SPILL_DIR': None,
+    'FSYNC': True,
+}
+
+def get_buffer_settings():
+    """Merge ATTENDANCE_CHECK_IN_BUFFER over the defaults"""
+    options = dict(DEFAULT_SETTINGS)
+    options.update(getattr(settings, 'ATTENDANCE_CHECK_IN_BUFFER', {}))
+    if not options['SPILL_DIR']:
+        options['SPILL_DIR'] = os.path.join(settings.BASE_DIR, 'check_in_spill')
+    return options
+
+def buffering_enabled():
+    """Check whether check-ins should go through the write-behind buffer"""
+    return get_buffer_settings()['ENABLED']
+
+
+class CheckInBuffer:
+    """Collects check-in events in memory and a spill file, flushing them in batches"""
+
+    def __init__(self, spill_dir, flush_interval_ms=200, max_batch=500, fsync=True):
+        self.spill_dir = spill_dir
+        self.flush_interval = flush_interval_ms / 1000
+        self.max_batch = max_batch
+        self.fsync = fsync
+        self.pending = []
+        self.seen = set()
+        self.sequence = 0
+        self.lock = threading.Lock()
+        self.wakeup = threading.Condition(self.lock)
+        self.flush_lock = threading.Lock()
+        # Rotated segments still being written, kept open (and locked) until removed
+        self.flushing = {}
+        self.stopped = False
+
+        os.makedirs(self.spill_dir, exist_ok=True)
+        replay_spill_files(self.spill_dir)
+        self.spill_file = self.open_segment()
+        self.thread = threading.Thread(target=self.run, name='check-in-buffer', daemon=True)
+        self.thread.start()
+
+    def segment_path(self, suffix='jsonl'):
+        return os.path.join(self.spill_dir, f'check-in-{os.getpid()}.{suffix}')
+
+    def open_segment(self):
+        """Open this process's active spill segment and lock it against recovery"""
+        spill_file = open(self.segment_path(), 'a', encoding='utf-8')
+        if fcntl:
+            fcntl.flock(spill_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        return spill_file
+
+    def submit(self, employee_pk, department, day, check_in_time, is_late):
+        """Queue a check-in. Returns False if this process already queued one for the day."""
+        event = {
+            'employee': employee_pk,
+            'department': department,
+            'date': day.isoformat(),
+            'time': check_in_time.isoformat(),
+            'is_late': is_late,
+        }
+        with self.lock:
+            if self.stopped:
+                raise RuntimeError('The check-in buffer has been closed.')
+            key = (employee_pk, day)
+            if key in self.seen:
+                return False
+            self.spill_file.write(json.dumps(event) + '\n')
+            self.spill_file.flush()
+            if self.fsync:
+                os.fsync(self.spill_file.fileno())
+            self.seen.add(key)
+            self.pending.append(event)
+            if len(self.pending) >= self.max_batch:
+                self.wakeup.notify()
+        return True
+
+    def run(self):
+        """Background loop flushing every interval or when a batch fills up"""
+        while True:
+            with self.lock:
+                if not self.stopped and len(self.pending) < self.max_batch:
+                    self.wakeup.wait(self.flush_interval)
+                stopped = self.stopped
+            try:
+                self.flush()
+            except Exception:
+                # Events stay in the spill segment and are retried on the next flush
+                logger.exception('Failed to flush buffered check-ins')
+            finally:
+                close_old_connections()
+            if stopped:
+                return
+
+    def flush(self):
+        """Write pending events to the database and retire their spill segments"""
+        with self.flush_lock:
+            with self.lock:
+                if self.pending:
+                    # Rotate the active segment so new events land in a fresh file
+                    self.sequence += 1
+                    path = self.segment_path(f'{self.sequence}.flushing')
+                    if fcntl:
+                        # Renamed while open, so the lock moves with it and
+                        # recovery in another process keeps its hands off
+                        os.replace(self.segment_path(), path)
+                        self.flushing[path] = self.spill_file
+                    else:
+                        self.spill_file.close()
+                        os.replace(self.segment_path(), path)
+                    self.spill_file = self.open_segment()
+                    self.pending = []
+                    # Drop duplicate tracking for days other than the newest one seen
+                    latest = max((day for _, day in self.seen), default=None)
+                    self.seen = {key for key in self.seen if key[1] == latest}
+
+            for name in sorted(os.listdir(self.spill_dir)):
+                if name.startswith(f'check-in-{os.getpid()}.') and name.endswith('.flushing'):
+                    path = os.path.join(self.spill_dir, name)
+                    write_events(read_events(path))
+                    os.remove(path)
+                    spill_file = self.flushing.pop(path, None)
+                    if spill_file is not None:
+                        spill_file.close()
+
+    def close(self):
+        """Stop the background thread and drain everything still pending"""
+        with self.lock:
+            if self.stopped:
+                return
+            self.stopped = True
+            self.wakeup.notify()
+        self.thread.join()
+        with self.lock:
+            self.spill_file.close()
+            # Segments whose last flush failed are left for replay
+            for spill_file in self.flushing.values():
+                spill_file.close()
+            self.flushing = {}
+            path = self.segment_path()
+            if os.path.exists(path) and os.path.getsize(path) == 0:
+                os.remove(path)
+
+
+def process_alive(pid):
+    """Check whether a process with this PID is running"""
+    if os.name == 'nt':
+        import ctypes
+        # PROCESS_QUERY_LIMITED_INFORMATION; os.kill would terminate it
+        handle = ctypes.windll.kernel32.OpenProcess(0x1000, False, pid)
+        if not handle:
+            return False
+        ctypes.windll.kernel32.CloseHandle(handle)
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+def spill_file_pid(name):
+    """The PID embedded in a spill file name (check-in-<pid>.…), or None"""
+    pid = name[len('check-in-'):].partition('.')[0]
+    return int(pid) if pid.isdigit() else None
+
+def replay_spill_files(spill_dir):
+    """Replay spill files left behind by processes that are no longer running.
+
+    Files of other live processes, and files still locked, are skipped.
+    Returns the number of check-ins that were newly recorded.
+    """
+    recorded = 0
+    if not os.path.isdir(spill_dir):
+        return recorded
+
+    for name in sorted(os.listdir(spill_dir)):
+        if not name.startswith('check-in-'):
+            continue
+        # Files named after this process are from an earlier process that
+        # had the same PID, unless a buffer here still holds their lock
+        pid = spill_file_pid(name)
+        if pid is not None and pid != os.getpid() and process_alive(pid):
+            continue
+        path = os.path.join(spill_dir, name)
+        with open(path, 'a', encoding='utf-8') as spill_file:
+            if fcntl:
+                try:
+                    fcntl.flock(spill_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except OSError:
+                    continue  # Still owned by a live process
+            events = read_events(path)
+            if events:
+                logger.warning('Replaying %d buffered check-ins from %s', len(events), name)
+                recorded += write_events(events)
+        os.remove(path)
+    return recorded
+
+def read_events(path):
+    """Read check-in events from a spill file, skipping a torn last line"""
+    events = []
+    with open(path, encoding='utf-8') as spill_file:
+        for line in spill_file:
+            try:
+                events.append(json.loads(line))
+            except ValueError:
+                logger.warning('Skipping unreadable buffered check-in in %s', path)
+    return events
+
+def write_events(events):
+    """Upsert check-in events and update the daily summary in one transaction"""
+    check_ins = []
+    details = {}
+    for event in events:
+        day = date.fromisoformat(event['date'])
+        check_ins.append((event['employee'], day, time.fromisoformat(event['time']), event['is_late']))
+        details.setdefault((event['employee'], day), (event['department'], event['is_late']))
+
+    with transaction.atomic():
+        recorded = upsert_check_ins(check_ins)
+        record_check_ins((day, *details[(employee_pk, day)]) for employee_pk, day in recorded)
+    return len(recorded)
+
+
+_buffer = None
+_buffer_lock = threading.Lock()
+
+def get_check_in_buffer():
+    """Get this process's check-in buffer, starting it on first use"""
+    global _buffer
+    with _buffer_lock:
+        if _buffer is None:
+            options = get_buffer_settings()
+            _buffer = CheckInBuffer(
+                options['SPILL_DIR'],
+                flush_interval_ms=options['FLUSH_INTERVAL_MS'],
+                max_batch=options['MAX_BATCH'],
+                fsync=options['FSYNC'],
+            )
+            atexit.register(shutdown_check_in_buffer)
+        return _buffer
+
+def shutdown_check_in_buffer():
+    """Drain and stop this process's check-in buffer, if it was started"""
+    global _buffer
+    with _buffer_lock:
+        if _buffer is not None:
+            _buffer.close()
+            _buffer = None
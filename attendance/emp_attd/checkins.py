@@ -0,0 +1,156 @@
+from django.db import connection
+from django.utils import timezone
+from employee.models import Employee
+from .models import Attendance
+
+# Single-statement writes for the check-in and check-out paths. Both run in
+# one round trip using the database's conflict handling (INSERT ... ON
+# CONFLICT ... DO UPDATE ... WHERE) and RETURNING, so concurrent duplicate
+# submissions resolve inside the database against the unique_together
+# constraint instead of racing between a SELECT and an INSERT.
+
+def supports_upsert():
+    """Check whether the database can run the single-statement writes"""
+    features = connection.features
+    return features.supports_update_conflicts_with_target and features.can_return_rows_from_bulk_insert
+
+def _columns():
+    """Quoted table and column names of the attendance table"""
+    quote = connection.ops.quote_name
+    names = {field.name: quote(field.column) for field in Attendance._meta.concrete_fields}
+    names['table'] = quote(Attendance._meta.db_table)
+    return names
+
+# Rows per INSERT statement; keeps every statement well under SQLite's
+# bound-parameter limit
+UPSERT_BATCH_SIZE = 100
+
+def upsert_check_in(employee, day, check_in_time, is_late):
+    """Record a check-in, creating or completing the attendance row for the day.
+
+    Returns True when the check-in was recorded and False when the employee
+    had already checked in.
+    """
+    return bool(upsert_check_ins([(employee.pk, day, check_in_time, is_late)]))
+
+def upsert_check_ins(check_ins):
+    """Record many check-ins given as (employee_pk, day, check_in_time, is_late) tuples.
+
+    Rows are written with multi-row INSERT ... ON CONFLICT statements.
+    Returns the set of (employee_pk, day) pairs that were recorded; pairs
+    that had already checked in are left untouched and omitted.
+    """
+    if not supports_upsert():
+        return {
+            (employee_pk, day)
+            for employee_pk, day, check_in_time, is_late in check_ins
+            if check_in_with_orm(Employee(pk=employee_pk), day, check_in_time, is_late)
+        }
+
+    # One statement cannot touch the same row twice, so keep the first
+    # submission for each employee and day
+    unique = {}
+    for employee_pk, day, check_in_time, is_late in check_ins:
+        unique.setdefault((employee_pk, day), (check_in_time, is_late))
+    rows = [(employee_pk, day, *values) for (employee_pk, day), values in unique.items()]
+
+    ops = connection.ops
+    now = ops.adapt_datetimefield_value(timezone.now())
+    names = _columns()
+    date_field = Attendance._meta.get_field('date')
+    recorded = set()
+    with connection.cursor() as cursor:
+        for start in range(0, len(rows), UPSERT_BATCH_SIZE):
+            batch = rows[start:start + UPSERT_BATCH_SIZE]
+            sql = (
+                'INSERT INTO {table} ({employee}, {date}, {check_in_time}, {status}, {is_late}, {created_at}, {updated_at}) '
+                'VALUES ' + ', '.join(['(%s, %s, %s, %s, %s, %s, %s)'] * len(batch)) + ' '
+                'ON CONFLICT ({employee}, {date}) DO UPDATE SET '
+                '{check_in_time} = EXCLUDED.{check_in_time}, {status} = EXCLUDED.{status}, '
+                '{is_late} = EXCLUDED.{is_late}, {updated_at} = EXCLUDED.{updated_at} '
+                'WHERE {table}.{check_in_time} IS NULL '
+                'RETURNING {employee}, {date}'
+            ).format(**names)
+            params = []
+            for employee_pk, day, check_in_time, is_late in batch:
+                params.extend([
+                    employee_pk,
+                    ops.adapt_datefield_value(day),
+                    ops.adapt_timefield_value(check_in_time),
+                    'late' if is_late else 'present',
+                    is_late,
+                    now,
+                    now,
+                ])
+            cursor.execute(sql, params)
+            recorded.update((employee_pk, date_field.to_python(day)) for employee_pk, day in cursor.fetchall())
+    return recorded
+
+def complete_check_out(employee, day, check_out_time, latest_check_in):
+    """Record a check-out if the employee checked in no later than `latest_check_in`.
+
+    Returns the check-in time on success, or None when there is no open
+    check-in that satisfies the condition.
+    """
+    if not supports_upsert():
+        return check_out_with_orm(employee, day, check_out_time, latest_check_in)
+
+    ops = connection.ops
+    names = _columns()
+    sql = (
+        'UPDATE {table} SET {check_out_time} = %s, {updated_at} = %s '
+        'WHERE {employee} = %s AND {date} = %s AND {check_out_time} IS NULL '
+        'AND {check_in_time} IS NOT NULL AND {check_in_time} <= %s '
+        'RETURNING {check_in_time}'
+    ).format(**names)
+    params = [
+        ops.adapt_timefield_value(check_out_time),
+        ops.adapt_datetimefield_value(timezone.now()),
+        employee.pk,
+        ops.adapt_datefield_value(day),
+        ops.adapt_timefield_value(latest_check_in),
+    ]
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        row = cursor.fetchone()
+    if row is None:
+        return None
+    return Attendance._meta.get_field('check_in_time').to_python(row[0])
+
+def check_in_with_orm(employee, day, check_in_time, is_late):
+    """Fallback for check-ins on databases without conflict handling"""
+    attendance, created = Attendance.objects.select_for_update().get_or_create(
+        employee=employee,
+        date=day,
+        defaults={
+            'check_in_time': check_in_time,
+            'status': 'late' if is_late else 'present',
+            'is_late': is_late
+        }
+    )
+    if created:
+        return True
+    if attendance.check_in_time:
+        return False
+
+    attendance.check_in_time = check_in_time
+    attendance.status = 'late' if is_late else 'present'
+    attendance.is_late = is_late
+    attendance.save()
+    return True
+
+def check_out_with_orm(employee, day, check_out_time, latest_check_in):
+    """Fallback for check-outs on databases without RETURNING support"""
+    attendance = Attendance.objects.select_for_update().filter(
+        employee=employee,
+        date=day,
+        check_out_time__isnull=True,
+        check_in_time__isnull=False,
+        check_in_time__lte=latest_check_in,
+    ).first()
+    if attendance is None:
+        return None
+
+    attendance.check_out_time = check_out_time
+    attendance.save()
+    return attendance.check_in_time
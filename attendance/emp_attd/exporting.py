@@ -0,0 +1,104 @@
+import csv
+import heapq
+import json
+from operator import itemgetter
+from employee.models import Employee
+from .archive import iter_archived_days
+from .models import Attendance
+
+# Streaming attendance export for payroll. Rows are read with .values() and
+# .iterator(), joined with their employee and user in the same query, and
+# serialized one at a time, so memory use does not grow with the date range.
+# Archived days are unpacked one day at a time and merged in date order.
+
+EXPORT_FORMATS = ['csv', 'jsonl']
+
+EXPORT_CHUNK_SIZE = 2000
+
+# (column name, lookup) pairs in output order
+EXPORT_FIELDS = [
+    ('date', 'date'),
+    ('employee_id', 'employee__employee_id'),
+    ('username', 'employee__user__username'),
+    ('first_name', 'employee__user__first_name'),
+    ('last_name', 'employee__user__last_name'),
+    ('department', 'employee__department'),
+    ('status', 'status'),
+    ('is_late', 'is_late'),
+    ('check_in_time', 'check_in_time'),
+    ('check_out_time', 'check_out_time'),
+    ('notes', 'notes'),
+]
+
+def get_export_rows(start_date, end_date, department=None):
+    """Iterate attendance rows for a date range as tuples in EXPORT_FIELDS order"""
+    attendance = Attendance.objects.filter(date__range=(start_date, end_date))
+    if department:
+        attendance = attendance.filter(employee__department=department)
+    hot = (
+        attendance
+        .order_by('date', 'employee__employee_id')
+        .values_list(*[lookup for _, lookup in EXPORT_FIELDS])
+        .iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    )
+    archived = get_archived_export_rows(start_date, end_date, department)
+    return heapq.merge(hot, archived, key=itemgetter(0, 1))
+
+def get_archived_export_rows(start_date, end_date, department=None):
+    """Iterate archived attendance rows for a date range, ordered like get_export_rows"""
+    details = None
+    for day, rows in iter_archived_days(start_date, end_date):
+        if details is None:
+            employees = Employee.objects.order_by()
+            if department:
+                employees = employees.filter(department=department)
+            details = {
+                pk: employee
+                for pk, *employee in employees.values_list(
+                    'pk', 'employee_id', 'user__username', 'user__first_name', 'user__last_name', 'department',
+                )
+            }
+        day_rows = [
+            (day, *details[employee_pk], status, is_late, check_in_time, check_out_time, notes)
+            for employee_pk, check_in_time, check_out_time, status, is_late, notes in rows
+            if employee_pk in details
+        ]
+        day_rows.sort(key=itemgetter(1))
+        yield from day_rows
+
+
+class _Echo:
+    """File-like object that hands back what csv.writer writes"""
+    def write(self, value):
+        return value
+
+def _json_value(value):
+    """Dates and times as ISO 8601 strings, everything else unchanged"""
+    return value.isoformat() if hasattr(value, 'isoformat') else value
+
+def _csv_value(value):
+    """Empty cells for NULL and lowercase true/false for booleans"""
+    if value is None:
+        return ''
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    return _json_value(value)
+
+def csv_lines(rows):
+    """Yield CSV lines for export rows, starting with the header"""
+    writer = csv.writer(_Echo())
+    yield writer.writerow([name for name, _ in EXPORT_FIELDS])
+    for row in rows:
+        yield writer.writerow([_csv_value(value) for value in row])
+
+def jsonl_lines(rows):
+    """Yield one JSON object per export row"""
+    names = [name for name, _ in EXPORT_FIELDS]
+    for row in rows:
+        yield json.dumps(dict(zip(names, map(_json_value, row)))) + '\n'
+
+def export_lines(export_format, rows):
+    """Yield the lines of an export in the given format"""
+    if export_format == 'jsonl':
+        return jsonl_lines(rows)
+    return csv_lines(rows)
@@ -0,0 +1,30 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from attendance.fragments import (
+    EMPLOYEES_SCOPE, attendance_scope, bump_fragment_versions_on_commit, department_scope,
+    get_fragment_settings, get_fragment_versions,
+)
+from .models import Attendance
+
+# Cached dashboard fragments. The headcount and attendance cards are keyed
+# by the employees version and the day's attendance version, the
+# department statistics by the employees version and the colleague list by
+# the department's version. Attendance rows saved or deleted through the
+# ORM bump their day here; check-ins written in bulk or with raw SQL are
+# covered by the daily summary helpers, which bump the day they count.
+
+def get_dashboard_fragments(today, department=None):
+    """Get the fragment cache options and the versions dashboard fragments are keyed by"""
+    scopes = {'employees': EMPLOYEES_SCOPE, 'attendance': attendance_scope(today)}
+    if department:
+        scopes['department'] = department_scope(department)
+    versions = get_fragment_versions(*scopes.values())
+    options = get_fragment_settings()
+    fragments = {name: versions[scope] for name, scope in scopes.items()}
+    fragments.update(ttl=options['TTL'], cache=options['CACHE'])
+    return fragments
+
+@receiver(post_save, sender=Attendance)
+@receiver(post_delete, sender=Attendance)
+def invalidate_attendance_fragments(sender, instance, **kwargs):
+    bump_fragment_versions_on_commit(attendance_scope(instance.date))
@@ -0,0 +1,313 @@
+import asyncio
+import json
+import logging
+import queue
+import threading
+import time
+from datetime import datetime, timedelta
+from django.conf import settings
+from django.db import connections
+from django.utils import timezone
+from employee.models import Employee
+from .models import Attendance
+
+logger = logging.getLogger(__name__)
+
+# In-process publish/subscribe hub behind the dashboards' live feed. Check-in
+# and check-out publish to it once their transaction commits, and one poller
+# thread per process picks up rows written by other processes (or by the
+# check-in buffer) with a single query per interval, however many dashboards
+# are open. Every event is published at most once per employee, day and kind,
+# so a row seen both ways is only counted once. Events carry the time their
+# row was written, and a stream drops the delta of every event written no
+# later than the summary rows its snapshot read, since the snapshot already
+# counts it. Nothing runs while no dashboard is subscribed.
+
+DEFAULT_SETTINGS = {
+    'POLL_INTERVAL': 2.0,  # seconds between database polls; 0 for in-process events only
+    'KEEPALIVE': 15,  # seconds between keepalive comments on idle streams
+    'MAX_QUEUE': 1000,  # events buffered per subscriber before it is dropped
+}
+
+# Rows are polled from a little before the last poll, so a row committed late
+# with an earlier updated_at is still seen; duplicates are skipped
+POLL_OVERLAP = timedelta(seconds=5)
+
+# Sent to a subscriber that fell too far behind; its stream ends and the
+# browser reconnects with a fresh snapshot
+OVERFLOW = object()
+
+def get_live_feed_settings():
+    """Merge ATTENDANCE_LIVE_FEED over the defaults"""
+    options = dict(DEFAULT_SETTINGS)
+    options.update(getattr(settings, 'ATTENDANCE_LIVE_FEED', {}))
+    return options
+
+
+class Subscription:
+    """Events for one dashboard stream, read by a sync view"""
+
+    def __init__(self, max_queue):
+        self.max_queue = max_queue
+        self.queue = queue.SimpleQueue()
+        self.overflowed = False
+
+    def put(self, event):
+        """Queue an event; called by the hub while holding its lock"""
+        if self.overflowed:
+            return
+        if self.queue.qsize() >= self.max_queue:
+            self.overflowed = True
+            event = OVERFLOW
+        self.deliver(event)
+
+    def deliver(self, event):
+        """Hand an event to the reader"""
+        self.queue.put(event)
+
+    def get(self, timeout):
+        """Next event, or None when nothing arrived within `timeout` seconds"""
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+class AsyncSubscription(Subscription):
+    """Events for one dashboard stream, read by an async view on its event loop"""
+
+    def __init__(self, max_queue):
+        super().__init__(max_queue)
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue()
+
+    def deliver(self, event):
+        """Hand an event to the reader on its event loop"""
+        self.loop.call_soon_threadsafe(self.queue.put_nowait, event)
+
+    async def get(self, timeout):
+        """Next event, or None when nothing arrived within `timeout` seconds"""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class AttendanceHub:
+    """Fans attendance events out to this process's dashboard streams"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.subscribers = set()
+        self.seen = set()
+        self.seen_date = None
+        self.poller = None
+
+    def subscribe(self, subscription):
+        """Start sending events to a subscription, starting the poller if needed"""
+        poll_interval = get_live_feed_settings()['POLL_INTERVAL']
+        with self.lock:
+            self.subscribers.add(subscription)
+            if self.poller is None and poll_interval:
+                self.poller = threading.Thread(
+                    target=self.run, args=(poll_interval,), name='attendance-live-poller', daemon=True
+                )
+                self.poller.start()
+
+    def unsubscribe(self, subscription):
+        """Stop sending events to a subscription"""
+        with self.lock:
+            self.subscribers.discard(subscription)
+
+    def publish(self, event, announce=True):
+        """Send an event to every subscriber unless it was already published.
+
+        With `announce` False the event is only marked as seen.
+        """
+        key = (event['employee_id'], event['date'], event['kind'])
+        with self.lock:
+            if not self.subscribers:
+                return
+            if self.seen_date != event['date']:
+                self.seen = set()
+                self.seen_date = event['date']
+            if key in self.seen:
+                return
+            self.seen.add(key)
+            if announce:
+                for subscription in self.subscribers:
+                    subscription.put(event)
+
+    def run(self, poll_interval):
+        """Poll for rows written elsewhere until the last subscriber leaves"""
+        # Rows from just before the first poll are already in the
+        # subscribers' snapshots, so they are only marked as seen
+        since = timezone.now() - POLL_OVERLAP
+        announce = False
+        try:
+            while True:
+                polled_at = timezone.now()
+                try:
+                    for event in poll_events(timezone.localtime(polled_at).date(), since):
+                        self.publish(event, announce=announce)
+                except Exception:
+                    logger.exception('Polling the live attendance feed failed')
+                else:
+                    since = polled_at - POLL_OVERLAP
+                    announce = True
+
+                with self.lock:
+                    if not self.subscribers:
+                        self.poller = None
+                        return
+                time.sleep(poll_interval)
+        finally:
+            connections.close_all()
+
+
+_hub = None
+_hub_lock = threading.Lock()
+
+def get_hub():
+    """Get this process's live feed hub"""
+    global _hub
+    with _hub_lock:
+        if _hub is None:
+            _hub = AttendanceHub()
+        return _hub
+
+
+def check_in_event(employee_id, name, department, day, check_in_time, is_late, updated_at=None):
+    """A new check-in row with the counter changes it causes, written at `updated_at` if known"""
+    return {
+        'kind': 'check_in',
+        'date': day.isoformat(),
+        'employee_id': employee_id,
+        'name': name,
+        'department': department,
+        'department_display': dict(Employee.DEPARTMENT_CHOICES).get(department, department),
+        'time': check_in_time.strftime('%H:%M'),
+        'status': 'late' if is_late else 'present',
+        'delta': {'present_count': 1, 'late_count': 1 if is_late else 0, 'absent_count': -1},
+        'updated_at': updated_at,
+    }
+
+def check_out_event(employee_id, name, department, day, check_out_time, updated_at=None):
+    """A new check-out with the counter changes it causes, written at `updated_at` if known"""
+    return {
+        'kind': 'check_out',
+        'date': day.isoformat(),
+        'employee_id': employee_id,
+        'name': name,
+        'department': department,
+        'department_display': dict(Employee.DEPARTMENT_CHOICES).get(department, department),
+        'time': check_out_time.strftime('%H:%M'),
+        'delta': {'checked_out_count': 1},
+        'updated_at': updated_at,
+    }
+
+def _employee_name(user):
+    """Full name of a user, or the username when no name is set"""
+    return user.get_full_name() or user.username
+
+def publish_check_in(employee, day, check_in_time, is_late, updated_at):
+    """Publish a committed check-in made by this process, written no earlier than `updated_at`"""
+    get_hub().publish(check_in_event(
+        employee.employee_id, _employee_name(employee.user), employee.department, day, check_in_time, is_late,
+        updated_at,
+    ))
+
+def publish_check_out(employee, day, check_out_time, updated_at):
+    """Publish a committed check-out made by this process, written no earlier than `updated_at`"""
+    get_hub().publish(check_out_event(
+        employee.employee_id, _employee_name(employee.user), employee.department, day, check_out_time,
+        updated_at,
+    ))
+
+def poll_events(day, since):
+    """Check-in and check-out events for rows of a day updated since a moment, in one query"""
+    rows = (
+        Attendance.objects.filter(date=day, updated_at__gte=since, check_in_time__isnull=False)
+        .order_by('updated_at')
+        .values_list(
+            'employee__employee_id', 'employee__user__first_name', 'employee__user__last_name',
+            'employee__user__username', 'employee__department', 'check_in_time', 'check_out_time', 'is_late',
+            'updated_at',
+        )
+    )
+    for employee_id, first_name, last_name, username, department, check_in_time, check_out_time, is_late, updated_at in rows:
+        name = f'{first_name} {last_name}'.strip() or username
+        # A check-out rewrites updated_at, so the check-in it closes is
+        # stamped with its own time, at or before it was written
+        checked_in_at = timezone.make_aware(datetime.combine(day, check_in_time)) if check_out_time else updated_at
+        yield check_in_event(employee_id, name, department, day, check_in_time, is_late, checked_in_at)
+        if check_out_time:
+            yield check_out_event(employee_id, name, department, day, check_out_time, updated_at)
+
+
+def format_event(name, data):
+    """One Server-Sent Events message"""
+    return f'event: {name}\ndata: {json.dumps(data)}\n\n'
+
+def snapshot_event(stats):
+    """The counters a dashboard starts from, before any deltas"""
+    return format_event('snapshot', {
+        'date': stats['today'].isoformat(),
+        'present_count': stats['present_count'],
+        'late_count': stats['late_count'],
+        'absent_count': stats['absent_count'],
+    })
+
+def _message(event, counted_until):
+    """The SSE message for an event, without its delta when the snapshot already counted it"""
+    if event is None:
+        return ': keepalive\n\n'
+    event = dict(event)
+    updated_at = event.pop('updated_at')
+    if counted_until is not None and updated_at is not None and updated_at <= counted_until:
+        event['delta'] = {}
+    return format_event(event['kind'], event)
+
+def stream_events(get_stats):
+    """Yield the SSE messages of one dashboard stream.
+
+    The subscription starts before the snapshot is read, so no event falls
+    in between. The snapshot's watermark is the last update of the summary
+    rows it read; events written at or before it, whether they arrive
+    before or after the read, are already counted and are sent without
+    their delta. The stream ends when the client goes away or falls too far
+    behind.
+    """
+    options = get_live_feed_settings()
+    hub = get_hub()
+    subscription = Subscription(options['MAX_QUEUE'])
+    hub.subscribe(subscription)
+    try:
+        yield 'retry: 3000\n\n'
+        stats = get_stats()
+        yield snapshot_event(stats)
+        while True:
+            event = subscription.get(options['KEEPALIVE'])
+            if event is OVERFLOW:
+                return
+            yield _message(event, stats['counts_updated_at'])
+    finally:
+        hub.unsubscribe(subscription)
+
+async def astream_events(aget_stats):
+    """Async version of stream_events, for async views"""
+    options = get_live_feed_settings()
+    hub = get_hub()
+    subscription = AsyncSubscription(options['MAX_QUEUE'])
+    hub.subscribe(subscription)
+    try:
+        yield 'retry: 3000\n\n'
+        stats = await aget_stats()
+        yield snapshot_event(stats)
+        while True:
+            event = await subscription.get(options['KEEPALIVE'])
+            if event is OVERFLOW:
+                return
+            yield _message(event, stats['counts_updated_at'])
+    finally:
+        hub.unsubscribe(subscription)
@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from datetime import date
+from emp_attd.archive import archive_day, get_hot_days
+from emp_attd.reports import rebuild_monthly_timesheets
+
+class Command(BaseCommand):
+    help = 'Move attendance older than the retention horizon into the archive'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--keep-months', type=int, default=2,
+            help='Months kept in the hot table, counting the current one (default: 2)',
+        )
+
+    def handle(self, *args, **options):
+        keep_months = options['keep_months']
+        if keep_months < 1:
+            raise CommandError('--keep-months must be at least 1; the current month is never archived.')
+
+        current_month = timezone.localtime().date().replace(day=1)
+        months_back = current_month.year * 12 + current_month.month - 1 - (keep_months - 1)
+        horizon = date(months_back // 12, months_back % 12 + 1, 1)
+
+        days = get_hot_days(horizon)
+        moved = 0
+        for day in days:
+            moved += archive_day(day)
+        self.stdout.write(self.style.SUCCESS(f'Archived {moved} attendance rows from {len(days)} days before {horizon}'))
+
+        # Archived months are only read from their rollups from now on
+        for month in sorted({day.replace(day=1) for day in days}):
+            count = rebuild_monthly_timesheets(month.year, month.month)
+            self.stdout.write(self.style.SUCCESS(f'Rebuilt {count} timesheets for {month:%Y-%m}'))
@@ -0,0 +1,193 @@
+import json
+import platform
+from contextlib import nullcontext
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from datetime import datetime, time, timedelta
+from unittest import mock
+import django
+from employee.models import Employee
+from employee.seeding import seed_employees
+from emp_attd.benchmarking import benchmark_database, format_result, run_concurrently, seed_attendance_history
+from emp_attd.summary import rebuild_daily_summaries
+
+PASSWORD = 'benchmark-password'
+
+ENDPOINTS = [
+    'login',
+    'manager_dashboard',
+    'hr_dashboard',
+    'employee_dashboard',
+    'employee_rows',
+    'employee_list_search',
+    'check_in',
+    'check_out',
+]
+
+class Command(BaseCommand):
+    help = 'Load test the main pages with concurrent clients and write throughput and latency percentiles to JSON'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--employees', type=int, default=1000, help='Number of employees to seed')
+        parser.add_argument('--days', type=int, default=30, help='Days of attendance history to seed')
+        parser.add_argument('--requests', type=int, default=200, help='Requests per endpoint')
+        parser.add_argument('--concurrency', type=int, default=8, help='Number of concurrent clients')
+        parser.add_argument('--endpoints', nargs='+', choices=ENDPOINTS, default=ENDPOINTS, help='Endpoints to benchmark')
+        parser.add_argument('--database', default='default', help='Database alias to benchmark')
+        parser.add_argument('--output', default='benchmark-results.json', help='File to write the JSON results to')
+        parser.add_argument('--baseline', help='Earlier results file to compare p95 latency against')
+        parser.add_argument(
+            '--max-regression', type=float, default=20.0,
+            help='Fail when an endpoint\'s p95 latency grows by more than this percentage over the baseline'
+        )
+
+    def handle(self, *args, **options):
+        if options['employees'] < len(Employee.ROLE_CHOICES):
+            raise CommandError(f'Seed at least {len(Employee.ROLE_CHOICES)} employees so every role is present.')
+
+        with benchmark_database(options['database']) as connection, override_settings(ALLOWED_HOSTS=['*']):
+            self.stdout.write(self.style.SUCCESS(
+                f'Seeding {options["employees"]} employees with {options["days"]} days of attendance on {connection.vendor}...'
+            ))
+            self.today = timezone.localdate()
+            self.seed(options['employees'], options['days'])
+
+            self.stdout.write(self.style.SUCCESS(
+                f'Running {options["requests"]} requests per endpoint with {options["concurrency"]} concurrent clients...'
+            ))
+            results = {}
+            for name in ENDPOINTS:
+                if name not in options['endpoints']:
+                    continue
+                tasks, func, frozen_time = getattr(self, f'prepare_{name}')(options['requests'])
+                with self.frozen_at(frozen_time):
+                    result = run_concurrently(tasks, options['concurrency'], func)
+                results[name] = result
+                self.stdout.write(format_result(name, result))
+
+            report = {
+                'created_at': timezone.now().isoformat(),
+                'vendor': connection.vendor,
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'employees': options['employees'],
+                'days': options['days'],
+                'requests': options['requests'],
+                'concurrency': options['concurrency'],
+                'endpoints': results,
+            }
+
+        with open(options['output'], 'w', encoding='utf-8') as output:
+            json.dump(report, output, indent=2)
+        self.stdout.write(self.style.SUCCESS(f'Results written to {options["output"]}'))
+
+        if options['baseline']:
+            self.compare(report, options['baseline'], options['max_regression'])
+
+    def compare(self, report, baseline_path, max_regression):
+        """Compare p95 latency per endpoint with an earlier report"""
+        try:
+            with open(baseline_path, encoding='utf-8') as baseline_file:
+                baseline = json.load(baseline_file)
+        except (OSError, ValueError) as e:
+            raise CommandError(f'Could not read baseline {baseline_path}: {e}')
+
+        regressions = []
+        for name, result in report['endpoints'].items():
+            previous = baseline.get('endpoints', {}).get(name)
+            if not previous or not previous['p95_ms']:
+                continue
+            change = (result['p95_ms'] - previous['p95_ms']) / previous['p95_ms'] * 100
+            line = f'{name:>20}: p95 {previous["p95_ms"]:6.1f} ms -> {result["p95_ms"]:6.1f} ms ({change:+.1f}%)'
+            if change > max_regression:
+                regressions.append(name)
+                self.stdout.write(self.style.ERROR(line))
+            else:
+                self.stdout.write(line)
+
+        if regressions:
+            raise CommandError(f'p95 latency regressed by more than {max_regression}% on: {", ".join(regressions)}')
+
+    def seed(self, employee_count, days):
+        """Seed employees, their attendance history and its daily summaries"""
+        employees = seed_employees(employee_count, password=PASSWORD)
+        if days:
+            start_day = self.today - timedelta(days=days)
+            seed_attendance_history([employee.pk for employee in employees], start_day, days)
+            rebuild_daily_summaries(start_day, self.today - timedelta(days=1))
+
+        self.users = {value: [] for value, _ in Employee.ROLE_CHOICES}
+        for employee in employees:
+            self.users[employee.role].append(employee.user)
+
+    def frozen_at(self, at):
+        """Freeze the clock at a local time today, or leave it running for None"""
+        if at is None:
+            return nullcontext()
+        frozen = timezone.make_aware(datetime.combine(self.today, at))
+        return mock.patch('django.utils.timezone.now', return_value=frozen)
+
+    def clients(self, role, count):
+        """Logged-in clients, one per request, cycling through the users of a role"""
+        users = self.users[role]
+        clients = []
+        for index in range(count):
+            client = Client()
+            client.force_login(users[index % len(users)])
+            clients.append(client)
+        return clients
+
+    def get_page(self, url, expected_status=200):
+        """A task function requesting `url` with the task's client"""
+        def func(client):
+            response = client.get(url)
+            if response.status_code != expected_status:
+                raise RuntimeError(f'GET {url} returned {response.status_code}')
+        return func
+
+    def post_json(self, url):
+        """A task function posting to a JSON endpoint that must report success"""
+        def func(client):
+            response = client.post(url)
+            if response.status_code != 200 or not response.json()['success']:
+                raise RuntimeError(f'POST {url} failed: {response.content[:200]!r}')
+        return func
+
+    def prepare_login(self, count):
+        users = self.users['staff']
+        url = reverse('login')
+
+        def func(user):
+            response = Client().post(url, {'username': user.username, 'password': PASSWORD})
+            if response.status_code != 302:
+                raise RuntimeError(f'Login as {user.username} returned {response.status_code}')
+        return [users[index % len(users)] for index in range(count)], func, None
+
+    def prepare_manager_dashboard(self, count):
+        return self.clients('manager', count), self.get_page(reverse('manager_dashboard')), None
+
+    def prepare_hr_dashboard(self, count):
+        return self.clients('hr_admin', count), self.get_page(reverse('hr_dashboard')), None
+
+    def prepare_employee_dashboard(self, count):
+        return self.clients('staff', count), self.get_page(reverse('employee_dashboard')), None
+
+    def prepare_employee_rows(self, count):
+        return self.clients('hr_admin', count), self.get_page(reverse('employee_rows') + '?limit=50'), None
+
+    def prepare_employee_list_search(self, count):
+        url = reverse('employee_list') + '?search=Employee1&department=finance&is_active=true'
+        return self.clients('hr_admin', count), self.get_page(url), None
+
+    def prepare_check_in(self, count):
+        # One check-in per staff member; check_out then reuses the same clients
+        self.checked_in = self.clients('staff', min(count, len(self.users['staff'])))
+        return self.checked_in, self.post_json(reverse('check_in')), time(8, 30)
+
+    def prepare_check_out(self, count):
+        clients = getattr(self, 'checked_in', None)
+        if clients is None:
+            raise CommandError('check_out can only be benchmarked together with check_in.')
+        return clients, self.post_json(reverse('check_out')), time(17, 30)
@@ -0,0 +1,232 @@
+import asyncio
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, time as clock_time
+from unittest import mock
+import django
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.handlers.asgi import ASGIHandler
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.crypto import get_random_string
+from employee.seeding import bulk_seed_employees
+from emp_attd.benchmarking import benchmark_database, format_result, summarize_latencies
+
+STACKS = ['wsgi', 'asgi']
+
+# (name, URL name, local time the clock is frozen at)
+STEPS = [
+    ('check_in', 'check_in', clock_time(8, 30)),
+    ('check_out', 'check_out', clock_time(17, 30)),
+]
+
+class Command(BaseCommand):
+    help = (
+        'Compare check-in and check-out throughput and tail latency of the sync views under WSGI '
+        'and the async views under ASGI, with every client sending its request at once'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--clients', type=int, default=1000, help='Number of concurrent clients, one employee each')
+        parser.add_argument('--wsgi-threads', type=int, default=32, help='Worker threads serving the WSGI stack')
+        parser.add_argument('--stacks', nargs='+', choices=STACKS, default=STACKS, help='Stacks to benchmark')
+        parser.add_argument('--database', default='default', help='Database alias to benchmark')
+        parser.add_argument('--output', help='File to write the JSON results to')
+        parser.add_argument('--stack', choices=STACKS, help='Benchmark one stack in this process and print JSON')
+
+    def handle(self, *args, **options):
+        if options['clients'] < 1 or options['wsgi_threads'] < 1:
+            raise CommandError('--clients and --wsgi-threads must be at least 1.')
+        if options['stack']:
+            self.stdout.write(json.dumps(self.run_stack(options['stack'], options)))
+            return
+
+        # The check-in URLs are routed once per process, so each stack runs
+        # in its own process with ATTENDANCE_ASYNC_VIEWS set to match
+        manage_py = os.path.join(settings.BASE_DIR, 'manage.py')
+        report = {
+            'created_at': timezone.now().isoformat(),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'clients': options['clients'],
+            'wsgi_threads': options['wsgi_threads'],
+            'stacks': {},
+        }
+        for stack in options['stacks']:
+            self.stdout.write(self.style.SUCCESS(f'{stack.upper()} with {options["clients"]} concurrent clients:'))
+            completed = subprocess.run(
+                [
+                    sys.executable, manage_py, 'benchmark_asgi', '--stack', stack,
+                    '--clients', str(options['clients']),
+                    '--wsgi-threads', str(options['wsgi_threads']),
+                    '--database', options['database'],
+                ],
+                env={**os.environ, 'ATTENDANCE_ASYNC_VIEWS': '1' if stack == 'asgi' else '0'},
+                capture_output=True,
+                text=True,
+            )
+            if completed.returncode != 0:
+                error = completed.stderr.strip().splitlines()
+                self.stderr.write(f'  skipped: {error[-1] if error else "benchmark failed"}')
+                continue
+
+            output = json.loads(completed.stdout.strip().splitlines()[-1])
+            report['vendor'] = output['vendor']
+            report['stacks'][stack] = output['results']
+            for name, result in output['results'].items():
+                self.stdout.write(format_result(name, result))
+
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as output:
+                json.dump(report, output, indent=2)
+            self.stdout.write(self.style.SUCCESS(f'Results written to {options["output"]}'))
+
+    def run_stack(self, stack, options):
+        """Seed a throwaway database and time every step on one stack"""
+        views_async = bool(settings.ATTENDANCE_ASYNC_VIEWS)
+        if views_async != (stack == 'asgi'):
+            raise CommandError(f'Set ATTENDANCE_ASYNC_VIEWS={int(stack == "asgi")} to benchmark the {stack} stack.')
+
+        with benchmark_database(options['database']) as connection, override_settings(ALLOWED_HOSTS=['*']):
+            bulk_seed_employees(options['clients'])
+            headers = self.client_headers(User.objects.order_by('pk'))
+            today = timezone.localdate()
+
+            results = {}
+            for name, url_name, at in STEPS:
+                frozen = timezone.make_aware(datetime.combine(today, at))
+                with mock.patch('django.utils.timezone.now', return_value=frozen):
+                    if stack == 'asgi':
+                        results[name] = asyncio.run(self.burst_asgi(reverse(url_name), headers))
+                    else:
+                        results[name] = self.burst_wsgi(reverse(url_name), headers, options['wsgi_threads'])
+            return {'vendor': connection.vendor, 'results': results}
+
+    def client_headers(self, users):
+        """Session and CSRF headers for one logged-in client per user"""
+        headers = []
+        for user in users:
+            client = Client()
+            client.force_login(user)
+            token = get_random_string(32)
+            session = client.cookies[settings.SESSION_COOKIE_NAME].value
+            headers.append({
+                'cookie': f'{settings.SESSION_COOKIE_NAME}={session}; {settings.CSRF_COOKIE_NAME}={token}',
+                'x-csrftoken': token,
+            })
+        return headers
+
+    def burst_wsgi(self, path, headers, threads):
+        """Send every client's request at once to a WSGI handler with a fixed thread pool"""
+        handler = WSGIHandler()
+
+        def request(client_headers):
+            environ = {
+                'REQUEST_METHOD': 'POST',
+                'SCRIPT_NAME': '',
+                'PATH_INFO': path,
+                'QUERY_STRING': '',
+                'SERVER_NAME': 'testserver',
+                'SERVER_PORT': '80',
+                'SERVER_PROTOCOL': 'HTTP/1.1',
+                'CONTENT_LENGTH': '0',
+                'HTTP_HOST': 'testserver',
+                'HTTP_COOKIE': client_headers['cookie'],
+                'HTTP_X_CSRFTOKEN': client_headers['x-csrftoken'],
+                'wsgi.version': (1, 0),
+                'wsgi.url_scheme': 'http',
+                'wsgi.input': io.BytesIO(b''),
+                'wsgi.errors': sys.stderr,
+                'wsgi.multithread': True,
+                'wsgi.multiprocess': False,
+                'wsgi.run_once': False,
+            }
+            statuses = []
+            response = handler(environ, lambda status, response_headers: statuses.append(status))
+            try:
+                body = b''.join(response)
+            finally:
+                response.close()
+            return statuses[0].startswith('200') and json.loads(body)['success']
+
+        start = time.perf_counter()
+
+        def timed(client_headers):
+            ok = request(client_headers)
+            return time.perf_counter() - start, ok
+
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            outcomes = list(executor.map(timed, headers))
+        return self.summarize(outcomes, time.perf_counter() - start)
+
+    async def burst_asgi(self, path, headers):
+        """Send every client's request at once to an ASGI handler on one event loop"""
+        handler = ASGIHandler()
+        disconnected = asyncio.Event()
+
+        async def request(client_headers):
+            scope = {
+                'type': 'http',
+                'asgi': {'version': '3.0'},
+                'http_version': '1.1',
+                'method': 'POST',
+                'scheme': 'http',
+                'path': path,
+                'raw_path': path.encode(),
+                'root_path': '',
+                'query_string': b'',
+                'headers': [
+                    (b'host', b'testserver'),
+                    (b'content-length', b'0'),
+                    (b'cookie', client_headers['cookie'].encode()),
+                    (b'x-csrftoken', client_headers['x-csrftoken'].encode()),
+                ],
+                'client': ('127.0.0.1', 0),
+                'server': ('testserver', 80),
+            }
+            messages = [{'type': 'http.request', 'body': b'', 'more_body': False}]
+
+            async def receive():
+                if messages:
+                    return messages.pop()
+                # The client never disconnects early
+                await disconnected.wait()
+                return {'type': 'http.disconnect'}
+
+            status = None
+            body = []
+
+            async def send(message):
+                nonlocal status
+                if message['type'] == 'http.response.start':
+                    status = message['status']
+                elif message['type'] == 'http.response.body':
+                    body.append(message.get('body', b''))
+
+            await handler(scope, receive, send)
+            return status == 200 and json.loads(b''.join(body))['success']
+
+        start = time.perf_counter()
+
+        async def timed(client_headers):
+            ok = await request(client_headers)
+            return time.perf_counter() - start, ok
+
+        outcomes = await asyncio.gather(*(timed(client_headers) for client_headers in headers))
+        return self.summarize(outcomes, time.perf_counter() - start)
+
+    def summarize(self, outcomes, elapsed):
+        """Latencies from the moment every client sent its request"""
+        latencies = [latency for latency, _ in outcomes]
+        errors = sum(1 for _, ok in outcomes if not ok)
+        return summarize_latencies(latencies, errors, elapsed)
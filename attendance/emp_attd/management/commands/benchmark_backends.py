@@ -0,0 +1,50 @@
+import json
+import os
+import subprocess
+import sys
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from emp_attd.benchmarking import format_result
+
+# Database profiles selectable through the environment; see DATABASES in settings.py
+PROFILES = {
+    'sqlite': {'ATTENDANCE_DB_ENGINE': 'sqlite', 'ATTENDANCE_SQLITE_TUNING': '1'},
+    'sqlite-untuned': {'ATTENDANCE_DB_ENGINE': 'sqlite', 'ATTENDANCE_SQLITE_TUNING': '0'},
+    'postgresql': {'ATTENDANCE_DB_ENGINE': 'postgresql', 'POSTGRES_POOL': '1'},
+    'postgresql-unpooled': {'ATTENDANCE_DB_ENGINE': 'postgresql', 'POSTGRES_POOL': '0'},
+}
+
+class Command(BaseCommand):
+    help = 'Compare database profiles on the concurrent check-in benchmark'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--profiles', nargs='+', choices=sorted(PROFILES), default=['sqlite-untuned', 'sqlite', 'postgresql'],
+            help='Database profiles to benchmark'
+        )
+        parser.add_argument('--employees', type=int, default=2000, help='Number of employees checking in')
+        parser.add_argument('--concurrency', type=int, default=16, help='Number of concurrent clients')
+
+    def handle(self, *args, **options):
+        # Settings are read once per process, so each profile runs in its own process
+        manage_py = os.path.join(settings.BASE_DIR, 'manage.py')
+        for profile in options['profiles']:
+            self.stdout.write(self.style.SUCCESS(f'Profile {profile}:'))
+            completed = subprocess.run(
+                [
+                    sys.executable, manage_py, 'benchmark_check_in', '--json',
+                    '--employees', str(options['employees']),
+                    '--concurrency', str(options['concurrency']),
+                ],
+                env={**os.environ, **PROFILES[profile]},
+                capture_output=True,
+                text=True,
+            )
+            if completed.returncode != 0:
+                error = completed.stderr.strip().splitlines()
+                self.stderr.write(f'  skipped: {error[-1] if error else "benchmark failed"}')
+                continue
+
+            output = json.loads(completed.stdout.strip().splitlines()[-1])
+            for name, result in output['results'].items():
+                self.stdout.write(format_result(name, result))
@@ -0,0 +1,72 @@
+import json
+from django.core.management.base import BaseCommand
+from django.contrib.auth.models import User
+from django.db import transaction
+from datetime import date, time, timedelta
+from employee.models import Employee
+from emp_attd.benchmarking import benchmark_database, format_result, run_concurrently
+from emp_attd.checkins import check_in_with_orm, supports_upsert, upsert_check_in
+from emp_attd.models import Attendance
+from emp_attd.summary import _increment_with_orm, record_check_in
+
+class Command(BaseCommand):
+    help = 'Benchmark the check-in write path under concurrent load on a throwaway database'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--employees', type=int, default=2000, help='Number of employees checking in')
+        parser.add_argument('--concurrency', type=int, default=16, help='Number of concurrent clients')
+        parser.add_argument('--database', default='default', help='Database alias to benchmark')
+        parser.add_argument('--json', action='store_true', help='Print the results as one JSON object')
+
+    def handle(self, *args, **options):
+        with benchmark_database(options['database']) as connection:
+            if not options['json']:
+                self.stdout.write(self.style.SUCCESS(
+                    f'Benchmarking check-in on {connection.vendor} with {options["employees"]} employees '
+                    f'and {options["concurrency"]} concurrent clients...'
+                ))
+            employees = self.seed(options['employees'])
+            # Every employee submits twice so duplicate check-ins race each other
+            tasks = [employee for employee in employees for _ in range(2)]
+
+            paths = [('get_or_create', self.check_in_legacy)]
+            if supports_upsert():
+                paths.append(('upsert', self.check_in_upsert))
+
+            results = {}
+            for offset, (name, check_in) in enumerate(paths):
+                day = date(2025, 3, 3) + timedelta(days=offset)
+                result = run_concurrently(tasks, options['concurrency'], lambda employee: check_in(employee, day))
+                result['rows'] = Attendance.objects.filter(date=day).count()
+                results[name] = result
+                if not options['json']:
+                    self.stdout.write(format_result(name, result))
+
+            if options['json']:
+                self.stdout.write(json.dumps({'vendor': connection.vendor, 'results': results}))
+
+    def seed(self, count):
+        """Create benchmark employees without password hashing"""
+        users = User.objects.bulk_create([
+            User(username=f'bench{index}', email=f'bench{index}@company.com', password='!')
+            for index in range(count)
+        ])
+        Employee.objects.bulk_create([
+            Employee(user=user, employee_id=f'EMP{index:05d}', department='operations', role='staff', hire_date=date(2022, 1, 1))
+            for index, user in enumerate(users)
+        ])
+        return list(Employee.objects.values_list('pk', flat=True))
+
+    def check_in_legacy(self, employee_pk, day):
+        """The check-in write path before upserts: get_or_create plus summary get_or_create"""
+        employee = Employee.objects.select_related('user').get(pk=employee_pk)
+        with transaction.atomic():
+            if check_in_with_orm(employee, day, time(8, 30), False):
+                _increment_with_orm(day, employee.department, {'present_count': 1, 'late_count': 0})
+
+    def check_in_upsert(self, employee_pk, day):
+        """The single-statement check-in write path"""
+        employee = Employee.objects.select_related('user').get(pk=employee_pk)
+        with transaction.atomic():
+            if upsert_check_in(employee, day, time(8, 30), False):
+                record_check_in(day, employee.department, False)
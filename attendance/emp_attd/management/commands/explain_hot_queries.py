@@ -0,0 +1,65 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.contrib.auth.models import User
+from django.db import connection
+from datetime import date
+from employee.models import Employee
+from emp_attd.benchmarking import benchmark_database, get_hot_queries, seed_attendance_history
+
+class Command(BaseCommand):
+    help = 'Check with EXPLAIN that every hot attendance and employee query uses its index'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1_000_000, help='Number of attendance rows to seed')
+        parser.add_argument('--employees', type=int, default=2000, help='Number of employees to seed')
+        parser.add_argument('--database', default='default', help='Database alias to check')
+        parser.add_argument('--verbose-plans', action='store_true', help='Print the full plan of every query')
+
+    def handle(self, *args, **options):
+        with benchmark_database(options['database']) as db:
+            self.stdout.write(self.style.SUCCESS(
+                f'Seeding {options["rows"]} attendance rows for {options["employees"]} employees on {db.vendor}...'
+            ))
+            last_day = self.seed(options['employees'], options['rows'])
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE')
+
+            failures = []
+            for name, queryset, index_names in get_hot_queries(last_day):
+                plan = queryset.explain()
+                used = [index_name for index_name in index_names if index_name in plan]
+                if used:
+                    self.stdout.write(f'{name}: {self.style.SUCCESS("uses")} {used[0]}')
+                else:
+                    failures.append(name)
+                    self.stdout.write(f'{name}: {self.style.ERROR("MISSES")} {" or ".join(index_names)}')
+                if options['verbose_plans'] or not used:
+                    for line in plan.splitlines():
+                        self.stdout.write(f'    {line}')
+
+        if failures:
+            raise CommandError(f'{len(failures)} hot queries do not use their index: {", ".join(failures)}')
+        self.stdout.write(self.style.SUCCESS('Every hot query uses its index.'))
+
+    def seed(self, employee_count, row_count):
+        """Create employees and attendance rows across consecutive days; returns the last day"""
+        departments = [value for value, _ in Employee.DEPARTMENT_CHOICES]
+        roles = ['staff'] * 8 + ['manager', 'hr_admin']
+        users = User.objects.bulk_create([
+            User(username=f'bench{index}', email=f'bench{index}@company.com', password='!')
+            for index in range(employee_count)
+        ])
+        Employee.objects.bulk_create([
+            Employee(
+                user=user,
+                employee_id=f'EMP{index:05d}',
+                department=departments[index % len(departments)],
+                role=roles[index % len(roles)],
+                hire_date=date(2020, 1, 1),
+                is_active=index % 20 != 0,
+            )
+            for index, user in enumerate(users)
+        ])
+        employee_pks = list(Employee.objects.values_list('pk', flat=True))
+
+        days = -(-row_count // len(employee_pks))
+        return seed_attendance_history(employee_pks, date(2020, 1, 1), days, limit=row_count)
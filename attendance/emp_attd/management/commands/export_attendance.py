@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand, CommandError
+from datetime import date
+from employee.models import Employee
+from emp_attd.exporting import EXPORT_FORMATS, export_lines, get_export_rows
+
+class Command(BaseCommand):
+    help = 'Stream attendance rows for a date range as CSV or JSON Lines'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start', required=True, help='First date to export (YYYY-MM-DD)')
+        parser.add_argument('--end', required=True, help='Last date to export (YYYY-MM-DD)')
+        parser.add_argument('--department', choices=[value for value, _ in Employee.DEPARTMENT_CHOICES], help='Only export this department')
+        parser.add_argument('--format', choices=EXPORT_FORMATS, default='csv', help='Output format')
+        parser.add_argument('--output', help='File to write to (default: standard output)')
+
+    def handle(self, *args, **options):
+        try:
+            start_date = date.fromisoformat(options['start'])
+            end_date = date.fromisoformat(options['end'])
+        except ValueError:
+            raise CommandError('Dates must use the YYYY-MM-DD format.')
+        if start_date > end_date:
+            raise CommandError('--start must not be after --end.')
+
+        rows = get_export_rows(start_date, end_date, options['department'])
+        lines = export_lines(options['format'], rows)
+        if options['output']:
+            with open(options['output'], 'w', newline='', encoding='utf-8') as output:
+                output.writelines(lines)
+            self.stdout.write(self.style.SUCCESS(f'Attendance exported to {options["output"]}'))
+        else:
+            for line in lines:
+                self.stdout.write(line, ending='')
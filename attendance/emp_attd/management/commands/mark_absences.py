@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from datetime import date, timedelta
+from emp_attd.absences import get_working_days, mark_absences
+from emp_attd.archive import get_archived_days
+from emp_attd.reports import get_rolled_up_months, rebuild_monthly_timesheets
+
+class Command(BaseCommand):
+    help = 'Record an absence for every active employee without attendance on days that are over'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start', help='First date to mark (YYYY-MM-DD), defaults to yesterday')
+        parser.add_argument('--end', help='Last date to mark (YYYY-MM-DD), defaults to the start date')
+        parser.add_argument('--include-weekends', action='store_true', help='Also mark Saturdays and Sundays')
+
+    def parse_date(self, value):
+        try:
+            return date.fromisoformat(value)
+        except ValueError:
+            raise CommandError(f'Invalid date "{value}". Use the YYYY-MM-DD format.')
+
+    def handle(self, *args, **options):
+        today = timezone.localtime().date()
+        start_date = self.parse_date(options['start']) if options['start'] else today - timedelta(days=1)
+        end_date = self.parse_date(options['end']) if options['end'] else start_date
+
+        if end_date < start_date:
+            raise CommandError('The end date must not be before the start date.')
+        if end_date >= today:
+            raise CommandError('Only days that are over can be marked; employees can still check in today.')
+
+        days = get_working_days(start_date, end_date, options['include_weekends'])
+        archived = get_archived_days(start_date, end_date).intersection(days)
+        if archived:
+            raise CommandError(f'{min(archived)} has already been archived; only days in the hot table can be marked.')
+        inserted = mark_absences(days)
+        self.stdout.write(self.style.SUCCESS(
+            f'Marked {sum(inserted.values())} absences over {len(days)} days from {start_date} to {end_date}'
+        ))
+
+        # Stored timesheets of months that were already rolled up are now stale
+        months = {day.replace(day=1) for day, count in inserted.items() if count}
+        for month in sorted(get_rolled_up_months(months)):
+            count = rebuild_monthly_timesheets(month.year, month.month)
+            self.stdout.write(self.style.SUCCESS(f'Rebuilt {count} timesheets for {month:%Y-%m}'))
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from datetime import date
+from emp_attd.summary import rebuild_daily_summaries
+
+class Command(BaseCommand):
+    help = 'Rebuild daily attendance summaries for a date range'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start', help='First date to rebuild (YYYY-MM-DD), defaults to today')
+        parser.add_argument('--end', help='Last date to rebuild (YYYY-MM-DD), defaults to the start date')
+
+    def parse_date(self, value):
+        try:
+            return date.fromisoformat(value)
+        except ValueError:
+            raise CommandError(f'Invalid date "{value}". Use the YYYY-MM-DD format.')
+
+    def handle(self, *args, **options):
+        start_date = self.parse_date(options['start']) if options['start'] else timezone.localtime().date()
+        end_date = self.parse_date(options['end']) if options['end'] else start_date
+
+        if end_date < start_date:
+            raise CommandError('The end date must not be before the start date.')
+
+        self.stdout.write(self.style.SUCCESS(f'Rebuilding attendance summaries from {start_date} to {end_date}...'))
+        count = rebuild_daily_summaries(start_date, end_date)
+        self.stdout.write(self.style.SUCCESS(f'Successfully rebuilt {count} summary rows'))
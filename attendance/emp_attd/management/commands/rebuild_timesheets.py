@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from datetime import timedelta
+from emp_attd.reports import rebuild_monthly_timesheets
+
+class Command(BaseCommand):
+    help = 'Roll up the monthly timesheets of closed months'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--year', type=int, help='Year to rebuild, defaults to the year of the previous month')
+        parser.add_argument('--month', type=int, help='Month to rebuild (1-12), defaults to every closed month of the year')
+
+    def handle(self, *args, **options):
+        current_month = timezone.localtime().date().replace(day=1)
+        previous_month = (current_month - timedelta(days=1)).replace(day=1)
+        year = options['year'] or previous_month.year
+        month = options['month']
+        if month is not None and not 1 <= month <= 12:
+            raise CommandError('--month must be between 1 and 12.')
+        if options['year'] is None and month is None:
+            month = previous_month.month
+
+        months = [month] if month else range(1, 13)
+        closed = [m for m in months if (year, m) < (current_month.year, current_month.month)]
+        if not closed:
+            raise CommandError('Only months that have ended can be rolled up; the current month is always computed live.')
+
+        for m in closed:
+            count = rebuild_monthly_timesheets(year, m)
+            self.stdout.write(self.style.SUCCESS(f'Rebuilt {count} timesheets for {year}-{m:02d}'))
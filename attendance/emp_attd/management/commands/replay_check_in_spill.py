@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+from emp_attd.buffer import get_buffer_settings, replay_spill_files
+
+class Command(BaseCommand):
+    help = 'Write buffered check-ins left in spill files by stopped processes to the database'
+
+    def handle(self, *args, **options):
+        spill_dir = get_buffer_settings()['SPILL_DIR']
+        self.stdout.write(self.style.SUCCESS(f'Replaying buffered check-ins from {spill_dir}...'))
+        recorded = replay_spill_files(spill_dir)
+        self.stdout.write(self.style.SUCCESS(f'Successfully recorded {recorded} check-ins'))
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-17 17:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('emp_attd', '0002_fix_date_field_default'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyAttendanceSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('department', models.CharField(choices=[('human_resources', 'Human Resources'), ('information_technology', 'Information Technology'), ('finance', 'Finance'), ('sales', 'Sales'), ('marketing', 'Marketing'), ('operations', 'Operations')], max_length=30)),
+                ('present_count', models.PositiveIntegerField(default=0)),
+                ('late_count', models.PositiveIntegerField(default=0)),
+                ('checked_out_count', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Daily Attendance Summary',
+                'verbose_name_plural': 'Daily Attendance Summaries',
+                'ordering': ['-date', 'department'],
+                'unique_together': {('date', 'department')},
+            },
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-17 17:27
+
+from django.db import migrations, models
+import emp_attd.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('emp_attd', '0003_daily_attendance_summary'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='attendance',
+            index=emp_attd.models.CoveringIndex(fields=['date', 'status'], covering=('employee', 'is_late', 'check_out_time'), name='attendance_date_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='attendance',
+            index=models.Index(fields=['date', 'is_late'], name='attendance_date_is_late_idx'),
+        ),
+    ]
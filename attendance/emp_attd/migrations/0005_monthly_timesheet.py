@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-17 17:50
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('emp_attd', '0004_hot_query_indexes'),
+        ('employee', '0003_hot_query_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MonthlyTimesheet',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField(help_text='First day of the month')),
+                ('days_present', models.PositiveIntegerField(default=0)),
+                ('late_days', models.PositiveIntegerField(default=0)),
+                ('absent_days', models.PositiveIntegerField(default=0)),
+                ('worked_seconds', models.FloatField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('employee', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='employee.employee')),
+            ],
+            options={
+                'verbose_name': 'Monthly Timesheet',
+                'verbose_name_plural': 'Monthly Timesheets',
+                'ordering': ['-month', 'employee'],
+                'indexes': [models.Index(fields=['month', 'employee'], name='timesheet_month_employee_idx')],
+                'unique_together': {('employee', 'month')},
+            },
+        ),
+    ]
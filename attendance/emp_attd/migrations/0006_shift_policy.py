@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-17 18:22
+
+import datetime
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('emp_attd', '0005_monthly_timesheet'),
+        ('employee', '0003_hot_query_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ShiftPolicy',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('department', models.CharField(blank=True, choices=[('human_resources', 'Human Resources'), ('information_technology', 'Information Technology'), ('finance', 'Finance'), ('sales', 'Sales'), ('marketing', 'Marketing'), ('operations', 'Operations')], max_length=30, null=True)),
+                ('weekday', models.PositiveSmallIntegerField(blank=True, choices=[(0, 'Monday'), (1, 'Tuesday'), (2, 'Wednesday'), (3, 'Thursday'), (4, 'Friday'), (5, 'Saturday'), (6, 'Sunday')], help_text='Leave empty for every day', null=True)),
+                ('check_in_start', models.TimeField(default=datetime.time(8, 0))),
+                ('check_in_end', models.TimeField(default=datetime.time(9, 15))),
+                ('late_after', models.TimeField(default=datetime.time(9, 15), help_text='Check-ins after this time are late')),
+                ('check_out_after', models.TimeField(default=datetime.time(17, 0))),
+                ('minimum_hours', models.DecimalField(decimal_places=2, default=8, max_digits=4)),
+                ('is_active', models.BooleanField(default=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('employee', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='employee.employee')),
+            ],
+            options={
+                'verbose_name': 'Shift Policy',
+                'verbose_name_plural': 'Shift Policies',
+                'ordering': ['name'],
+            },
+        ),
+    ]
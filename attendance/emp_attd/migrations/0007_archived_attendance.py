@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-17 18:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('emp_attd', '0006_shift_policy'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedAttendance',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('chunk', models.PositiveIntegerField(default=0)),
+                ('entries', models.JSONField()),
+                ('row_count', models.PositiveIntegerField(default=0)),
+                ('archived_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Archived Attendance',
+                'verbose_name_plural': 'Archived Attendance',
+                'ordering': ['date', 'chunk'],
+                'unique_together': {('date', 'chunk')},
+            },
+        ),
+    ]
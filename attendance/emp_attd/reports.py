@@ -0,0 +1,179 @@
+from calendar import monthrange
+from datetime import date
+from operator import itemgetter
+from django.db.models import Count, F, FloatField, Func, Q, Sum
+from django.db import transaction
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from employee.models import Employee
+from .archive import get_archived_timesheet_rows
+from .models import Attendance, MonthlyTimesheet
+
+# Monthly timesheets computed in aggregate SQL. Each month is one GROUP BY
+# employee query over its date range, with work durations computed by the
+# database. Closed months are rolled up into MonthlyTimesheet by the
+# rebuild_timesheets command, so a year-long report reads one stored row per
+# employee and month and only aggregates the raw attendance of months that
+# are still open or have not been rolled up yet. Rollups include archived
+# days, and archive_attendance rolls up every month it archives, so archived
+# months are always read from their rollups. Department totals are summed
+# from the per-employee rows.
+
+TIMESHEET_FIELDS = ['days_present', 'late_days', 'absent_days', 'worked_seconds']
+
+
+class WorkedSeconds(Func):
+    """Seconds between a check-in and a check-out TimeField, computed by the database.
+
+    Django's own TimeField subtraction calls a Python function per row on
+    SQLite, which is far too slow for report-sized scans.
+    """
+    arity = 2
+    output_field = FloatField()
+    template = 'EXTRACT(EPOCH FROM (%(expressions)s))'
+    arg_joiner = ' - '
+
+    def __init__(self, check_in, check_out, **extra):
+        super().__init__(check_out, check_in, **extra)
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        return self.as_sql(
+            compiler, connection,
+            template='((julianday(%(expressions)s)) * 86400.0)',
+            arg_joiner=') - julianday(',
+            **extra_context,
+        )
+
+    def as_mysql(self, compiler, connection, **extra_context):
+        return self.as_sql(compiler, connection, template='TIME_TO_SEC(TIMEDIFF(%(expressions)s))', arg_joiner=', ', **extra_context)
+
+
+def month_ranges(year, month=None):
+    """(first day, last day) of every month in a year, or of a single month"""
+    months = [month] if month else range(1, 13)
+    return [(date(year, m, 1), date(year, m, monthrange(year, m)[1])) for m in months]
+
+def _timesheet_rows(start_date, end_date, department=None):
+    """Per-employee totals for one date range in a single aggregate query"""
+    attendance = Attendance.objects.filter(date__range=(start_date, end_date))
+    if department:
+        attendance = attendance.filter(employee__department=department)
+    worked = Q(check_in_time__isnull=False, check_out_time__isnull=False)
+    return (
+        attendance
+        .order_by()
+        .values('employee_id')
+        .annotate(
+            days_present=Count('id', filter=Q(status__in=['present', 'late'])),
+            late_days=Count('id', filter=Q(is_late=True)),
+            absent_days=Count('id', filter=Q(status='absent')),
+            worked_seconds=Coalesce(Sum(WorkedSeconds(F('check_in_time'), F('check_out_time')), filter=worked), 0.0),
+        )
+    )
+
+def get_rolled_up_months(month_starts):
+    """Get which of the given months have stored timesheets"""
+    return set(
+        MonthlyTimesheet.objects.filter(month__in=month_starts)
+        .order_by().values_list('month', flat=True).distinct()
+    )
+
+def rebuild_monthly_timesheets(year, month):
+    """Recompute the stored timesheets of a closed month from the attendance table"""
+    start_date, end_date = month_ranges(year, month)[0]
+    with transaction.atomic():
+        # Archived days are added to the totals of the hot rows
+        totals = {row['employee_id']: dict(row) for row in _timesheet_rows(start_date, end_date)}
+        for row in get_archived_timesheet_rows(start_date, end_date):
+            total = totals.setdefault(row['employee_id'], dict.fromkeys(TIMESHEET_FIELDS, 0))
+            for field in TIMESHEET_FIELDS:
+                total[field] += row[field]
+        timesheets = [
+            MonthlyTimesheet(month=start_date, employee_id=employee_pk, **{field: row[field] for field in TIMESHEET_FIELDS})
+            for employee_pk, row in totals.items()
+        ]
+        MonthlyTimesheet.objects.filter(month=start_date).delete()
+        MonthlyTimesheet.objects.bulk_create(timesheets, batch_size=1000)
+    return len(timesheets)
+
+def get_employee_timesheets(year, month=None, department=None):
+    """Get hours worked, present, late and absent days per employee and month.
+
+    Returns a list of dicts ordered by month and employee ID.
+    """
+    employees = Employee.objects.order_by()
+    if department:
+        employees = employees.filter(department=department)
+    details = {
+        pk: {
+            'employee_id': employee_id,
+            'name': f'{first_name} {last_name}'.strip() or username,
+            'department': employee_department,
+        }
+        for pk, employee_id, employee_department, first_name, last_name, username in employees.values_list(
+            'pk', 'employee_id', 'department', 'user__first_name', 'user__last_name', 'user__username',
+        )
+    }
+
+    # Closed months are read from the rollups, one query per month
+    current_month = timezone.localtime().date().replace(day=1)
+    ranges = month_ranges(year, month)
+    rolled_up = get_rolled_up_months([start for start, _ in ranges if start < current_month])
+    stored = MonthlyTimesheet.objects.order_by()
+    if department:
+        stored = stored.filter(employee__department=department)
+
+    timesheets = []
+    for start_date, end_date in ranges:
+        if start_date in rolled_up:
+            rows = stored.filter(month=start_date).values('employee_id', *TIMESHEET_FIELDS)
+        else:
+            rows = _timesheet_rows(start_date, end_date, department)
+        label = start_date.strftime('%Y-%m')
+        month_rows = []
+        for row in rows:
+            employee = details.get(row['employee_id'])
+            if employee is None:
+                continue  # Created after the employee details were read
+            month_rows.append({
+                'month': label,
+                'employee_id': employee['employee_id'],
+                'name': employee['name'],
+                'department': employee['department'],
+                'days_present': row['days_present'],
+                'late_days': row['late_days'],
+                'absent_days': row['absent_days'],
+                'hours_worked': round(row['worked_seconds'] / 3600, 2),
+            })
+        month_rows.sort(key=itemgetter('employee_id'))
+        timesheets.extend(month_rows)
+    return timesheets
+
+def get_department_timesheets(employee_timesheets):
+    """Sum employee timesheets into totals per department and month"""
+    labels = dict(Employee.DEPARTMENT_CHOICES)
+    totals = {}
+    for row in employee_timesheets:
+        key = (row['month'], row['department'])
+        total = totals.setdefault(key, {
+            'month': row['month'],
+            'department': row['department'],
+            'department_display': labels.get(row['department'], row['department']),
+            'employees': 0,
+            'days_present': 0,
+            'late_days': 0,
+            'absent_days': 0,
+            'hours_worked': 0.0,
+        })
+        total['employees'] += 1
+        total['days_present'] += row['days_present']
+        total['late_days'] += row['late_days']
+        total['absent_days'] += row['absent_days']
+        total['hours_worked'] += row['hours_worked']
+
+    department_order = {value: index for index, (value, _) in enumerate(Employee.DEPARTMENT_CHOICES)}
+    rows = sorted(totals.values(), key=lambda row: (row['month'], department_order.get(row['department'], len(department_order))))
+    for row in rows:
+        row['hours_worked'] = round(row['hours_worked'], 2)
+        row['average_hours_per_day'] = round(row['hours_worked'] / row['days_present'], 2) if row['days_present'] else 0.0
+    return rows
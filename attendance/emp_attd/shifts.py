@@ -0,0 +1,169 @@
+import threading
+from datetime import time, timedelta
+from time import monotonic
+from types import MappingProxyType
+from typing import NamedTuple
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from .models import ShiftPolicy
+
+# Shift rules for the check-in and check-out views. The active ShiftPolicy
+# rows are compiled into an immutable ShiftTable with one entry per employee
+# or department and weekday, so resolving the shift of a check-in is a dict
+# lookup with no query. The table is built with a single query on first use,
+# dropped when a policy is saved or deleted in this process, and rebuilt
+# after a TTL so other processes pick up changes too.
+
+DEFAULT_SETTINGS = {
+    'TTL': 300,  # seconds before another process's policy changes are picked up
+}
+
+WEEKDAYS = range(7)
+
+
+class Shift(NamedTuple):
+    """The check-in and check-out rules of one working day"""
+    check_in_start: time
+    check_in_end: time
+    late_after: time
+    check_out_after: time
+    minimum_hours: float
+
+    def allows_check_in(self, current_time):
+        """Check if a time is inside the check-in window"""
+        return self.check_in_start <= current_time <= self.check_in_end
+
+    def is_late(self, check_in_time):
+        """Check if a check-in time is late"""
+        return check_in_time > self.late_after
+
+    def allows_check_out(self, current_time):
+        """Check if a time is late enough to check out"""
+        return current_time >= self.check_out_after
+
+    @property
+    def minimum_work(self):
+        """Minimum time between check-in and check-out"""
+        return timedelta(hours=self.minimum_hours)
+
+
+# The rules used when no policy applies
+DEFAULT_SHIFT = Shift(time(8, 0), time(9, 15), time(9, 15), time(17, 0), 8.0)
+
+
+class ShiftTable:
+    """Read-only lookup of the shift for an employee, department and weekday"""
+
+    def __init__(self, employees, departments, defaults):
+        self.employees = MappingProxyType(employees)
+        self.departments = MappingProxyType(departments)
+        self.defaults = tuple(defaults)
+
+    def resolve(self, employee_pk, department, weekday):
+        """Get the most specific shift: employee, then department, then default"""
+        shift = self.employees.get((employee_pk, weekday))
+        if shift is None:
+            shift = self.departments.get((department, weekday))
+        if shift is None:
+            shift = self.defaults[weekday]
+        return shift
+
+
+def _shift(policy):
+    return Shift(
+        policy.check_in_start,
+        policy.check_in_end,
+        policy.late_after,
+        policy.check_out_after,
+        float(policy.minimum_hours),
+    )
+
+def compile_shift_table(policies):
+    """Compile shift policies into a ShiftTable"""
+    employees = {}
+    departments = {}
+    defaults = [DEFAULT_SHIFT] * 7
+    # Every-day policies first, so weekday policies overwrite them
+    for policy in sorted(policies, key=lambda policy: (policy.weekday is not None, policy.pk or 0)):
+        shift = _shift(policy)
+        weekdays = WEEKDAYS if policy.weekday is None else [policy.weekday]
+        for weekday in weekdays:
+            if policy.employee_id:
+                employees[(policy.employee_id, weekday)] = shift
+            elif policy.department:
+                departments[(policy.department, weekday)] = shift
+            else:
+                defaults[weekday] = shift
+    return ShiftTable(employees, departments, defaults)
+
+
+class ShiftTableCache:
+    def __init__(self, ttl=300):
+        self.ttl = ttl
+        self.table = None
+        self.expires = 0
+        # Bumped on every change, so a table compiled from rows read before
+        # the change is not kept
+        self.generation = 0
+        self.lock = threading.Lock()
+
+    def get(self):
+        """Get the compiled table, or None when it needs to be rebuilt"""
+        with self.lock:
+            if self.table is None or self.expires < monotonic():
+                return None
+            return self.table
+
+    def set(self, table, generation):
+        """Keep a table compiled during `generation`, unless a change came since"""
+        with self.lock:
+            if generation == self.generation:
+                self.table = table
+                self.expires = monotonic() + self.ttl
+
+    def clear(self):
+        with self.lock:
+            self.table = None
+            self.generation += 1
+
+
+def _build_cache():
+    options = dict(DEFAULT_SETTINGS)
+    options.update(getattr(settings, 'ATTENDANCE_SHIFT_POLICIES', {}))
+    return ShiftTableCache(ttl=options['TTL'])
+
+shift_table_cache = _build_cache()
+
+def get_shift_table():
+    """Get the compiled shift table, building it with one query when needed"""
+    table = shift_table_cache.get()
+    if table is None:
+        generation = shift_table_cache.generation
+        table = compile_shift_table(ShiftPolicy.objects.filter(is_active=True))
+        shift_table_cache.set(table, generation)
+    return table
+
+async def aget_shift_table():
+    """Async version of get_shift_table, for async views"""
+    table = shift_table_cache.get()
+    if table is None:
+        table = await sync_to_async(get_shift_table)()
+    return table
+
+def get_shift(employee, day):
+    """Get the shift an employee works on a day"""
+    return get_shift_table().resolve(employee.pk, employee.department, day.weekday())
+
+async def aget_shift(employee, day):
+    """Async version of get_shift, for async views"""
+    return (await aget_shift_table()).resolve(employee.pk, employee.department, day.weekday())
+
+@receiver(post_save, sender=ShiftPolicy)
+@receiver(post_delete, sender=ShiftPolicy)
+def invalidate_shift_table(sender, instance, **kwargs):
+    # Again once committed, in case the table was rebuilt from the old rows
+    shift_table_cache.clear()
+    transaction.on_commit(shift_table_cache.clear)
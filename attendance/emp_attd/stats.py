@@ -0,0 +1,65 @@
+from django.db.models import Count, Max, Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from employee.models import Employee
+from .models import DailyAttendanceSummary
+
+# Dashboard statistics computed with aggregate queries, so the number
+# of queries stays fixed no matter how many employees or departments exist.
+
+def get_attendance_counts(today=None):
+    """Get present and late counts for a date, and when they last changed, from the daily summary rows"""
+    if today is None:
+        today = timezone.localtime().date()
+
+    return DailyAttendanceSummary.objects.filter(date=today).aggregate(
+        present_count=Coalesce(Sum('present_count'), 0),
+        late_count=Coalesce(Sum('late_count'), 0),
+        counts_updated_at=Max('updated_at'),
+    )
+
+def get_headcount_stats():
+    """Get total, active, per-department and per-role headcount in a single query"""
+    rows = (
+        Employee.objects.order_by()
+        .values('department', 'role', 'is_active')
+        .annotate(count=Count('id'))
+    )
+
+    total_employees = 0
+    active_employees = 0
+    dept_counts = {}
+    role_counts = {}
+    for row in rows:
+        count = row['count']
+        total_employees += count
+        if row['is_active']:
+            active_employees += count
+        dept_counts[row['department']] = dept_counts.get(row['department'], 0) + count
+        role_counts[row['role']] = role_counts.get(row['role'], 0) + count
+
+    # Keep the choice order so the dashboard layout is stable between requests
+    dept_stats = {
+        label: dept_counts[value]
+        for value, label in Employee.DEPARTMENT_CHOICES
+        if value in dept_counts
+    }
+    role_stats = {value: role_counts.get(value, 0) for value, _ in Employee.ROLE_CHOICES}
+
+    return {
+        'total_employees': total_employees,
+        'active_employees': active_employees,
+        'dept_stats': dept_stats,
+        'role_stats': role_stats,
+    }
+
+def get_dashboard_stats(today=None):
+    """Get every dashboard metric for a date using two aggregate queries"""
+    if today is None:
+        today = timezone.localtime().date()
+
+    stats = get_headcount_stats()
+    stats.update(get_attendance_counts(today))
+    stats['absent_count'] = stats['active_employees'] - stats['present_count']
+    stats['today'] = today
+    return stats
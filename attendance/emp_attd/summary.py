@@ -0,0 +1,110 @@
+from datetime import timedelta
+from django.db import connection, transaction
+from django.db.models import Count, F, Q
+from django.utils import timezone
+from attendance.fragments import attendance_scope, bump_fragment_versions_on_commit
+from .archive import get_archived_summary_rows
+from .checkins import supports_upsert
+from .models import Attendance, DailyAttendanceSummary
+
+# Helpers that keep DailyAttendanceSummary in step with Attendance. The
+# record_* functions must be called inside the transaction that writes the
+# attendance row, so the counters never drift from the rows they describe.
+# Every change bumps the day's dashboard fragment version.
+
+def _increment(date_obj, department, **deltas):
+    """Add deltas to the summary row for a date and department"""
+    if supports_upsert():
+        _increment_with_upsert(date_obj, department, deltas)
+    else:
+        _increment_with_orm(date_obj, department, deltas)
+    bump_fragment_versions_on_commit(attendance_scope(date_obj))
+
+def _increment_with_orm(date_obj, department, deltas):
+    """Add deltas to the summary row with get_or_create and an F() update"""
+    summary, _ = DailyAttendanceSummary.objects.get_or_create(date=date_obj, department=department)
+    DailyAttendanceSummary.objects.filter(pk=summary.pk).update(
+        **{field: F(field) + delta for field, delta in deltas.items()},
+        updated_at=timezone.now(),
+    )
+
+def _increment_with_upsert(date_obj, department, deltas):
+    """Add deltas to the summary row in a single INSERT ... ON CONFLICT statement"""
+    ops = connection.ops
+    quote = ops.quote_name
+    opts = DailyAttendanceSummary._meta
+    counters = ['present_count', 'late_count', 'checked_out_count']
+    columns = [quote(opts.get_field(name).column) for name in ['date', 'department', *counters, 'updated_at']]
+    updates = [
+        f'{quote(opts.get_field(name).column)} = {quote(opts.db_table)}.{quote(opts.get_field(name).column)} '
+        f'+ EXCLUDED.{quote(opts.get_field(name).column)}'
+        for name in counters
+    ]
+    updated_at = quote(opts.get_field('updated_at').column)
+    sql = (
+        f'INSERT INTO {quote(opts.db_table)} ({", ".join(columns)}) '
+        f'VALUES ({", ".join(["%s"] * len(columns))}) '
+        f'ON CONFLICT ({columns[0]}, {columns[1]}) DO UPDATE SET '
+        f'{", ".join(updates)}, {updated_at} = EXCLUDED.{updated_at}'
+    )
+    params = [
+        ops.adapt_datefield_value(date_obj),
+        department,
+        *[deltas.get(name, 0) for name in counters],
+        ops.adapt_datetimefield_value(timezone.now()),
+    ]
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+
+def record_check_in(date_obj, department, is_late):
+    """Count a new check-in in the daily summary"""
+    _increment(date_obj, department, present_count=1, late_count=1 if is_late else 0)
+
+def record_check_ins(check_ins):
+    """Count a batch of new check-ins given as (date, department, is_late) tuples"""
+    deltas = {}
+    for date_obj, department, is_late in check_ins:
+        counts = deltas.setdefault((date_obj, department), {'present_count': 0, 'late_count': 0})
+        counts['present_count'] += 1
+        counts['late_count'] += 1 if is_late else 0
+    for (date_obj, department), counts in deltas.items():
+        _increment(date_obj, department, **counts)
+
+def record_check_out(date_obj, department):
+    """Count a new check-out in the daily summary"""
+    _increment(date_obj, department, checked_out_count=1)
+
+def get_daily_summary_rows(start_date, end_date):
+    """Get summary counts per date and department straight from the attendance table"""
+    return (
+        Attendance.objects.filter(date__range=(start_date, end_date))
+        .order_by()
+        .values('date', 'employee__department')
+        .annotate(
+            present_count=Count('id', filter=Q(status__in=['present', 'late'])),
+            late_count=Count('id', filter=Q(is_late=True)),
+            checked_out_count=Count('id', filter=Q(check_out_time__isnull=False)),
+        )
+    )
+
+def rebuild_daily_summaries(start_date, end_date):
+    """Recompute summary rows for a date range from the attendance table"""
+    with transaction.atomic():
+        # Archived days are counted together with the hot rows
+        counters = ['present_count', 'late_count', 'checked_out_count']
+        totals = {}
+        for row in [*get_daily_summary_rows(start_date, end_date), *get_archived_summary_rows(start_date, end_date)]:
+            total = totals.setdefault((row['date'], row['employee__department']), dict.fromkeys(counters, 0))
+            for counter in counters:
+                total[counter] += row[counter]
+        summaries = [
+            DailyAttendanceSummary(date=date_obj, department=department, **counts)
+            for (date_obj, department), counts in totals.items()
+        ]
+        DailyAttendanceSummary.objects.filter(date__range=(start_date, end_date)).delete()
+        DailyAttendanceSummary.objects.bulk_create(summaries)
+        day = start_date
+        while day <= end_date:
+            bump_fragment_versions_on_commit(attendance_scope(day))
+            day += timedelta(days=1)
+    return len(summaries)
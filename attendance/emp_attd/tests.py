@@ -1,3 +1,1116 @@
-from django.test import TestCase
+from django.test import AsyncClient, AsyncRequestFactory, Client, TestCase, override_settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.core.exceptions import ValidationError
+from django.http import HttpResponse
+from django.urls import path, reverse
+from django.utils import timezone
+from datetime import date, datetime, time, timedelta
+from io import StringIO
+import asyncio
+import gzip
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from unittest import mock
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from attendance.fragments import bump_fragment_versions, get_fragment_versions
+from attendance.staticfiles import StaticAssetMiddleware
+from employee.cache import employee_cache
+from employee.models import Employee
+from employee.tests import seed_employees
+from .absences import get_working_days, mark_absences
+from .archive import archive_day, iter_archived_days
+from .benchmarking import get_hot_queries
+from .models import ArchivedAttendance, Attendance, DailyAttendanceSummary, MonthlyTimesheet, ShiftPolicy
+from .reports import get_department_timesheets, get_employee_timesheets, rebuild_monthly_timesheets
+from . import views
+from .stats import get_dashboard_stats
+from .buffer import CheckInBuffer, get_check_in_buffer, replay_spill_files, shutdown_check_in_buffer, write_events
+from .live import AttendanceHub, Subscription, check_in_event, get_hub, poll_events
+from .shifts import DEFAULT_SHIFT, Shift, compile_shift_table, get_shift, get_shift_table, shift_table_cache
+from .checkins import check_in_with_orm, check_out_with_orm, complete_check_out, upsert_check_in
+from .summary import rebuild_daily_summaries
 
 # Create your tests here.
+
+def create_employee(index, department='finance', role='staff', is_active=True):
+    """Create a user and employee profile for tests"""
+    user = User.objects.create_user(
+        username=f'user{index}',
+        first_name='Test',
+        last_name=f'User{index}',
+        email=f'user{index}@company.com',
+        password='password123',
+    )
+    return Employee.objects.create(
+        user=user,
+        employee_id=f'EMP{index:03d}',
+        department=department,
+        role=role,
+        hire_date=date(2022, 1, 1),
+        is_active=is_active,
+    )
+
+
+class DashboardStatsTests(TestCase):
+    def setUp(self):
+        self.today = timezone.localtime().date()
+
+    def test_counts(self):
+        manager = create_employee(1, department='operations', role='manager')
+        hr = create_employee(2, department='human_resources', role='hr_admin')
+        staff = create_employee(3, department='finance')
+        create_employee(4, department='finance', is_active=False)
+        Attendance.objects.create(employee=manager, date=self.today, check_in_time=time(8, 30), status='present')
+        Attendance.objects.create(employee=hr, date=self.today, check_in_time=time(9, 20), status='late', is_late=True)
+        Attendance.objects.create(employee=staff, date=date(2024, 1, 2), status='present')
+        rebuild_daily_summaries(date(2024, 1, 1), self.today)
+
+        stats = get_dashboard_stats(self.today)
+
+        self.assertEqual(stats['total_employees'], 4)
+        self.assertEqual(stats['active_employees'], 3)
+        self.assertEqual(stats['present_count'], 2)
+        self.assertEqual(stats['late_count'], 1)
+        # Inactive staff are not counted as absent
+        self.assertEqual(stats['absent_count'], 1)
+        self.assertEqual(stats['role_stats'], {'manager': 1, 'hr_admin': 1, 'staff': 2})
+        self.assertEqual(stats['dept_stats'], {'Human Resources': 1, 'Finance': 2, 'Operations': 1})
+
+    def test_query_count_is_fixed(self):
+        departments = [value for value, _ in Employee.DEPARTMENT_CHOICES]
+        create_employee(1)
+        with self.assertNumQueries(2):
+            get_dashboard_stats(self.today)
+
+        for index in range(2, 40):
+            employee = create_employee(index, department=departments[index % len(departments)])
+            Attendance.objects.create(employee=employee, date=self.today, check_in_time=time(8, 30), status='present')
+        rebuild_daily_summaries(self.today, self.today)
+        with self.assertNumQueries(2):
+            stats = get_dashboard_stats(self.today)
+        self.assertEqual(len(stats['dept_stats']), len(departments))
+
+
+class DashboardFragmentCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.day = date(2025, 3, 3)
+        self.hr = create_employee(1, department='human_resources', role='hr_admin')
+        self.staff = create_employee(2, department='finance')
+        self.colleague = create_employee(3, department='finance')
+        employee_cache.clear()
+
+    def get(self, employee, url_name):
+        self.client.force_login(employee.user)
+        with frozen_now(10, 0, self.day):
+            return self.client.get(reverse(url_name)).content.decode()
+
+    def test_versions_start_from_the_clock_and_bump(self):
+        first = get_fragment_versions('test')['test']
+        self.assertGreater(first, 1000)
+        self.assertEqual(get_fragment_versions('test')['test'], first)
+        bump_fragment_versions('test', 'never-started')
+        self.assertEqual(get_fragment_versions('test')['test'], first + 1)
+
+    def test_hr_dashboard_renders_from_cache_until_a_change(self):
+        self.get(self.hr, 'hr_dashboard')
+        # Only the session, user, profile and own attendance (checked for
+        # the ETag, then read) are read, no headcount or attendance counts
+        self.client.force_login(self.hr.user)
+        with frozen_now(10, 0, self.day), self.assertNumQueries(5):
+            self.client.get(reverse('hr_dashboard'))
+
+        # A check-in bumps the day's attendance version
+        self.client.force_login(self.staff.user)
+        with frozen_now(8, 30, self.day):
+            self.client.post(reverse('check_in'))
+        page = self.get(self.hr, 'hr_dashboard')
+        self.assertIn('<h2 data-live-counter="present_count">1</h2>', page)
+
+        # A new employee bumps the employees version
+        create_employee(4, department='sales')
+        page = self.get(self.hr, 'hr_dashboard')
+        self.assertIn('<h2>4</h2>', page)
+        self.assertIn('<strong>Sales</strong>', page)
+
+    def test_manager_dashboard_counts_follow_role_changes(self):
+        manager = create_employee(4, department='operations', role='manager')
+        self.assertIn('<h3>2</h3>', self.get(manager, 'manager_dashboard'))
+        self.colleague.role = 'hr_admin'
+        self.colleague.save()
+        self.assertIn('<h3>1</h3>', self.get(manager, 'manager_dashboard'))
+
+    def test_colleague_list_follows_department_changes(self):
+        self.assertIn('EMP003', self.get(self.staff, 'employee_dashboard'))
+        # The colleagues are not read again
+        self.client.force_login(self.staff.user)
+        with frozen_now(10, 0, self.day), self.assertNumQueries(5):
+            self.client.get(reverse('employee_dashboard'))
+
+        # Moving the colleague away bumps both departments
+        sales = create_employee(4, department='sales')
+        self.get(sales, 'employee_dashboard')
+        colleague = Employee.objects.get(pk=self.colleague.pk)
+        colleague.department = 'sales'
+        colleague.save()
+        self.assertNotIn('EMP003', self.get(self.staff, 'employee_dashboard'))
+        self.assertIn('EMP003', self.get(sales, 'employee_dashboard'))
+
+    def test_colleague_list_is_shared_by_the_department(self):
+        self.get(self.staff, 'employee_dashboard')
+        # The colleague's page reuses the staff member's fragment and only
+        # hides the colleague's own row
+        self.get(self.colleague, 'employee_dashboard')
+        self.client.force_login(self.colleague.user)
+        with frozen_now(10, 0, self.day), self.assertNumQueries(5):
+            page = self.client.get(reverse('employee_dashboard')).content.decode()
+        self.assertIn(f'<tr data-colleague="{self.staff.pk}">', page)
+        self.assertIn(f'tr[data-colleague="{self.colleague.pk}"] {{ display: none; }}', page)
+
+        # Alone in a department, the list is empty whoever renders it first
+        sales = create_employee(4, department='sales')
+        self.assertIn('No other colleagues in your department.', self.get(sales, 'employee_dashboard'))
+
+    def test_colleague_list_follows_user_changes(self):
+        self.get(self.staff, 'employee_dashboard')
+        # A login only saves last_login, which no fragment shows
+        versions = get_fragment_versions('employees', 'department:finance')
+        self.client.login(username='user3', password='password123')
+        self.assertEqual(get_fragment_versions('employees', 'department:finance'), versions)
+
+        user = User.objects.get(pk=self.colleague.user_id)
+        user.last_name = 'Renamed'
+        user.save()
+        self.assertIn('Test Renamed', self.get(self.staff, 'employee_dashboard'))
+
+class ConditionalDashboardTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.day = date(2025, 3, 3)
+        self.hr = create_employee(1, department='human_resources', role='hr_admin')
+        self.staff = create_employee(2, department='finance')
+        self.colleague = create_employee(3, department='finance')
+        employee_cache.clear()
+
+    def get(self, url_name, etag=None, client=None):
+        # Logging in again would move last_login and rotate the CSRF secret
+        headers = {'HTTP_IF_NONE_MATCH': etag} if etag else {}
+        with frozen_now(10, 0, self.day):
+            return (client or self.client).get(reverse(url_name), **headers)
+
+    def check_in(self, employee):
+        client = Client()
+        client.force_login(employee.user)
+        with frozen_now(8, 30, self.day):
+            client.post(reverse('check_in'))
+
+    def test_unchanged_dashboard_is_not_rendered_again(self):
+        for employee, url_name in [(self.hr, 'hr_dashboard'), (self.staff, 'employee_dashboard')]:
+            self.client.force_login(employee.user)
+            etag = self.get(url_name)['ETag']
+            # The session, user and own attendance timestamp only
+            with self.assertNumQueries(3):
+                response = self.get(url_name, etag)
+            self.assertEqual(response.status_code, 304)
+            self.assertEqual(response.templates, [])
+            self.assertIn('no-cache', response['Cache-Control'])
+
+    def test_dashboard_etag_follows_attendance_and_employees(self):
+        self.client.force_login(self.hr.user)
+        etag = self.get('hr_dashboard')['ETag']
+        self.check_in(self.staff)
+        response = self.get('hr_dashboard', etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, '<h2 data-live-counter="present_count">1</h2>')
+
+        etag = response['ETag']
+        self.assertEqual(self.get('hr_dashboard', etag).status_code, 304)
+        create_employee(4, department='sales')
+        self.assertEqual(self.get('hr_dashboard', etag).status_code, 200)
+
+    def test_own_check_in_changes_the_dashboard(self):
+        self.client.force_login(self.staff.user)
+        etag = self.get('employee_dashboard')['ETag']
+        self.assertEqual(self.get('employee_dashboard', etag).status_code, 304)
+        with frozen_now(8, 30, self.day):
+            self.client.post(reverse('check_in'))
+        response = self.get('employee_dashboard', etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Checked in: 08:30')
+
+    def test_colleague_changes_reach_the_staff_dashboard(self):
+        self.client.force_login(self.staff.user)
+        etag = self.get('employee_dashboard')['ETag']
+        self.colleague.department = 'sales'
+        self.colleague.save()
+        response = self.get('employee_dashboard', etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotContains(response, 'EMP003')
+
+
+class StaticAssetTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.root = cls.enterClassContext(tempfile.TemporaryDirectory())
+        cls.enterClassContext(override_settings(STATIC_ROOT=cls.root))
+        call_command('collectstatic', interactive=False, verbosity=0)
+        with open(os.path.join(cls.root, 'staticfiles.json')) as manifest:
+            cls.paths = json.load(manifest)['paths']
+
+    def fetch(self, name, **headers):
+        response = self.client.get(f'/static/{name}', **headers)
+        if response.streaming:
+            response.body = b''.join(response.streaming_content)
+            response.close()
+        return response
+
+    def test_pages_link_hashed_names(self):
+        hashed = self.paths['css/login.css']
+        self.assertRegex(hashed, r'^css/login\.[0-9a-f]{12}\.css$')
+        self.assertContains(self.client.get(reverse('login')), f'/static/{hashed}')
+        # References inside stylesheets are rewritten too
+        with open(os.path.join(self.root, hashed)) as stylesheet:
+            self.assertIn(self.paths['images/login-bg.jpg'].split('/')[-1], stylesheet.read())
+
+    def test_hashed_names_are_immutable_and_precompressed(self):
+        name = self.paths['js/base.js']
+        with open(os.path.join(self.root, name), 'rb') as original:
+            content = original.read()
+
+        response = self.fetch(name, HTTP_ACCEPT_ENCODING='br;q=0, gzip, deflate')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(response['Cache-Control'], 'public, max-age=31536000, immutable')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertIn('javascript', response['Content-Type'])
+        self.assertEqual(gzip.decompress(response.body), content)
+        self.assertLess(int(response['Content-Length']), len(content))
+
+        plain = self.fetch(name)
+        self.assertNotIn('Content-Encoding', plain)
+        self.assertEqual(plain.body, content)
+        self.assertNotEqual(plain['ETag'], response['ETag'])
+
+        again = self.fetch(name, HTTP_ACCEPT_ENCODING='gzip', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(again.status_code, 304)
+
+    def test_original_names_revalidate(self):
+        response = self.fetch('css/base.css')
+        self.assertEqual(response['Cache-Control'], 'public, max-age=60')
+        self.assertEqual(self.fetch('css/base.css', HTTP_IF_MODIFIED_SINCE=response['Last-Modified']).status_code, 304)
+
+    async def test_async_requests_stay_async(self):
+        passed = []
+        async def get_response(request):
+            passed.append(request.path)
+            return HttpResponse('page')
+        middleware = StaticAssetMiddleware(get_response)
+        self.assertTrue(iscoroutinefunction(middleware))
+        self.assertEqual((await middleware(AsyncRequestFactory().get('/dashboard/'))).content, b'page')
+        self.assertEqual(passed, ['/dashboard/'])
+
+        name = self.paths['css/base.css']
+        response = await AsyncClient().get(f'/static/{name}', headers={'Accept-Encoding': 'gzip'})
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertFalse(response.streaming)
+        with open(os.path.join(self.root, name), 'rb') as original:
+            self.assertEqual(gzip.decompress(response.content), original.read())
+
+    def test_only_collected_files_are_served(self):
+        self.assertFalse(os.path.exists(os.path.join(self.root, self.paths['images/login-bg.jpg'] + '.gz')))
+        self.assertNotIn('Vary', self.fetch(self.paths['images/login-bg.jpg'], HTTP_ACCEPT_ENCODING='gzip'))
+        self.assertEqual(self.fetch('css/base.css.gz').status_code, 404)
+        self.assertEqual(self.fetch('../settings.py').status_code, 404)
+        self.assertEqual(self.fetch('css/missing.css').status_code, 404)
+
+
+def frozen_now(hour, minute, day=date(2025, 3, 3)):
+    """Patch timezone.now so views see a fixed local time"""
+    local = timezone.make_aware(datetime.combine(day, time(hour, minute)))
+    return mock.patch('django.utils.timezone.now', return_value=local)
+
+
+class DailyAttendanceSummaryTests(TestCase):
+    def setUp(self):
+        self.employee = create_employee(1, department='sales')
+        self.client.login(username='user1', password='password123')
+        self.day = date(2025, 3, 3)
+
+    def get_summary(self):
+        return DailyAttendanceSummary.objects.get(date=self.day, department='sales')
+
+    def test_check_in_and_out_update_summary(self):
+        with frozen_now(8, 30):
+            self.client.post(reverse('check_in'))
+            self.client.post(reverse('check_in'))
+        summary = self.get_summary()
+        self.assertEqual((summary.present_count, summary.late_count, summary.checked_out_count), (1, 0, 0))
+
+        with frozen_now(17, 0):
+            self.client.post(reverse('check_out'))
+        self.assertEqual(self.get_summary().checked_out_count, 1)
+
+    def test_rebuild_command_matches_incremental_counts(self):
+        with frozen_now(8, 30):
+            self.client.post(reverse('check_in'))
+        DailyAttendanceSummary.objects.all().delete()
+
+        call_command('rebuild_attendance_summary', start=str(self.day), stdout=StringIO())
+
+        summary = self.get_summary()
+        self.assertEqual((summary.present_count, summary.late_count), (1, 0))
+
+
+class HotQueryIndexTests(TestCase):
+    def test_hot_queries_use_their_indexes(self):
+        for index in range(1, 21):
+            employee = create_employee(index, department=['finance', 'sales'][index % 2])
+            Attendance.objects.create(employee=employee, date=date(2025, 3, 3), check_in_time=time(8, 30), status='present')
+
+        for name, queryset, index_names in get_hot_queries(date(2025, 3, 3)):
+            with self.subTest(name):
+                plan = queryset.explain()
+                self.assertTrue(any(index_name in plan for index_name in index_names), plan)
+
+
+class CheckInWriteTests(TestCase):
+    def setUp(self):
+        self.employee = create_employee(1)
+        self.day = date(2025, 3, 3)
+
+    def test_upsert_check_in_records_once(self):
+        self.assertTrue(upsert_check_in(self.employee, self.day, time(8, 30), False))
+        self.assertFalse(upsert_check_in(self.employee, self.day, time(8, 40), False))
+        attendance = Attendance.objects.get(employee=self.employee, date=self.day)
+        self.assertEqual((attendance.check_in_time, attendance.status), (time(8, 30), 'present'))
+
+    def test_upsert_check_in_completes_absent_row(self):
+        Attendance.objects.create(employee=self.employee, date=self.day, status='absent')
+        self.assertTrue(upsert_check_in(self.employee, self.day, time(8, 50), False))
+        self.assertEqual(Attendance.objects.get(employee=self.employee, date=self.day).status, 'present')
+
+    def test_complete_check_out_requires_minimum_work_time(self):
+        self.assertIsNone(complete_check_out(self.employee, self.day, time(17, 0), time(9, 0)))
+        upsert_check_in(self.employee, self.day, time(9, 10), False)
+        self.assertIsNone(complete_check_out(self.employee, self.day, time(17, 0), time(9, 0)))
+        self.assertEqual(complete_check_out(self.employee, self.day, time(17, 10), time(9, 10)), time(9, 10))
+        self.assertIsNone(complete_check_out(self.employee, self.day, time(17, 20), time(9, 20)))
+
+    def test_orm_fallback_matches_upsert(self):
+        self.assertTrue(check_in_with_orm(self.employee, self.day, time(8, 30), False))
+        self.assertFalse(check_in_with_orm(self.employee, self.day, time(8, 40), False))
+        self.assertIsNone(check_out_with_orm(self.employee, self.day, time(16, 0), time(8, 0)))
+        self.assertEqual(check_out_with_orm(self.employee, self.day, time(17, 0), time(9, 0)), time(8, 30))
+
+    def test_check_out_rejections(self):
+        self.client.login(username='user1', password='password123')
+        with frozen_now(17, 0, self.day):
+            self.assertEqual(self.client.post(reverse('check_out')).json()['message'], 'No check-in record found for today')
+        upsert_check_in(self.employee, self.day, time(9, 10), False)
+        with frozen_now(17, 0, self.day):
+            self.assertIn('Minimum work time', self.client.post(reverse('check_out')).json()['message'])
+        with frozen_now(17, 15, self.day):
+            self.assertTrue(self.client.post(reverse('check_out')).json()['success'])
+            self.assertEqual(self.client.post(reverse('check_out')).json()['message'], 'You have already checked out today')
+
+
+class ShiftPolicyTests(TestCase):
+    def setUp(self):
+        self.employee = create_employee(1, department='sales')
+        self.colleague = create_employee(2, department='sales')
+        self.monday = date(2025, 3, 3)
+        shift_table_cache.clear()
+
+    def tearDown(self):
+        # Rolled back rows do not send post_delete
+        shift_table_cache.clear()
+
+    def test_most_specific_policy_wins(self):
+        ShiftPolicy.objects.create(name='Default', check_in_start=time(7, 0))
+        ShiftPolicy.objects.create(name='Sales', department='sales', check_in_start=time(10, 0), check_in_end=time(11, 0))
+        ShiftPolicy.objects.create(name='Sales Friday', department='sales', weekday=4, check_out_after=time(15, 0))
+        ShiftPolicy.objects.create(name='Early bird', employee=self.employee, weekday=0, check_in_start=time(6, 0))
+        ShiftPolicy.objects.create(name='Retired', department='finance', is_active=False, check_in_start=time(12, 0))
+        table = compile_shift_table(ShiftPolicy.objects.filter(is_active=True))
+
+        self.assertEqual(table.resolve(self.employee.pk, 'sales', 0).check_in_start, time(6, 0))
+        self.assertEqual(table.resolve(self.employee.pk, 'sales', 1).check_in_start, time(10, 0))
+        self.assertEqual(table.resolve(self.colleague.pk, 'sales', 0).check_in_start, time(10, 0))
+        self.assertEqual(table.resolve(self.colleague.pk, 'sales', 4).check_out_after, time(15, 0))
+        self.assertEqual(table.resolve(self.colleague.pk, 'finance', 2).check_in_start, time(7, 0))
+        self.assertEqual(compile_shift_table([]).resolve(self.employee.pk, 'sales', 6), DEFAULT_SHIFT)
+
+    def test_lookups_are_cached_until_a_policy_changes(self):
+        get_shift_table()
+        with self.assertNumQueries(0):
+            self.assertEqual(get_shift(self.employee, self.monday), DEFAULT_SHIFT)
+
+        policy = ShiftPolicy.objects.create(name='Sales', department='sales', minimum_hours=6)
+        self.assertEqual(get_shift(self.employee, self.monday).minimum_hours, 6.0)
+        policy.is_active = False
+        policy.save()
+        self.assertEqual(get_shift(self.employee, self.monday), DEFAULT_SHIFT)
+
+    def test_shift_rules(self):
+        shift = Shift(time(10, 0), time(11, 0), time(10, 30), time(18, 0), 7.5)
+        self.assertFalse(shift.allows_check_in(time(9, 59)))
+        self.assertTrue(shift.allows_check_in(time(11, 0)))
+        self.assertFalse(shift.is_late(time(10, 30)))
+        self.assertTrue(shift.is_late(time(10, 31)))
+        self.assertFalse(shift.allows_check_out(time(17, 59)))
+        self.assertEqual(shift.minimum_work, timedelta(hours=7, minutes=30))
+
+    def test_policy_validation(self):
+        ShiftPolicy(name='Valid', late_after=time(9, 0), minimum_hours=24).full_clean()
+        for fields, error in [
+            ({'late_after': time(7, 30)}, 'late_after'),
+            ({'late_after': time(10, 0)}, 'late_after'),
+            ({'minimum_hours': 0}, 'minimum_hours'),
+            ({'minimum_hours': 30}, 'minimum_hours'),
+        ]:
+            with self.assertRaises(ValidationError) as raised:
+                ShiftPolicy(name='Invalid', **fields).full_clean()
+            self.assertIn(error, raised.exception.message_dict)
+
+    def test_check_out_before_the_minimum_work_time_since_midnight(self):
+        ShiftPolicy.objects.create(name='Early', check_in_start=time(0, 0), check_out_after=time(0, 0), minimum_hours=8)
+        Attendance.objects.create(employee=self.employee, date=self.monday, check_in_time=time(0, 30), status='present')
+        self.client.login(username='user1', password='password123')
+        # Eight hours before 06:00 is the previous evening, after every check-in time of the day
+        with frozen_now(6, 0, self.monday):
+            self.assertIn('Minimum work time is 8 hours', self.client.post(reverse('check_out')).json()['message'])
+        self.assertIsNone(Attendance.objects.get(employee=self.employee).check_out_time)
+
+    def test_views_follow_the_department_shift(self):
+        ShiftPolicy.objects.create(
+            name='Sales', department='sales', check_in_start=time(10, 0), check_in_end=time(11, 0),
+            late_after=time(10, 30), check_out_after=time(18, 0), minimum_hours=7.5,
+        )
+        self.client.login(username='user1', password='password123')
+        with frozen_now(8, 30, self.monday):
+            self.assertEqual(self.client.post(reverse('check_in')).json()['message'], 'Check-in is only allowed between 10:00 - 11:00')
+        with frozen_now(10, 45, self.monday):
+            self.assertEqual(self.client.post(reverse('check_in')).json()['status'], 'late')
+        with frozen_now(17, 30, self.monday):
+            self.assertEqual(self.client.post(reverse('check_out')).json()['message'], 'Check-out is only allowed after 18:00')
+        with frozen_now(18, 0, self.monday):
+            self.assertIn('Minimum work time is 7.5 hours', self.client.post(reverse('check_out')).json()['message'])
+        with frozen_now(18, 15, self.monday):
+            self.assertEqual(self.client.post(reverse('check_out')).json()['work_duration'], '7.5 hours')
+        self.assertTrue(Attendance.objects.get(employee=self.employee).is_late)
+
+
+# The async check-in views are only routed under ASGI, so the async view
+# tests use this URLconf instead
+urlpatterns = [
+    path('check-in/', views.acheck_in, name='check_in'),
+    path('check-out/', views.acheck_out, name='check_out'),
+    path('live/', views.aattendance_live, name='attendance_live'),
+]
+
+@override_settings(ROOT_URLCONF='emp_attd.tests', QUERY_BUDGET_RAISE=True)
+class AsyncCheckInViewTests(TestCase):
+    def setUp(self):
+        self.employee = create_employee(1, department='sales')
+        self.day = date(2025, 3, 3)
+        self.async_client = AsyncClient()
+        employee_cache.clear()
+        get_shift_table()
+
+    async def test_check_in_and_out(self):
+        await self.async_client.aforce_login(self.employee.user)
+        with frozen_now(9, 10, self.day):
+            response = await self.async_client.post('/check-in/')
+            self.assertEqual(response.json()['status'], 'on_time')
+            # The async ORM queries are counted against the view's budget
+            self.assertEqual(response['X-Query-Count'], '7')
+            response = await self.async_client.post('/check-in/')
+            self.assertEqual(response.json()['message'], 'You have already checked in today')
+        with frozen_now(17, 0, self.day):
+            self.assertIn('Minimum work time', (await self.async_client.post('/check-out/')).json()['message'])
+        with frozen_now(17, 30, self.day):
+            self.assertEqual((await self.async_client.post('/check-out/')).json()['work_duration'], '8.3 hours')
+            response = await self.async_client.post('/check-out/')
+            self.assertEqual(response.json()['message'], 'You have already checked out today')
+
+        summary = await DailyAttendanceSummary.objects.aget(date=self.day, department='sales')
+        self.assertEqual((summary.present_count, summary.late_count, summary.checked_out_count), (1, 0, 1))
+
+    async def test_rejections(self):
+        self.assertEqual((await self.async_client.post('/check-in/')).status_code, 302)
+        await self.async_client.aforce_login(self.employee.user)
+        self.assertEqual((await self.async_client.get('/check-in/')).json()['message'], 'Invalid request method')
+        with frozen_now(10, 0, self.day):
+            self.assertEqual((await self.async_client.post('/check-in/')).json()['type'], 'error')
+        with frozen_now(17, 0, self.day):
+            self.assertEqual((await self.async_client.post('/check-out/')).json()['message'], 'No check-in record found for today')
+
+    @override_settings(ATTENDANCE_LIVE_FEED={'POLL_INTERVAL': 0, 'KEEPALIVE': 5, 'MAX_QUEUE': 10})
+    async def test_live_stream(self):
+        await self.async_client.aforce_login(self.employee.user)
+        self.assertEqual((await self.async_client.get('/live/')).status_code, 403)
+
+        manager = await sync_to_async(create_employee)(2, role='manager')
+        await self.async_client.aforce_login(manager.user)
+        with mock.patch('emp_attd.live._hub', AttendanceHub()):
+            response = await self.async_client.get('/live/')
+            stream = aiter(response.streaming_content)
+            self.assertEqual(await anext(stream), b'retry: 3000\n\n')
+            self.assertIn(b'"absent_count": 2', await anext(stream))
+            get_hub().publish(check_in_event('EMP001', 'Test User1', 'sales', self.day, time(8, 30), False))
+            self.assertTrue((await anext(stream)).startswith(b'event: check_in\n'))
+            # A client disconnect cancels the response while it waits
+            waiting = asyncio.ensure_future(anext(stream))
+            await asyncio.sleep(0.05)
+            waiting.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await waiting
+            self.assertEqual(get_hub().subscribers, set())
+
+
+class CheckInBufferTests(TestCase):
+    def setUp(self):
+        self.employee = create_employee(1, department='marketing')
+        self.day = date(2025, 3, 3)
+        self.spill_dir = tempfile.mkdtemp()
+        self.addCleanup(lambda: [os.remove(os.path.join(self.spill_dir, name)) for name in os.listdir(self.spill_dir)])
+
+    def get_summary(self):
+        return DailyAttendanceSummary.objects.get(date=self.day, department='marketing')
+
+    def test_flush_writes_batch(self):
+        buffer = CheckInBuffer(self.spill_dir, flush_interval_ms=60000)
+        self.addCleanup(buffer.close)
+        self.assertTrue(buffer.submit(self.employee.pk, 'marketing', self.day, time(8, 30), False))
+        self.assertFalse(buffer.submit(self.employee.pk, 'marketing', self.day, time(8, 31), False))
+        self.assertFalse(Attendance.objects.exists())
+
+        buffer.flush()
+
+        attendance = Attendance.objects.get(employee=self.employee, date=self.day)
+        self.assertEqual(attendance.check_in_time, time(8, 30))
+        self.assertEqual(self.get_summary().present_count, 1)
+        self.assertEqual(os.listdir(self.spill_dir), [f'check-in-{os.getpid()}.jsonl'])
+
+    def dead_pid(self):
+        process = subprocess.Popen([sys.executable, '-c', ''])
+        process.wait()
+        return process.pid
+
+    def test_replay_is_idempotent(self):
+        event = {'employee': self.employee.pk, 'department': 'marketing', 'date': '2025-03-03', 'time': '08:45:00', 'is_late': False}
+        for name in [f'check-in-{self.dead_pid()}.jsonl', f'check-in-{self.dead_pid()}.1.flushing']:
+            with open(os.path.join(self.spill_dir, name), 'w') as spill_file:
+                spill_file.write(json.dumps(event) + '\n{"torn')
+
+        self.assertEqual(replay_spill_files(self.spill_dir), 1)
+
+        self.assertEqual(os.listdir(self.spill_dir), [])
+        self.assertEqual(self.get_summary().present_count, 1)
+
+    def test_replay_skips_live_processes(self):
+        name = f'check-in-{os.getppid()}.1.flushing'
+        with open(os.path.join(self.spill_dir, name), 'w') as spill_file:
+            spill_file.write(json.dumps({
+                'employee': self.employee.pk, 'department': 'marketing', 'date': '2025-03-03', 'time': '08:45:00', 'is_late': False,
+            }) + '\n')
+        self.assertEqual(replay_spill_files(self.spill_dir), 0)
+        self.assertEqual(os.listdir(self.spill_dir), [name])
+
+    def test_segment_being_flushed_is_not_replayed(self):
+        buffer = CheckInBuffer(self.spill_dir, flush_interval_ms=60000)
+        self.addCleanup(buffer.close)
+        buffer.submit(self.employee.pk, 'marketing', self.day, time(8, 30), False)
+
+        replayed = []
+        def write_while_another_process_starts(events):
+            # Bypass the PID check, as if this segment's owner were unknown
+            with mock.patch('emp_attd.buffer.process_alive', return_value=False):
+                replayed.append(replay_spill_files(self.spill_dir))
+            return write_events(events)
+
+        with mock.patch('emp_attd.buffer.write_events', side_effect=write_while_another_process_starts):
+            buffer.flush()
+
+        self.assertEqual(replayed, [0])
+        self.assertEqual(self.get_summary().present_count, 1)
+        self.assertEqual(os.listdir(self.spill_dir), [f'check-in-{os.getpid()}.jsonl'])
+
+    def test_buffered_check_in_view(self):
+        self.client.login(username='user1', password='password123')
+        options = {'ENABLED': True, 'FLUSH_INTERVAL_MS': 60000, 'SPILL_DIR': self.spill_dir, 'FSYNC': False}
+        with override_settings(ATTENDANCE_CHECK_IN_BUFFER=options), frozen_now(8, 30, self.day):
+            self.assertTrue(self.client.post(reverse('check_in')).json()['success'])
+            self.assertFalse(self.client.post(reverse('check_in')).json()['success'])
+            # Flush on the test's connection; the background thread cannot see its transaction
+            get_check_in_buffer().flush()
+            shutdown_check_in_buffer()
+        self.assertEqual(self.get_summary().present_count, 1)
+
+
+@override_settings(ATTENDANCE_LIVE_FEED={'POLL_INTERVAL': 0, 'KEEPALIVE': 0.1, 'MAX_QUEUE': 2})
+class LiveFeedTests(TestCase):
+    def setUp(self):
+        self.manager = create_employee(1, department='operations', role='manager')
+        self.staff = create_employee(2, department='sales')
+        self.day = date(2025, 3, 3)
+        patcher = mock.patch('emp_attd.live._hub', AttendanceHub())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def event(self, employee_id='EMP002', is_late=False):
+        return check_in_event(employee_id, 'Test User2', 'sales', self.day, time(8, 30), is_late)
+
+    def test_hub_publishes_each_event_once(self):
+        hub = get_hub()
+        hub.publish(self.event('EMP009'))  # Nobody is listening yet
+        subscription = Subscription(10)
+        hub.subscribe(subscription)
+        hub.publish(self.event())
+        hub.publish(self.event())
+        hub.publish(self.event('EMP003'), announce=False)
+        hub.publish(self.event('EMP003'))
+        hub.publish(self.event('EMP009'))
+
+        self.assertEqual([subscription.get(0)['employee_id'] for _ in range(2)], ['EMP002', 'EMP009'])
+        self.assertIsNone(subscription.get(0))
+
+    def test_slow_subscriber_overflows(self):
+        hub = get_hub()
+        subscription = Subscription(2)
+        hub.subscribe(subscription)
+        for index in range(5):
+            hub.publish(self.event(f'EMP10{index}'))
+        self.assertEqual(subscription.queue.qsize(), 3)
+        self.assertTrue(subscription.overflowed)
+
+    def test_poll_events(self):
+        Attendance.objects.create(employee=self.staff, date=self.day, check_in_time=time(9, 0), check_out_time=time(17, 5), status='present')
+        Attendance.objects.create(employee=self.manager, date=self.day, status='absent')
+        since = timezone.now() - timedelta(minutes=1)
+        events = list(poll_events(self.day, since))
+        self.assertEqual([(event['kind'], event['employee_id']) for event in events], [('check_in', 'EMP002'), ('check_out', 'EMP002')])
+        self.assertEqual(events[0]['delta'], {'present_count': 1, 'late_count': 0, 'absent_count': -1})
+        self.assertEqual(list(poll_events(self.day, timezone.now() + timedelta(minutes=1))), [])
+
+    def test_stream_sends_snapshot_then_check_ins(self):
+        self.client.login(username='user1', password='password123')
+        with frozen_now(8, 40, self.day):
+            response = self.client.get(reverse('attendance_live'))
+            self.assertEqual(response['Content-Type'], 'text/event-stream')
+            stream = iter(response.streaming_content)
+            self.assertEqual(next(stream), b'retry: 3000\n\n')
+            self.assertIn(b'"present_count": 0', next(stream))
+            self.assertEqual(next(stream), b': keepalive\n\n')
+
+            staff_client = self.client_class()
+            staff_client.login(username='user2', password='password123')
+            with self.captureOnCommitCallbacks(execute=True):
+                self.assertTrue(staff_client.post(reverse('check_in')).json()['success'])
+
+            message = next(stream).decode()
+            self.assertTrue(message.startswith('event: check_in\n'))
+            data = json.loads(message.split('data: ', 1)[1])
+            self.assertEqual((data['employee_id'], data['time'], data['delta']['present_count']), ('EMP002', '08:40', 1))
+
+        response.close()
+        self.assertEqual(get_hub().subscribers, set())
+
+    def test_stream_does_not_count_polled_rows_twice(self):
+        late = create_employee(3, department='sales')
+        staff_client = self.client_class()
+        staff_client.login(username='user2', password='password123')
+        # Committed before the snapshot, but published by this process
+        # only once the poller sees it
+        with frozen_now(8, 30, self.day), self.captureOnCommitCallbacks(execute=False):
+            self.assertTrue(staff_client.post(reverse('check_in')).json()['success'])
+
+        self.client.login(username='user1', password='password123')
+        with frozen_now(8, 40, self.day):
+            response = self.client.get(reverse('attendance_live'))
+            stream = iter(response.streaming_content)
+            next(stream)
+            self.assertIn(b'"present_count": 1', next(stream))
+            for event in poll_events(self.day, timezone.now() - timedelta(hours=1)):
+                get_hub().publish(event)
+            data = json.loads(next(stream).decode().split('data: ', 1)[1])
+            self.assertEqual((data['employee_id'], data['delta']), ('EMP002', {}))
+
+        late_client = self.client_class()
+        late_client.login(username='user3', password='password123')
+        with frozen_now(8, 50, self.day), self.captureOnCommitCallbacks(execute=True):
+            self.assertTrue(late_client.post(reverse('check_in')).json()['success'])
+        data = json.loads(next(stream).decode().split('data: ', 1)[1])
+        self.assertEqual((data['employee_id'], data['delta']['present_count']), (late.employee_id, 1))
+        response.close()
+
+    def test_stream_requires_management_role(self):
+        self.client.login(username='user2', password='password123')
+        self.assertEqual(self.client.get(reverse('attendance_live')).status_code, 403)
+
+
+class AbsenceMarkingTests(TestCase):
+    def setUp(self):
+        self.present = create_employee(1)
+        self.missing = create_employee(2, department='sales')
+        create_employee(3, is_active=False)
+        self.new_hire = create_employee(4)
+        Employee.objects.filter(pk=self.new_hire.pk).update(hire_date=date(2025, 1, 8))
+        Attendance.objects.create(employee=self.present, date=date(2025, 1, 7), check_in_time=time(8, 30), status='present')
+
+    def test_marks_active_employees_without_attendance(self):
+        inserted = mark_absences([date(2025, 1, 7), date(2025, 1, 8)])
+
+        self.assertEqual(inserted, {date(2025, 1, 7): 1, date(2025, 1, 8): 3})
+        self.assertEqual(
+            set(Attendance.objects.filter(status='absent').values_list('employee__employee_id', 'date')),
+            {('EMP002', date(2025, 1, 7)), ('EMP001', date(2025, 1, 8)),
+             ('EMP002', date(2025, 1, 8)), ('EMP004', date(2025, 1, 8))},
+        )
+        self.assertEqual(Attendance.objects.get(employee=self.present, date=date(2025, 1, 7)).status, 'present')
+        # Marking again only fills gaps, of which there are none left
+        self.assertEqual(mark_absences([date(2025, 1, 7), date(2025, 1, 8)]), {date(2025, 1, 7): 0, date(2025, 1, 8): 0})
+
+    def test_working_days_skip_weekends(self):
+        self.assertEqual(get_working_days(date(2025, 1, 3), date(2025, 1, 6)), [date(2025, 1, 3), date(2025, 1, 6)])
+        self.assertEqual(len(get_working_days(date(2025, 1, 3), date(2025, 1, 6), include_weekends=True)), 4)
+
+    def test_command_rebuilds_stale_timesheets(self):
+        with frozen_now(10, 0, date(2025, 3, 3)):
+            rebuild_monthly_timesheets(2025, 1)
+            output = StringIO()
+            call_command('mark_absences', start='2025-01-06', end='2025-01-10', stdout=output)
+            with self.assertRaises(CommandError):
+                call_command('mark_absences', start='2025-03-03')
+
+        self.assertIn('Marked 12 absences over 5 days', output.getvalue())
+        self.assertIn('Rebuilt 3 timesheets for 2025-01', output.getvalue())
+        self.assertEqual(MonthlyTimesheet.objects.get(employee=self.missing).absent_days, 5)
+
+
+class AttendanceArchiveTests(TestCase):
+    def setUp(self):
+        self.hr = create_employee(1, department='human_resources', role='hr_admin')
+        self.finance = create_employee(2, department='finance')
+        Attendance.objects.create(employee=self.hr, date=date(2025, 1, 6), check_in_time=time(8, 0), check_out_time=time(16, 30), status='present', notes='Training')
+        Attendance.objects.create(employee=self.finance, date=date(2025, 1, 6), check_in_time=time(9, 30, 15), check_out_time=time(17, 45), status='late', is_late=True)
+        Attendance.objects.create(employee=self.finance, date=date(2025, 1, 7))
+        Attendance.objects.create(employee=self.finance, date=date(2025, 2, 3), check_in_time=time(8, 0), check_out_time=time(12, 0), status='present')
+        Attendance.objects.create(employee=self.finance, date=date(2025, 3, 3), check_in_time=time(8, 45), status='present')
+        self.client.login(username='user1', password='password123')
+
+    def export(self):
+        response = self.client.get(reverse('attendance_export'), {'start': '2025-01-01', 'end': '2025-03-31'})
+        return b''.join(response.streaming_content).decode()
+
+    def test_archive_day_packs_rows(self):
+        self.assertEqual(archive_day(date(2025, 1, 6)), 2)
+        self.assertEqual(archive_day(date(2025, 1, 6)), 0)
+
+        self.assertFalse(Attendance.objects.filter(date=date(2025, 1, 6)).exists())
+        self.assertEqual(list(iter_archived_days(date(2025, 1, 1), date(2025, 1, 31))), [
+            (date(2025, 1, 6), [
+                (self.hr.pk, time(8, 0), time(16, 30), 'present', False, 'Training'),
+                (self.finance.pk, time(9, 30, 15), time(17, 45), 'late', True, None),
+            ]),
+        ])
+
+    def test_archiving_again_merges_hot_rows(self):
+        archive_day(date(2025, 1, 7))
+        Attendance.objects.create(employee=self.finance, date=date(2025, 1, 7), status='present', check_in_time=time(8, 10), notes='Corrected')
+        Attendance.objects.create(employee=self.hr, date=date(2025, 1, 7))
+        with mock.patch('emp_attd.archive.ARCHIVE_CHUNK_SIZE', 1):
+            self.assertEqual(archive_day(date(2025, 1, 7)), 2)
+
+        self.assertEqual(ArchivedAttendance.objects.filter(date=date(2025, 1, 7)).count(), 2)
+        rows = dict((row[0], row) for _, day_rows in iter_archived_days(date(2025, 1, 7), date(2025, 1, 7)) for row in day_rows)
+        self.assertEqual(rows[self.finance.pk][5], 'Corrected')
+        self.assertEqual(rows[self.hr.pk][3], 'absent')
+
+    def test_reports_union_hot_and_archived_rows(self):
+        with frozen_now(10, 0, date(2025, 3, 3)):
+            timesheets = get_employee_timesheets(2025)
+            export = self.export()
+            rebuild_daily_summaries(date(2025, 1, 1), date(2025, 3, 31))
+            summaries = list(DailyAttendanceSummary.objects.values_list('date', 'department', 'present_count', 'late_count', 'checked_out_count'))
+
+            output = StringIO()
+            call_command('archive_attendance', keep_months=1, stdout=output)
+
+            self.assertIn('Archived 4 attendance rows from 3 days before 2025-03-01', output.getvalue())
+            self.assertEqual(list(Attendance.objects.values_list('date', flat=True)), [date(2025, 3, 3)])
+            self.assertEqual(get_employee_timesheets(2025), timesheets)
+            self.assertEqual(self.export(), export)
+            rebuild_daily_summaries(date(2025, 1, 1), date(2025, 3, 31))
+            self.assertEqual(list(DailyAttendanceSummary.objects.values_list('date', 'department', 'present_count', 'late_count', 'checked_out_count')), summaries)
+            # A rollup rebuilt later still counts the archived days
+            rebuild_monthly_timesheets(2025, 1)
+            self.assertEqual(get_employee_timesheets(2025), timesheets)
+
+    def test_archived_days_cannot_be_marked_absent(self):
+        archive_day(date(2025, 1, 7))
+        with frozen_now(10, 0, date(2025, 3, 3)):
+            with self.assertRaises(CommandError):
+                call_command('mark_absences', start='2025-01-06', end='2025-01-10')
+            with self.assertRaises(CommandError):
+                call_command('archive_attendance', keep_months=0)
+
+
+class AttendanceExportTests(TestCase):
+    def setUp(self):
+        hr = create_employee(1, department='human_resources', role='hr_admin')
+        finance = create_employee(2, department='finance')
+        Attendance.objects.create(employee=hr, date=date(2025, 3, 3), check_in_time=time(8, 30), status='present')
+        Attendance.objects.create(employee=finance, date=date(2025, 3, 3), check_in_time=time(9, 20), status='late', is_late=True)
+        Attendance.objects.create(employee=finance, date=date(2025, 3, 4))
+        Attendance.objects.create(employee=finance, date=date(2025, 4, 1))
+        self.client.login(username='user1', password='password123')
+
+    def export(self, **params):
+        response = self.client.get(reverse('attendance_export'), params)
+        self.assertEqual(response.status_code, 200)
+        return b''.join(response.streaming_content).decode()
+
+    def test_csv_export_streams_date_range(self):
+        lines = self.export(start='2025-03-01', end='2025-03-31').splitlines()
+
+        self.assertEqual(lines[0].split(',')[:3], ['date', 'employee_id', 'username'])
+        self.assertEqual(len(lines), 4)
+        self.assertEqual(
+            lines[2],
+            '2025-03-03,EMP002,user2,Test,User2,finance,late,true,09:20:00,,',
+        )
+
+    def test_jsonl_export_filters_department(self):
+        rows = [json.loads(line) for line in self.export(start='2025-03-01', end='2025-04-30', department='finance', format='jsonl').splitlines()]
+
+        self.assertEqual([row['date'] for row in rows], ['2025-03-03', '2025-03-04', '2025-04-01'])
+        self.assertEqual(rows[1]['status'], 'absent')
+        self.assertIsNone(rows[1]['check_in_time'])
+
+    def test_export_reads_rows_in_two_queries(self):
+        response = self.client.get(reverse('attendance_export'), {'start': '2025-03-01', 'end': '2025-04-30'})
+        # One for the hot rows and one for archived days
+        with self.assertNumQueries(2):
+            b''.join(response.streaming_content)
+
+    def test_invalid_parameters(self):
+        for params in [{'start': '2025-13-01'}, {'start': '2025-03-05', 'end': '2025-03-01'}, {'format': 'xml'}, {'department': 'space'}]:
+            with self.subTest(params):
+                self.assertEqual(self.client.get(reverse('attendance_export'), params).status_code, 400)
+
+    def test_command(self):
+        output = StringIO()
+        call_command('export_attendance', start='2025-03-04', end='2025-03-04', format='jsonl', stdout=output)
+        self.assertEqual(json.loads(output.getvalue())['employee_id'], 'EMP002')
+
+
+class TimesheetReportTests(TestCase):
+    def setUp(self):
+        hr = create_employee(1, department='human_resources', role='hr_admin')
+        finance = create_employee(2, department='finance')
+        Attendance.objects.create(employee=hr, date=date(2025, 1, 6), check_in_time=time(8, 0), check_out_time=time(16, 30), status='present')
+        Attendance.objects.create(employee=finance, date=date(2025, 1, 6), check_in_time=time(9, 30), check_out_time=time(17, 45), status='late', is_late=True)
+        Attendance.objects.create(employee=finance, date=date(2025, 1, 7), check_in_time=time(8, 15), status='present')
+        Attendance.objects.create(employee=finance, date=date(2025, 1, 8))
+        Attendance.objects.create(employee=finance, date=date(2025, 2, 3), check_in_time=time(8, 0), check_out_time=time(12, 0), status='present')
+        self.client.login(username='user1', password='password123')
+
+    def test_employee_timesheets(self):
+        with frozen_now(10, 0, date(2025, 3, 3)):
+            rows = get_employee_timesheets(2025)
+
+        self.assertEqual([(row['month'], row['employee_id']) for row in rows], [
+            ('2025-01', 'EMP001'), ('2025-01', 'EMP002'), ('2025-02', 'EMP002'),
+        ])
+        self.assertEqual(rows[1], {
+            'month': '2025-01', 'employee_id': 'EMP002', 'name': 'Test User2', 'department': 'finance',
+            'days_present': 2, 'late_days': 1, 'absent_days': 1, 'hours_worked': 8.25,
+        })
+
+    def test_department_timesheets(self):
+        with frozen_now(10, 0, date(2025, 3, 3)):
+            rows = get_department_timesheets(get_employee_timesheets(2025, 1))
+
+        self.assertEqual([row['department'] for row in rows], ['human_resources', 'finance'])
+        self.assertEqual(rows[0]['hours_worked'], 8.5)
+        self.assertEqual(rows[1]['average_hours_per_day'], 4.12)
+
+    def test_rollups_match_live_totals(self):
+        with frozen_now(10, 0, date(2025, 3, 3)):
+            live = get_employee_timesheets(2025)
+            call_command('rebuild_timesheets', year=2025, stdout=StringIO())
+            # Rollups are read instead of the attendance rows from now on
+            Attendance.objects.filter(date__month=1).delete()
+            self.assertEqual(get_employee_timesheets(2025), live)
+        self.assertEqual(MonthlyTimesheet.objects.count(), 3)
+
+    def test_rebuild_skips_open_months(self):
+        with frozen_now(10, 0, date(2025, 2, 10)):
+            output = StringIO()
+            call_command('rebuild_timesheets', year=2025, stdout=output)
+            self.assertEqual(output.getvalue().splitlines(), ['Rebuilt 2 timesheets for 2025-01'])
+            with self.assertRaises(CommandError):
+                call_command('rebuild_timesheets', year=2025, month=2)
+            # February is still open, so its attendance is read live
+            self.assertEqual(get_employee_timesheets(2025, 2)[0]['hours_worked'], 4.0)
+
+    def test_rebuild_replaces_month(self):
+        self.assertEqual(rebuild_monthly_timesheets(2025, 1), 2)
+        Attendance.objects.filter(date=date(2025, 1, 8)).delete()
+        self.assertEqual(rebuild_monthly_timesheets(2025, 1), 2)
+        self.assertEqual(MonthlyTimesheet.objects.get(employee__employee_id='EMP002').absent_days, 0)
+
+    def test_api(self):
+        with frozen_now(10, 0, date(2025, 3, 3)):
+            data = self.client.get(reverse('timesheet_api'), {'year': 2025, 'department': 'finance'}).json()
+            grouped = self.client.get(reverse('timesheet_api'), {'year': 2025, 'month': 2, 'group': 'department'}).json()
+
+        self.assertTrue(data['success'])
+        self.assertEqual([row['month'] for row in data['employees']], ['2025-01', '2025-02'])
+        self.assertEqual(len(data['departments']), 2)
+        self.assertNotIn('employees', grouped)
+        self.assertEqual(grouped['departments'][0]['hours_worked'], 4.0)
+
+    def test_invalid_parameters(self):
+        for params in [{'year': 'last'}, {'year': 1999}, {'month': 13}, {'department': 'space'}]:
+            with self.subTest(params):
+                self.assertEqual(self.client.get(reverse('timesheet_api'), params).status_code, 400)
+
+    def test_report_page(self):
+        with frozen_now(10, 0, date(2025, 3, 3)):
+            response = self.client.get(reverse('timesheet_report'), {'year': 2025, 'month': 1})
+        self.assertContains(response, 'Test User2')
+        self.assertContains(response, '8.25')
+
+    def test_report_requires_hr(self):
+        self.client.login(username='user2', password='password123')
+        self.assertNotEqual(self.client.get(reverse('timesheet_report')).status_code, 200)
+
+
+@override_settings(QUERY_BUDGET_RAISE=True)
+class AttendanceViewQueryCountTests(TestCase):
+    """Pin the query count of every attendance view against a large data set"""
+
+    @classmethod
+    def setUpTestData(cls):
+        employees = seed_employees(1000)
+        cls.day = date(2025, 3, 3)
+        Attendance.objects.bulk_create([
+            Attendance(employee=employee, date=cls.day, check_in_time=time(8, 30), status='present')
+            for employee in employees[::2]
+        ])
+        rebuild_daily_summaries(cls.day, cls.day)
+        cls.by_role = {
+            role: Employee.objects.filter(role=role).exclude(attendance__date=cls.day).select_related('user').first()
+            for role, _ in Employee.ROLE_CHOICES
+        }
+
+    def login(self, role):
+        self.client.force_login(self.by_role[role].user)
+
+    def assertQueries(self, num, method, url, data=None, status=200):
+        # Measure the cold path, before the employee profile and dashboard
+        # fragments are cached; the shift table is compiled once per
+        # process, so it is built up front
+        employee_cache.clear()
+        cache.clear()
+        get_shift_table()
+        with self.assertNumQueries(num):
+            response = getattr(self.client, method)(url, data or {})
+        self.assertEqual(response.status_code, status)
+        return response
+
+    def test_login_and_logout(self):
+        self.assertQueries(0, 'get', reverse('login'))
+        self.assertQueries(10, 'post', reverse('login'), {'username': 'seed1', 'password': 'password123'}, status=302)
+        self.assertQueries(4, 'get', reverse('logout'), status=302)
+
+    def test_dashboard_redirect(self):
+        self.login('staff')
+        self.assertQueries(3, 'get', reverse('dashboard'), status=302)
+
+    def test_manager_dashboard(self):
+        self.login('manager')
+        with frozen_now(10, 0, self.day):
+            self.assertQueries(7, 'get', reverse('manager_dashboard'))
+
+    def test_hr_dashboard(self):
+        self.login('hr_admin')
+        with frozen_now(10, 0, self.day):
+            self.assertQueries(7, 'get', reverse('hr_dashboard'))
+
+    def test_employee_dashboard(self):
+        self.login('staff')
+        with frozen_now(10, 0, self.day):
+            self.assertQueries(6, 'get', reverse('employee_dashboard'))
+
+    def test_employee_rows(self):
+        self.login('hr_admin')
+        with frozen_now(10, 0, self.day):
+            first = self.assertQueries(4, 'get', reverse('employee_rows')).json()
+            last = self.assertQueries(4, 'get', reverse('employee_rows'), {'cursor': 'EMP00950'}).json()
+        self.assertEqual(len(first['results']), 50)
+        self.assertEqual(first['next_cursor'], 'EMP00050')
+        self.assertEqual([row['employee_id'] for row in last['results']][:2], ['EMP00951', 'EMP00952'])
+        self.assertIsNone(last['next_cursor'])
+
+    def test_employee_rows_walks_every_employee_once(self):
+        self.login('manager')
+        seen, cursor = [], None
+        with frozen_now(10, 0, self.day):
+            while True:
+                params = {'limit': 200, 'cursor': cursor} if cursor else {'limit': 200}
+                data = self.client.get(reverse('employee_rows'), params).json()
+                seen.extend(row['employee_id'] for row in data['results'])
+                cursor = data['next_cursor']
+                if not cursor:
+                    break
+        self.assertEqual(seen, sorted(set(seen)))
+        self.assertEqual(len(seen), 1000)
+        statuses = {row['employee_id']: row['attendance_status'] for row in data['results']}
+        self.assertEqual(statuses['EMP01000'], 'absent')
+        self.assertEqual(statuses['EMP00999'], 'present')
+
+    def test_employee_rows_requires_management_role(self):
+        self.login('staff')
+        self.assertQueries(3, 'get', reverse('employee_rows'), status=403)
+
+    def test_attendance_export(self):
+        self.login('hr_admin')
+        # The hot and archived rows are read while the response streams
+        response = self.assertQueries(3, 'get', reverse('attendance_export'), {'start': '2025-03-01', 'end': '2025-03-31'})
+        with self.assertNumQueries(2):
+            self.assertEqual(len(b''.join(response.streaming_content).splitlines()), 501)
+
+    def test_attendance_live(self):
+        self.login('manager')
+        # The snapshot is read once the stream starts
+        response = self.assertQueries(3, 'get', reverse('attendance_live'))
+        response.close()
+
+    def test_timesheets(self):
+        self.login('hr_admin')
+        with frozen_now(10, 0, self.day):
+            # One aggregate query per month that has not been rolled up
+            self.assertQueries(17, 'get', reverse('timesheet_report'), {'year': 2025})
+            # The current month is never read from the rollups
+            self.assertQueries(5, 'get', reverse('timesheet_api'), {'year': 2025, 'month': 3})
+            rebuild_monthly_timesheets(2025, 2)
+            self.assertQueries(17, 'get', reverse('timesheet_api'), {'year': 2025})
+
+    def test_check_in_and_out(self):
+        self.login('staff')
+        with frozen_now(8, 45, self.day):
+            response = self.assertQueries(7, 'post', reverse('check_in'))
+        self.assertTrue(response.json()['success'])
+        with frozen_now(17, 30, self.day):
+            response = self.assertQueries(7, 'post', reverse('check_out'))
+        self.assertTrue(response.json()['success'])
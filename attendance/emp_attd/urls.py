@@ -1,6 +1,12 @@
+from django.conf import settings
 from django.urls import path
 from . import views
 
+if settings.ATTENDANCE_ASYNC_VIEWS:
+    check_in_view, check_out_view, live_view = views.acheck_in, views.acheck_out, views.aattendance_live
+else:
+    check_in_view, check_out_view, live_view = views.check_in, views.check_out, views.attendance_live
+
 urlpatterns = [
     path('', views.user_login, name='login'),
     path('login/', views.user_login, name='login'),
@@ -9,6 +15,11 @@ urlpatterns = [
     path('manager/', views.manager_dashboard, name='manager_dashboard'),
     path('hr/', views.hr_dashboard, name='hr_dashboard'),
     path('employee/', views.employee_dashboard, name='employee_dashboard'),
-    path('check-in/', views.check_in, name='check_in'),
-    path('check-out/', views.check_out, name='check_out'),
+    path('dashboard/employees/', views.employee_rows, name='employee_rows'),
+    path('check-in/', check_in_view, name='check_in'),
+    path('check-out/', check_out_view, name='check_out'),
+    path('live/', live_view, name='attendance_live'),
+    path('attendance/export/', views.attendance_export, name='attendance_export'),
+    path('reports/timesheets/', views.timesheet_report, name='timesheet_report'),
+    path('api/timesheets/', views.timesheet_api, name='timesheet_api'),
 ]
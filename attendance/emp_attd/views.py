@@ -1,13 +1,32 @@
+from asgiref.sync import iscoroutinefunction, sync_to_async
 from django.shortcuts import render, redirect
 from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
+from django.db import transaction
+from django.db.models import F, FilteredRelation, Q
+from employee.cache import get_cached_employee
 from employee.models import Employee
+from attendance.conditional import conditional_page
+from attendance.middleware import query_budget
 from .models import Attendance
-from django.http import HttpResponseForbidden, JsonResponse
+from .buffer import buffering_enabled, get_check_in_buffer
+from .checkins import complete_check_out, upsert_check_in
+from .fragments import get_dashboard_fragments
+from .exporting import EXPORT_FORMATS, export_lines, get_export_rows
+from .live import astream_events, publish_check_in, publish_check_out, stream_events
+from .reports import get_department_timesheets, get_employee_timesheets
+from .shifts import aget_shift, get_shift
+from .stats import get_dashboard_stats
+from .summary import record_check_in, record_check_out
+from django.core.paginator import Paginator
+from django.http import HttpResponseForbidden, JsonResponse, StreamingHttpResponse
+from django.urls import reverse
 from django.utils import timezone
-from datetime import time, date, datetime
+from django.utils.functional import SimpleLazyObject
+from datetime import date, datetime
 import json
+import time
 from functools import wraps
 
 # Create your views here.
@@ -15,10 +34,7 @@ from functools import wraps
 # Utility functions and decorators
 def get_employee_or_none(user):
     """Get employee instance or return None"""
-    try:
-        return Employee.objects.get(user=user)
-    except Employee.DoesNotExist:
-        return None
+    return get_cached_employee(user)
 
 def get_today_attendance(employee, today=None):
     """Get today's attendance record for an employee"""
@@ -29,6 +45,37 @@ def get_today_attendance(employee, today=None):
     except Attendance.DoesNotExist:
         return None
 
+async def aget_today_attendance(employee, today):
+    """Async version of get_today_attendance, for async views"""
+    try:
+        return await Attendance.objects.aget(employee=employee, date=today)
+    except Attendance.DoesNotExist:
+        return None
+
+def get_employee_rows(today, cursor=None, limit=50):
+    """Get one page of employee rows joined with today's attendance, ordered by employee_id.
+    
+    Uses keyset pagination: rows after `cursor` are fetched with a single
+    LEFT JOIN, so every page costs the same regardless of its position.
+    Returns the rows and the cursor of the next page (or None).
+    """
+    employees = Employee.objects.annotate(
+        today_attendance=FilteredRelation('attendance', condition=Q(attendance__date=today)),
+    ).order_by('employee_id')
+    if cursor:
+        employees = employees.filter(employee_id__gt=cursor)
+    
+    rows = list(employees.values(
+        'employee_id', 'department', 'role', 'phone_number', 'hire_date', 'is_active',
+        'user__username', 'user__first_name', 'user__last_name', 'user__email',
+        attendance_status=F('today_attendance__status'),
+        check_in_time=F('today_attendance__check_in_time'),
+        check_out_time=F('today_attendance__check_out_time'),
+    )[:limit + 1])
+    
+    next_cursor = rows[limit - 1]['employee_id'] if len(rows) > limit else None
+    return rows[:limit], next_cursor
+
 def create_json_response(success, message, response_type, **kwargs):
     """Create standardized JSON response"""
     response = {
@@ -39,28 +86,26 @@ def create_json_response(success, message, response_type, **kwargs):
     response.update(kwargs)
     return JsonResponse(response)
 
-def get_today_attendance_stats(today=None):
-    """Get attendance statistics for today"""
-    if today is None:
-        today = timezone.localtime().date()
-    
-    today_attendance = Attendance.objects.filter(date=today)
-    present_count = today_attendance.filter(status__in=['present', 'late']).count()
-    late_count = today_attendance.filter(is_late=True).count()
-    
-    return {
-        'today_attendance': today_attendance,
-        'present_count': present_count,
-        'late_count': late_count,
-        'today': today
-    }
-
 def role_required(allowed_roles):
     """Decorator to check if user has required role"""
     def decorator(view_func):
+        if iscoroutinefunction(view_func):
+            @wraps(view_func)
+            async def async_wrapper(request, *args, **kwargs):
+                employee = await request.aemployee()
+                if not employee:
+                    messages.error(request, 'Employee profile not found.')
+                    return redirect('login')
+                
+                if employee.role not in allowed_roles:
+                    return HttpResponseForbidden(f"Access denied. {'/'.join(allowed_roles).title()} access required.")
+                
+                return await view_func(request, employee, *args, **kwargs)
+            return async_wrapper
+
         @wraps(view_func)
         def wrapper(request, *args, **kwargs):
-            employee = get_employee_or_none(request.user)
+            employee = request.employee
             if not employee:
                 messages.error(request, 'Employee profile not found.')
                 return redirect('login')
@@ -72,23 +117,12 @@ def role_required(allowed_roles):
         return wrapper
     return decorator
 
-def is_valid_check_in_time(current_time):
-    """Check if current time is valid for check-in"""
-    return time(8, 0) <= current_time <= time(9, 15)
-
-def is_valid_check_out_time(current_time):
-    """Check if current time is valid for check-out"""
-    return current_time >= time(17, 0)
-
-def determine_late_status(check_in_time):
-    """Determine if check-in time is late"""
-    return check_in_time > time(9, 15)
-
 def calculate_work_duration(check_in_time, check_out_time, date_obj):
     """Calculate work duration in hours"""
     return (datetime.combine(date_obj, check_out_time) - 
             datetime.combine(date_obj, check_in_time)).total_seconds() / 3600
 
+@query_budget(10)
 def user_login(request):
     """Login view with role-based redirection"""
     # Check if user is already logged in
@@ -115,12 +149,12 @@ def user_login(request):
             login(request, user)
             
             # Get employee info for detailed welcome message
-            try:
-                employee = Employee.objects.get(user=user)
+            employee = get_employee_or_none(user)
+            if employee:
                 welcome_msg = f'Welcome back, {user.get_full_name() or user.username}! '
                 welcome_msg += f'You are logged in as {employee.get_role_display()} in {employee.get_department_display()}.'
                 messages.success(request, welcome_msg)
-            except Employee.DoesNotExist:
+            else:
                 messages.success(request, f'Welcome back, {user.get_full_name() or user.username}!')
             
             return redirect('dashboard')
@@ -129,6 +163,7 @@ def user_login(request):
     
     return render(request, 'emp_attd/login.html')
 
+@query_budget(4)
 def user_logout(request):
     """Logout view with confirmation"""
     user_name = request.user.get_full_name() or request.user.username if request.user.is_authenticated else 'User'
@@ -136,10 +171,11 @@ def user_logout(request):
     messages.success(request, f'Goodbye {user_name}! You have been logged out successfully.')
     return redirect('login')
 
+@query_budget(3)
 @login_required
 def dashboard(request):
     """Main dashboard that redirects based on user role"""
-    employee = get_employee_or_none(request.user)
+    employee = request.employee
     if not employee:
         messages.error(request, 'Employee profile not found. Please contact administrator.')
         return redirect('login')
@@ -156,73 +192,75 @@ def dashboard(request):
         messages.error(request, 'Unknown role. Please contact administrator.')
         return redirect('login')
 
+def dashboard_validators(request, employee):
+    """Conditional GET validators of a dashboard: the viewer, their attendance today and the fragment versions"""
+    today = timezone.localtime().date()
+    attendance = Attendance.objects.filter(employee=employee, date=today).values_list('updated_at', flat=True).first()
+    fragments = get_dashboard_fragments(today, employee.department if employee.role == 'staff' else None)
+    # Without a shared cache the versions only see this process's writes,
+    # so the ETag also moves on every fragment TTL, as the fragments do
+    period = int(time.time() // max(fragments['ttl'], 1))
+    parts = [
+        request.resolver_match.view_name, today, employee.pk, employee.role, employee.department,
+        employee.updated_at, attendance, sorted(fragments.items()), period,
+    ]
+    return parts, None
+
+@query_budget(7)
 @login_required
 @role_required(['manager'])
+@conditional_page(dashboard_validators)
 def manager_dashboard(request, employee):
     """Manager dashboard view"""
-    # Get all employees for manager overview
-    all_employees = Employee.objects.all().order_by('employee_id')
-    staff_count = Employee.objects.filter(role='staff').count()
-    hr_count = Employee.objects.filter(role='hr_admin').count()  # Updated to hr_admin
-    
-    # Get today's attendance data
-    attendance_stats = get_today_attendance_stats()
-    employee_attendance = get_today_attendance(employee, attendance_stats['today'])
+    # Today's headcount and attendance are only queried when their cached
+    # fragment has to be rendered
+    today = timezone.localtime().date()
+    stats = SimpleLazyObject(lambda: get_dashboard_stats(today))
+    employee_attendance = get_today_attendance(employee, today)
     
     context = {
         'employee': employee,
-        'all_employees': all_employees,
-        'staff_count': staff_count,
-        'hr_count': hr_count,
-        'total_employees': all_employees.count(),
-        'present_count': attendance_stats['present_count'],
-        'late_count': attendance_stats['late_count'],
+        'stats': stats,
+        'fragments': get_dashboard_fragments(today),
         'employee_attendance': employee_attendance,
         'current_time': timezone.localtime(),
     }
     return render(request, 'emp_attd/manager_dashboard.html', context)
 
+@query_budget(7)
 @login_required
 @role_required(['hr_admin'])
+@conditional_page(dashboard_validators)
 def hr_dashboard(request, employee):
     """HR/Admin dashboard view"""
-    # Get employee statistics for HR
-    all_employees = Employee.objects.all().order_by('employee_id')
-    departments = Employee.objects.values_list('department', flat=True).distinct()
-    
-    # Department-wise employee count
-    dept_stats = {}
-    for dept in departments:
-        dept_display = dict(Employee.DEPARTMENT_CHOICES).get(dept, dept)
-        dept_stats[dept_display] = Employee.objects.filter(department=dept).count()
-    
-    # Get today's attendance data
-    attendance_stats = get_today_attendance_stats()
-    absent_count = all_employees.count() - attendance_stats['present_count']
-    employee_attendance = get_today_attendance(employee, attendance_stats['today'])
+    # Department-wise headcount and today's attendance are only queried
+    # when their cached fragments have to be rendered
+    today = timezone.localtime().date()
+    stats = SimpleLazyObject(lambda: get_dashboard_stats(today))
+    employee_attendance = get_today_attendance(employee, today)
     
     context = {
         'employee': employee,
-        'all_employees': all_employees,
-        'total_employees': all_employees.count(),
-        'active_employees': Employee.objects.filter(is_active=True).count(),
-        'dept_stats': dept_stats,
-        'present_count': attendance_stats['present_count'],
-        'late_count': attendance_stats['late_count'],
-        'absent_count': absent_count,
+        'stats': stats,
+        'fragments': get_dashboard_fragments(today),
         'employee_attendance': employee_attendance,
         'current_time': timezone.localtime(),
     }
     return render(request, 'emp_attd/hr_dashboard.html', context)
 
+@query_budget(6)
 @login_required
 @role_required(['staff'])
+@conditional_page(dashboard_validators)
 def employee_dashboard(request, employee):
     """Staff employee dashboard view"""
-    # Get employee's own information and department colleagues
-    colleagues = Employee.objects.filter(
+    # Get employee's own information and department colleagues, which are
+    # only queried when their cached fragment has to be rendered. The
+    # fragment is shared by the department, so it lists the viewer too and
+    # the page hides their row
+    colleagues = Employee.objects.select_related('user').filter(
         department=employee.department
-    ).exclude(user=request.user).order_by('employee_id')
+    ).order_by('employee_id')
     
     # Get today's attendance
     today = timezone.localtime().date()
@@ -231,61 +269,102 @@ def employee_dashboard(request, employee):
     context = {
         'employee': employee,
         'colleagues': colleagues,
+        'fragments': get_dashboard_fragments(today, employee.department),
         'department_name': employee.get_department_display_name(),  # Use new method
         'employee_attendance': employee_attendance,
         'current_time': timezone.localtime(),
     }
     return render(request, 'emp_attd/employee_dashboard.html', context)
 
+@query_budget(4)
 @login_required
-def check_in(request):
-    """Handle check-in functionality"""
-    if request.method != 'POST':
-        return create_json_response(False, 'Invalid request method', 'error')
-    
-    employee = get_employee_or_none(request.user)
-    if not employee:
-        return create_json_response(False, 'Employee profile not found', 'error')
+@role_required(['manager', 'hr_admin'])
+def employee_rows(request, employee):
+    """JSON endpoint feeding the dashboard employee tables page by page"""
+    try:
+        limit = min(max(int(request.GET.get('limit', 50)), 1), 200)
+    except ValueError:
+        limit = 50
     
     today = timezone.localtime().date()
-    now_time = timezone.localtime().time()
+    rows, next_cursor = get_employee_rows(today, request.GET.get('cursor'), limit)
     
-    # Validate check-in time
-    if not is_valid_check_in_time(now_time):
-        return create_json_response(
-            False, 
-            'Check-in is only allowed between 08:00 - 09:15',
-            'error'
-        )
+    departments = dict(Employee.DEPARTMENT_CHOICES)
+    roles = dict(Employee.ROLE_CHOICES)
+    results = []
+    for row in rows:
+        full_name = f"{row['user__first_name']} {row['user__last_name']}".strip()
+        results.append({
+            'employee_id': row['employee_id'],
+            'name': full_name or row['user__username'],
+            'email': row['user__email'],
+            'department': departments.get(row['department'], row['department']),
+            'role': row['role'],
+            'role_display': roles.get(row['role'], row['role']),
+            'phone_number': row['phone_number'],
+            'hire_date': row['hire_date'].isoformat(),
+            'is_active': row['is_active'],
+            'attendance_status': row['attendance_status'] or 'absent',
+            'check_in_time': row['check_in_time'].strftime('%H:%M') if row['check_in_time'] else None,
+            'check_out_time': row['check_out_time'].strftime('%H:%M') if row['check_out_time'] else None,
+            'detail_url': reverse('employee_detail', args=[row['employee_id']]),
+            'edit_url': reverse('employee_edit', args=[row['employee_id']]),
+            'delete_url': reverse('employee_delete', args=[row['employee_id']]),
+            'activate_url': reverse('employee_activate', args=[row['employee_id']]),
+        })
     
-    # Get or create today's attendance record
-    is_late = determine_late_status(now_time)
-    attendance, created = Attendance.objects.get_or_create(
-        employee=employee,
-        date=today,
-        defaults={
-            'check_in_time': now_time,
-            'status': 'late' if is_late else 'present',
-            'is_late': is_late
-        }
-    )
-    
-    if not created and attendance.check_in_time:
+    return JsonResponse({'results': results, 'next_cursor': next_cursor})
+
+def record_today_check_in(employee, today, now_time, is_late):
+    """Record a check-in; returns False when the employee already checked in today"""
+    # The attendance row and the daily summary are written in one
+    # transaction, or later in a batch when buffered
+    if buffering_enabled():
+        # A read does not contend for the writer lock, so duplicates from
+        # earlier flushes are still reported before acknowledging
+        already_checked_in = Attendance.objects.filter(
+            employee=employee, date=today, check_in_time__isnull=False
+        ).exists()
+        return not already_checked_in and get_check_in_buffer().submit(employee.pk, employee.department, today, now_time, is_late)
+
+    # Taken before the rows are written, so it never follows the summary
+    # update a dashboard snapshot could already have counted
+    updated_at = timezone.now()
+    with transaction.atomic():
+        if not upsert_check_in(employee, today, now_time, is_late):
+            return False
+        record_check_in(today, employee.department, is_late)
+        transaction.on_commit(lambda: publish_check_in(employee, today, now_time, is_late, updated_at))
+    return True
+
+def record_today_check_out(employee, today, now_time, shift):
+    """Record a check-out; returns the check-in time, or None when it was rejected"""
+    # Close today's attendance record if it has been open for the shift's
+    # minimum work time, together with the daily summary
+    latest_check_in = datetime.combine(today, now_time) - shift.minimum_work
+    if latest_check_in.date() < today:
+        # Not even a check-in at midnight has worked long enough yet
+        return None
+    latest_check_in = latest_check_in.time()
+    updated_at = timezone.now()
+    with transaction.atomic():
+        check_in_time = complete_check_out(employee, today, now_time, latest_check_in)
+        if check_in_time:
+            record_check_out(today, employee.department)
+            transaction.on_commit(lambda: publish_check_out(employee, today, now_time, updated_at))
+    return check_in_time
+
+def check_in_response(recorded, is_late, now_time):
+    """JSON response for a check-in attempt inside the check-in window"""
+    if not recorded:
         return create_json_response(
             False, 
             'You have already checked in today',
             'warning'
         )
     
-    # Update if not already checked in
-    if not attendance.check_in_time:
-        attendance.check_in_time = now_time
-        attendance.status = 'late' if is_late else 'present'
-        attendance.is_late = is_late
-        attendance.save()
-    
     # Return appropriate response based on late status
-    if attendance.is_late:
+    if is_late:
         return create_json_response(
             True,
             f'🕘 Checked in LATE at {now_time.strftime("%H:%M")}. Please be on time tomorrow.',
@@ -300,29 +379,19 @@ def check_in(request):
             status='on_time'
         )
 
-@login_required
-def check_out(request):
-    """Handle check-out functionality"""
-    if request.method != 'POST':
-        return create_json_response(False, 'Invalid request method', 'error')
-    
-    employee = get_employee_or_none(request.user)
-    if not employee:
-        return create_json_response(False, 'Employee profile not found', 'error')
-    
-    today = timezone.localtime().date()
-    now_time = timezone.localtime().time()
+def check_out_response(check_in_time, now_time, today):
+    """JSON response for a recorded check-out"""
+    work_duration = calculate_work_duration(check_in_time, now_time, today)
     
-    # Validate check-out time
-    if not is_valid_check_out_time(now_time):
-        return create_json_response(
-            False,
-            'Check-out is only allowed after 17:00',
-            'error'
-        )
-    
-    # Get today's attendance record
-    attendance = get_today_attendance(employee, today)
+    return create_json_response(
+        True,
+        f'🏁 Successfully checked out at {now_time.strftime("%H:%M")}. You worked for {work_duration:.1f} hours today. Great job!',
+        'success',
+        work_duration=f'{work_duration:.1f} hours'
+    )
+
+def check_out_rejection(attendance, today, now_time, shift):
+    """Explain why a check-out could not be recorded, given today's attendance record"""
     if not attendance:
         return create_json_response(
             False,
@@ -344,24 +413,251 @@ def check_out(request):
             'warning'
         )
     
-    # Calculate work duration
     work_duration = calculate_work_duration(attendance.check_in_time, now_time, today)
+    earliest_check_out = datetime.combine(today, attendance.check_in_time) + shift.minimum_work
+    return create_json_response(
+        False,
+        f'Minimum work time is {shift.minimum_hours:g} hours. You have worked {work_duration:.1f} hours. Please check out after {earliest_check_out:%H:%M}.',
+        'warning'
+    )
+
+def check_in_closed(shift):
+    """JSON response for a check-in outside the shift's check-in window"""
+    return create_json_response(
+        False,
+        f'Check-in is only allowed between {shift.check_in_start:%H:%M} - {shift.check_in_end:%H:%M}',
+        'error'
+    )
+
+def check_out_closed(shift):
+    """JSON response for a check-out before the shift ends"""
+    return create_json_response(
+        False,
+        f'Check-out is only allowed after {shift.check_out_after:%H:%M}',
+        'error'
+    )
+
+INVALID_METHOD = 'Invalid request method'
+NO_EMPLOYEE = 'Employee profile not found'
+
+@query_budget(8)
+@login_required
+def check_in(request):
+    """Handle check-in functionality"""
+    if request.method != 'POST':
+        return create_json_response(False, INVALID_METHOD, 'error')
     
-    # Check minimum work hours (8 hours)
-    if work_duration < 8.0:
-        return create_json_response(
-            False,
-            f'Minimum work time is 8 hours. You have worked {work_duration:.1f} hours. Please check out after 17:00 if you started at 09:00.',
-            'warning'
-        )
+    employee = request.employee
+    if not employee:
+        return create_json_response(False, NO_EMPLOYEE, 'error')
     
-    # Update attendance record
-    attendance.check_out_time = now_time
-    attendance.save()
+    today = timezone.localtime().date()
+    now_time = timezone.localtime().time()
+    shift = get_shift(employee, today)
     
-    return create_json_response(
-        True,
-        f'🏁 Successfully checked out at {now_time.strftime("%H:%M")}. You worked for {work_duration:.1f} hours today. Great job!',
-        'success',
-        work_duration=f'{work_duration:.1f} hours'
-    )
+    # Validate check-in time
+    if not shift.allows_check_in(now_time):
+        return check_in_closed(shift)
+    
+    is_late = shift.is_late(now_time)
+    recorded = record_today_check_in(employee, today, now_time, is_late)
+    return check_in_response(recorded, is_late, now_time)
+
+@query_budget(8)
+@login_required
+def check_out(request):
+    """Handle check-out functionality"""
+    if request.method != 'POST':
+        return create_json_response(False, INVALID_METHOD, 'error')
+    
+    employee = request.employee
+    if not employee:
+        return create_json_response(False, NO_EMPLOYEE, 'error')
+    
+    today = timezone.localtime().date()
+    now_time = timezone.localtime().time()
+    shift = get_shift(employee, today)
+    
+    # Validate check-out time
+    if not shift.allows_check_out(now_time):
+        return check_out_closed(shift)
+    
+    check_in_time = record_today_check_out(employee, today, now_time, shift)
+    if not check_in_time:
+        return check_out_rejection(get_today_attendance(employee, today), today, now_time, shift)
+    return check_out_response(check_in_time, now_time, today)
+
+# Async versions of the check-in and check-out views, routed instead of the
+# sync ones when ATTENDANCE_ASYNC_VIEWS is on.
+# Session, user and employee lookups use the async ORM. The writes still run
+# in one worker thread call each, because Django's async ORM cannot open a
+# transaction and the row and its summary must be written together.
+
+@query_budget(8)
+@login_required
+async def acheck_in(request):
+    """Handle check-in functionality without holding a worker thread while waiting"""
+    if request.method != 'POST':
+        return create_json_response(False, INVALID_METHOD, 'error')
+    
+    employee = await request.aemployee()
+    if not employee:
+        return create_json_response(False, NO_EMPLOYEE, 'error')
+    
+    today = timezone.localtime().date()
+    now_time = timezone.localtime().time()
+    shift = await aget_shift(employee, today)
+    
+    if not shift.allows_check_in(now_time):
+        return check_in_closed(shift)
+    
+    is_late = shift.is_late(now_time)
+    recorded = await sync_to_async(record_today_check_in)(employee, today, now_time, is_late)
+    return check_in_response(recorded, is_late, now_time)
+
+@query_budget(8)
+@login_required
+async def acheck_out(request):
+    """Handle check-out functionality without holding a worker thread while waiting"""
+    if request.method != 'POST':
+        return create_json_response(False, INVALID_METHOD, 'error')
+    
+    employee = await request.aemployee()
+    if not employee:
+        return create_json_response(False, NO_EMPLOYEE, 'error')
+    
+    today = timezone.localtime().date()
+    now_time = timezone.localtime().time()
+    shift = await aget_shift(employee, today)
+    
+    if not shift.allows_check_out(now_time):
+        return check_out_closed(shift)
+    
+    check_in_time = await sync_to_async(record_today_check_out)(employee, today, now_time, shift)
+    if not check_in_time:
+        return check_out_rejection(await aget_today_attendance(employee, today), today, now_time, shift)
+    return check_out_response(check_in_time, now_time, today)
+
+def event_stream_response(events):
+    """A Server-Sent Events response that proxies must not buffer"""
+    response = StreamingHttpResponse(events, content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+@query_budget(3)
+@login_required
+@role_required(['manager', 'hr_admin'])
+def attendance_live(request, employee):
+    """Stream today's attendance counters and new check-ins to a dashboard as Server-Sent Events"""
+    # Each open stream holds a worker thread; the async view routed with
+    # ATTENDANCE_ASYNC_VIEWS on does not
+    return event_stream_response(stream_events(get_dashboard_stats))
+
+@query_budget(3)
+@login_required
+@role_required(['manager', 'hr_admin'])
+async def aattendance_live(request, employee):
+    """Async version of attendance_live, routed when ATTENDANCE_ASYNC_VIEWS is on"""
+    return event_stream_response(astream_events(sync_to_async(get_dashboard_stats)))
+
+EXPORT_CONTENT_TYPES = {
+    'csv': 'text/csv',
+    'jsonl': 'application/x-ndjson',
+}
+
+@query_budget(3)
+@login_required
+@role_required(['hr_admin'])
+def attendance_export(request, employee):
+    """Stream attendance rows for a date range as CSV or JSON Lines for payroll"""
+    today = timezone.localtime().date()
+    try:
+        start_date = date.fromisoformat(request.GET['start']) if request.GET.get('start') else today.replace(day=1)
+        end_date = date.fromisoformat(request.GET['end']) if request.GET.get('end') else today
+    except ValueError:
+        error = 'Dates must use the YYYY-MM-DD format.'
+    else:
+        error = None
+        if start_date > end_date:
+            error = 'The start date must not be after the end date.'
+
+    department = request.GET.get('department') or None
+    export_format = request.GET.get('format', 'csv')
+    if department and department not in dict(Employee.DEPARTMENT_CHOICES):
+        error = f'Unknown department "{department}".'
+    if export_format not in EXPORT_FORMATS:
+        error = f'Format must be one of: {", ".join(EXPORT_FORMATS)}.'
+
+    if error:
+        response = create_json_response(False, error, 'error')
+        response.status_code = 400
+        return response
+
+    # Rows are read and serialized while the response is being sent
+    rows = get_export_rows(start_date, end_date, department)
+    response = StreamingHttpResponse(export_lines(export_format, rows), content_type=EXPORT_CONTENT_TYPES[export_format])
+    filename = f'attendance-{start_date}-{end_date}{"-" + department if department else ""}.{export_format}'
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+def get_timesheet_filters(request):
+    """Read year, month and department from a timesheet request; returns (filters, error)"""
+    today = timezone.localtime().date()
+    try:
+        year = int(request.GET.get('year') or today.year)
+        month = int(request.GET['month']) if request.GET.get('month') else None
+    except ValueError:
+        return None, 'Year and month must be numbers.'
+    if not 2000 <= year <= today.year + 1:
+        return None, f'Year must be between 2000 and {today.year + 1}.'
+    if month is not None and not 1 <= month <= 12:
+        return None, 'Month must be between 1 and 12.'
+    department = request.GET.get('department') or None
+    if department and department not in dict(Employee.DEPARTMENT_CHOICES):
+        return None, f'Unknown department "{department}".'
+    return {'year': year, 'month': month, 'department': department}, None
+
+@query_budget(18)
+@login_required
+@role_required(['hr_admin'])
+def timesheet_report(request, employee):
+    """Monthly hours worked, present, late and absent days per department and employee"""
+    filters, error = get_timesheet_filters(request)
+    if error:
+        messages.error(request, error)
+        filters = {'year': timezone.localtime().year, 'month': None, 'department': None}
+
+    employee_timesheets = get_employee_timesheets(**filters)
+    paginator = Paginator(employee_timesheets, 50)
+    page_obj = paginator.get_page(request.GET.get('page'))
+
+    query = request.GET.copy()
+    query.pop('page', None)
+    context = {
+        'employee': employee,
+        'filters': filters,
+        'department_timesheets': get_department_timesheets(employee_timesheets),
+        'page_obj': page_obj,
+        'query_string': query.urlencode(),
+        'departments': Employee.DEPARTMENT_CHOICES,
+        'months': [(number, date(2000, number, 1).strftime('%B')) for number in range(1, 13)],
+    }
+    return render(request, 'emp_attd/timesheet_report.html', context)
+
+@query_budget(18)
+@login_required
+@role_required(['hr_admin'])
+def timesheet_api(request, employee):
+    """JSON timesheets per department and, unless group=department, per employee"""
+    filters, error = get_timesheet_filters(request)
+    if error:
+        response = create_json_response(False, error, 'error')
+        response.status_code = 400
+        return response
+
+    employee_timesheets = get_employee_timesheets(**filters)
+    data = {'departments': get_department_timesheets(employee_timesheets)}
+    if request.GET.get('group') != 'department':
+        data['employees'] = employee_timesheets
+    return create_json_response(True, 'Timesheets loaded', 'success', **filters, **data)
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Employee
+from .models import BulkActionJob, Employee
 
 # Register your models here.
 
@@ -9,3 +9,11 @@ class EmployeeAdmin(admin.ModelAdmin):
     list_filter = ['department', 'role', 'is_active', 'hire_date']
     search_fields = ['employee_id', 'user__first_name', 'user__last_name', 'user__username']
     ordering = ['employee_id']
+    list_select_related = ['user']
+
+@admin.register(BulkActionJob)
+class BulkActionJobAdmin(admin.ModelAdmin):
+    list_display = ['id', 'action', 'status', 'processed', 'total', 'updated', 'requested_by', 'created_at', 'finished_at']
+    list_filter = ['action', 'status']
+    readonly_fields = ['processed', 'updated', 'position', 'error', 'created_at', 'updated_at', 'finished_at']
+    exclude = ['employee_ids']
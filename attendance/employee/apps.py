@@ -1,6 +1,18 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class EmployeeConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'employee'
+
+    def ready(self):
+        # Connect the employee cache invalidation signals
+        from . import cache  # noqa: F401
+        # Connect the employee list count cache invalidation signals
+        from . import paging  # noqa: F401
+        # Connect the dashboard fragment invalidation signals
+        from . import fragments  # noqa: F401
+        # Install the search index and its triggers after every migrate
+        from .search import install_after_migrate
+        post_migrate.connect(install_after_migrate, sender=self)
@@ -0,0 +1,165 @@
+import logging
+import queue
+import threading
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+from .cache import employee_cache
+from .fragments import bump_employee_fragments
+from .models import BulkActionJob, Employee
+from .paging import count_cache
+from .search import filter_employee_list
+
+logger = logging.getLogger(__name__)
+
+# Bulk activate and deactivate. A request only records a BulkActionJob
+# naming the employees, as explicit employee IDs or as the employee list
+# filters they match, and hands it to a background worker thread. The
+# worker walks the employees in chunks of CHUNK_SIZE, updating Employee and
+# User of each chunk in one short transaction and saving the job's progress
+# with it, so the writer lock is never held for long, no statement carries
+# more than CHUNK_SIZE parameters and an interrupted job can be resumed
+# with run_bulk_actions.
+
+DEFAULT_SETTINGS = {
+    'BACKGROUND': True,
+    'CHUNK_SIZE': 500,
+}
+
+def get_bulk_settings():
+    """Merge EMPLOYEE_BULK_ACTIONS over the defaults"""
+    options = dict(DEFAULT_SETTINGS)
+    options.update(getattr(settings, 'EMPLOYEE_BULK_ACTIONS', {}))
+    return options
+
+def start_bulk_action(action, requested_by, employee_ids=None, filters=None):
+    """Record a bulk action over employee IDs or list filters and start it.
+
+    In the background by default; with BACKGROUND off it runs before
+    returning. Returns the job.
+    """
+    job = BulkActionJob.objects.create(
+        action=action,
+        requested_by=requested_by,
+        employee_ids=sorted(set(employee_ids)) if employee_ids is not None else None,
+        filters=filters if employee_ids is None else None,
+    )
+    if get_bulk_settings()['BACKGROUND']:
+        # The worker's connection only sees the job once it is committed
+        transaction.on_commit(lambda: get_bulk_worker().submit(job.pk))
+    else:
+        run_bulk_action(job)
+    return job
+
+def _chunks(job, chunk_size):
+    """Yield (position, processed, rows) per chunk from the job's position.
+
+    rows are the (pk, user id) of the chunk's employees.
+    """
+    if job.employee_ids is not None:
+        employee_ids = job.employee_ids
+        for start in range(job.position, len(employee_ids), chunk_size):
+            chunk = employee_ids[start:start + chunk_size]
+            rows = list(Employee.objects.filter(employee_id__in=chunk).order_by().values_list('pk', 'user_id'))
+            yield start + len(chunk), len(chunk), rows
+        return
+
+    employees = filter_employee_list(Employee.objects.all(), job.filters or {}).order_by('pk')
+    last = job.position
+    while True:
+        rows = list(employees.filter(pk__gt=last).values_list('pk', 'user_id')[:chunk_size])
+        if not rows:
+            return
+        last = rows[-1][0]
+        yield last, len(rows), rows
+
+def claim_bulk_action(job):
+    """Mark a job running unless another worker changed it since it was read.
+
+    Compares the status and updated_at the job was read with, so of several
+    workers picking up the same pending or stale running job only one wins.
+    Returns whether this caller may run it.
+    """
+    now = timezone.now()
+    claimed = BulkActionJob.objects.filter(pk=job.pk, status=job.status, updated_at=job.updated_at).update(
+        status='running', updated_at=now,
+    )
+    if claimed:
+        job.status = 'running'
+        job.updated_at = now
+    return bool(claimed)
+
+def run_bulk_action(job):
+    """Run (or resume) a bulk action job chunk by chunk, saving its progress"""
+    chunk_size = get_bulk_settings()['CHUNK_SIZE']
+    is_active = job.action == 'activate'
+
+    job.status = 'running'
+    if job.total is None:
+        if job.employee_ids is not None:
+            job.total = len(job.employee_ids)
+        else:
+            job.total = filter_employee_list(Employee.objects.all(), job.filters or {}).count()
+    job.save(update_fields=['status', 'total', 'updated_at'])
+
+    try:
+        for position, processed, rows in _chunks(job, chunk_size):
+            with transaction.atomic():
+                updated = Employee.objects.filter(pk__in=[pk for pk, _ in rows]).exclude(is_active=is_active).update(
+                    is_active=is_active, updated_at=timezone.now(),
+                )
+                User.objects.filter(pk__in=[user_id for _, user_id in rows]).update(is_active=is_active)
+                job.position = position
+                job.processed += processed
+                job.updated += updated
+                job.save(update_fields=['position', 'processed', 'updated', 'updated_at'])
+            # Queryset updates send no signals
+            employee_cache.clear()
+            count_cache.clear()
+            bump_employee_fragments()
+    except Exception as exc:
+        logger.exception('Bulk action job %s failed', job.pk)
+        job.status = 'failed'
+        job.error = str(exc)
+    else:
+        job.status = 'done'
+    job.finished_at = timezone.now()
+    job.save(update_fields=['status', 'error', 'finished_at', 'updated_at'])
+    return job
+
+
+class BulkActionWorker:
+    """Runs submitted bulk action jobs one at a time on a background thread"""
+
+    def __init__(self):
+        self.jobs = queue.Queue()
+        self.thread = threading.Thread(target=self.run, name='employee-bulk-actions', daemon=True)
+        self.thread.start()
+
+    def submit(self, job_pk):
+        self.jobs.put(job_pk)
+
+    def run(self):
+        while True:
+            job_pk = self.jobs.get()
+            try:
+                job = BulkActionJob.objects.filter(pk=job_pk, status='pending').first()
+                if job is not None and claim_bulk_action(job):
+                    run_bulk_action(job)
+            except Exception:
+                logger.exception('Could not run bulk action job %s', job_pk)
+            finally:
+                close_old_connections()
+
+
+_worker = None
+_worker_lock = threading.Lock()
+
+def get_bulk_worker():
+    """Get this process's bulk action worker, starting it on first use"""
+    global _worker
+    with _worker_lock:
+        if _worker is None:
+            _worker = BulkActionWorker()
+        return _worker
@@ -0,0 +1,114 @@
+import threading
+import time
+from collections import OrderedDict
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from .models import Employee
+
+# Per-process LRU cache of Employee rows keyed by user id. Entries expire
+# after a short TTL and are dropped when the Employee or User is saved or
+# deleted in this process; other processes see changes once their TTL runs
+# out. Each lookup returns a fresh Employee instance, so callers may modify
+# it without affecting the cached copy.
+
+DEFAULT_SETTINGS = {
+    'MAX_SIZE': 1024,
+    'TTL': 30,
+}
+
+_MISSING = object()
+
+
+class EmployeeCache:
+    def __init__(self, max_size=1024, ttl=30):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, user_id):
+        """Get the cached field values for a user, or _MISSING"""
+        with self.lock:
+            entry = self.entries.get(user_id)
+            if entry is None:
+                return _MISSING
+            expires, values = entry
+            if expires < time.monotonic():
+                del self.entries[user_id]
+                return _MISSING
+            self.entries.move_to_end(user_id)
+            return values
+
+    def set(self, user_id, values):
+        """Cache field values (or None when the user has no employee profile)"""
+        if self.ttl <= 0:
+            return
+        with self.lock:
+            self.entries[user_id] = (time.monotonic() + self.ttl, values)
+            self.entries.move_to_end(user_id)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def invalidate(self, user_id):
+        with self.lock:
+            self.entries.pop(user_id, None)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+def _build_cache():
+    options = dict(DEFAULT_SETTINGS)
+    options.update(getattr(settings, 'EMPLOYEE_CACHE', {}))
+    return EmployeeCache(max_size=options['MAX_SIZE'], ttl=options['TTL'])
+
+employee_cache = _build_cache()
+
+_FIELDS = [field.attname for field in Employee._meta.concrete_fields]
+
+def get_cached_employee(user):
+    """Get the employee profile of a user with its `user` already set, or None"""
+    if not user or not user.is_authenticated:
+        return None
+
+    values = employee_cache.get(user.pk)
+    if values is _MISSING:
+        values = Employee.objects.filter(user_id=user.pk).values_list(*_FIELDS).first()
+        employee_cache.set(user.pk, values)
+    if values is None:
+        return None
+
+    return _build_employee(user, values)
+
+async def aget_cached_employee(user):
+    """Async version of get_cached_employee, for async views"""
+    if not user or not user.is_authenticated:
+        return None
+
+    values = employee_cache.get(user.pk)
+    if values is _MISSING:
+        values = await Employee.objects.filter(user_id=user.pk).values_list(*_FIELDS).afirst()
+        employee_cache.set(user.pk, values)
+    if values is None:
+        return None
+
+    return _build_employee(user, values)
+
+def _build_employee(user, values):
+    """An Employee instance from cached field values with its `user` set"""
+    employee = Employee.from_db(Employee.objects.db, _FIELDS, values)
+    employee.user = user
+    return employee
+
+@receiver(post_save, sender=Employee)
+@receiver(post_delete, sender=Employee)
+def invalidate_employee(sender, instance, **kwargs):
+    employee_cache.invalidate(instance.user_id)
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_user(sender, instance, **kwargs):
+    employee_cache.invalidate(instance.pk)
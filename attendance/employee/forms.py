@@ -95,13 +95,50 @@ class EmployeeForm(forms.ModelForm):
         
         return employee
 
+class EmployeeImportRowForm(forms.Form):
+    """Validate one CSV row of an employee import without touching the database.
+
+    Uniqueness is checked for a whole batch of rows at once by the importer.
+    """
+    username = forms.CharField(max_length=150, validators=[User.username_validator])
+    first_name = forms.CharField(max_length=30)
+    last_name = forms.CharField(max_length=30)
+    email = forms.EmailField()
+    employee_id = forms.CharField(max_length=10)
+    phone_number = forms.CharField(max_length=15, required=False)
+    address = forms.CharField(required=False)
+    department = forms.ChoiceField(choices=Employee.DEPARTMENT_CHOICES)
+    role = forms.ChoiceField(choices=Employee.ROLE_CHOICES)
+    hire_date = forms.DateField()
+    salary = forms.DecimalField(max_digits=10, decimal_places=2, required=False)
+    is_active = forms.NullBooleanField(required=False)
+
+    def clean(self):
+        cleaned_data = super().clean()
+        if cleaned_data.get('is_active') is None:
+            cleaned_data['is_active'] = True
+        # Same rules as Employee.clean
+        employee = Employee(
+            employee_id=cleaned_data.get('employee_id'),
+            hire_date=cleaned_data.get('hire_date'),
+        )
+        employee.clean()
+        return cleaned_data
+
+class EmployeeImportForm(forms.Form):
+    file = forms.FileField(
+        label='CSV file',
+        widget=forms.ClearableFileInput(attrs={'class': 'form-control', 'accept': '.csv,text/csv'})
+    )
+
 class EmployeeSearchForm(forms.Form):
     search = forms.CharField(
         max_length=100, 
         required=False,
         widget=forms.TextInput(attrs={
             'placeholder': 'Search by name, employee ID, or email...',
-            'class': 'form-control'
+            'class': 'form-control',
+            'autocomplete': 'off'
         })
     )
     department = forms.ChoiceField(
@@ -196,7 +233,8 @@ class EmployeeProfileForm(forms.ModelForm):
             user.email = self.cleaned_data['email']
             
             if commit:
-                user.save()
-                employee.save()
+                # Only the fields this form edits, so nothing else is written back
+                user.save(update_fields=['first_name', 'last_name', 'email'])
+                employee.save(update_fields=[*self.Meta.fields, 'updated_at'])
         
         return employee
@@ -0,0 +1,50 @@
+from django.contrib.auth.models import User
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+from attendance.fragments import EMPLOYEES_SCOPE, bump_fragment_versions_on_commit, department_scope
+from .models import Employee
+
+# Dashboard fragment versions owned by employee data: headcounts are keyed
+# by the employees version and colleague lists by their department's. An
+# employee saved or deleted bumps both, including the department it was
+# loaded with when it has moved, and so does a change to the fields of its
+# user that dashboards show. Bulk writes send no signals and call
+# bump_employee_fragments themselves.
+
+# User fields shown in dashboard fragments; saves of other fields only (a
+# login's last_login) leave the fragments alone
+USER_FIELDS = {'username', 'first_name', 'last_name', 'email', 'is_active'}
+
+def bump_employee_fragments(departments=None):
+    """Bump the employees version and those of some departments (default: all)"""
+    if departments is None:
+        departments = [value for value, _ in Employee.DEPARTMENT_CHOICES]
+    bump_fragment_versions_on_commit(EMPLOYEES_SCOPE, *(department_scope(department) for department in set(departments)))
+
+@receiver(post_init, sender=Employee)
+def remember_department(sender, instance, **kwargs):
+    # Read from __dict__ so a deferred department is not loaded
+    instance._loaded_department = instance.__dict__.get('department')
+
+@receiver(post_save, sender=Employee)
+@receiver(post_delete, sender=Employee)
+def invalidate_employee_fragments(sender, instance, **kwargs):
+    departments = {instance.department, instance._loaded_department} - {None}
+    bump_employee_fragments(departments)
+    instance._loaded_department = instance.department
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_user_fragments(sender, instance, created=False, update_fields=None, **kwargs):
+    # A new user has no employee yet
+    if created or (update_fields is not None and not USER_FIELDS & set(update_fields)):
+        return
+    # The employee is usually cached on the user already, by select_related
+    # or the employee cache, so its department costs no query
+    employee = User.employee_profile.related.get_cached_value(instance, default=None)
+    if employee is not None:
+        departments = [employee.department]
+    else:
+        departments = list(Employee.objects.filter(user_id=instance.pk).values_list('department', flat=True))
+    if departments:
+        bump_employee_fragments(departments)
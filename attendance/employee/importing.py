@@ -0,0 +1,155 @@
+import csv
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import IntegrityError, transaction
+from .cache import employee_cache
+from .forms import EmployeeImportRowForm
+from .fragments import bump_employee_fragments
+from .models import Employee
+from .paging import count_cache
+
+# Streaming employee import from CSV. Rows are parsed lazily and handled in
+# batches: each batch is validated in memory, checked for uniqueness with one
+# IN query per unique field and written with two bulk inserts, so memory use
+# is bounded by the batch size plus the set of keys already seen in the file.
+
+IMPORT_COLUMNS = [
+    'username', 'first_name', 'last_name', 'email', 'employee_id', 'phone_number',
+    'address', 'department', 'role', 'hire_date', 'salary', 'is_active',
+]
+
+REQUIRED_COLUMNS = ['username', 'first_name', 'last_name', 'email', 'employee_id', 'department', 'role', 'hire_date']
+
+IMPORT_BATCH_SIZE = 1000
+
+# Unique fields checked per batch: (row field, model, model lookup, message)
+UNIQUE_FIELDS = [
+    ('username', User, 'username', 'A user with this username already exists.'),
+    ('email', User, 'email', 'A user with this email already exists.'),
+    ('employee_id', Employee, 'employee_id', 'An employee with this ID already exists.'),
+]
+
+class ImportFormatError(ValueError):
+    """Raised when the file cannot be imported at all, such as a missing column"""
+
+
+def read_rows(lines):
+    """Yield (line number, row dict) pairs from an iterable of CSV text lines"""
+    reader = csv.DictReader(lines)
+    if reader.fieldnames is None:
+        raise ImportFormatError('The file is empty.')
+    headers = [name.strip() for name in reader.fieldnames]
+    missing = [column for column in REQUIRED_COLUMNS if column not in headers]
+    if missing:
+        raise ImportFormatError(f'Missing required columns: {", ".join(missing)}.')
+    reader.fieldnames = headers
+
+    for row in reader:
+        yield reader.line_num, {
+            column: (row.get(column) or '').strip()
+            for column in IMPORT_COLUMNS
+        }
+
+def import_employees(lines, password=None, batch_size=IMPORT_BATCH_SIZE, on_error=None):
+    """Import employees from CSV text lines.
+
+    `on_error(line_number, errors)` is called for every rejected row, with
+    errors as a dict of field name to messages. Users get `password`, or an
+    unusable password when none is given. Returns a dict with the number of
+    rows read, created and rejected.
+    """
+    hashed_password = make_password(password)
+    seen = {field: set() for field, *_ in UNIQUE_FIELDS}
+    result = {'rows': 0, 'created': 0, 'rejected': 0}
+
+    def reject(line_number, errors):
+        result['rejected'] += 1
+        if on_error:
+            on_error(line_number, errors)
+
+    batch = []
+    for line_number, row in read_rows(lines):
+        result['rows'] += 1
+        form = EmployeeImportRowForm(row)
+        if not form.is_valid():
+            reject(line_number, {field: list(messages) for field, messages in form.errors.items()})
+            continue
+        batch.append((line_number, form.cleaned_data))
+        if len(batch) == batch_size:
+            _import_batch(batch, seen, hashed_password, result, reject)
+            batch = []
+    if batch:
+        _import_batch(batch, seen, hashed_password, result, reject)
+
+    employee_cache.clear()
+    count_cache.clear()
+    bump_employee_fragments()
+    return result
+
+def _import_batch(batch, seen, hashed_password, result, reject):
+    """Check a batch of valid rows for duplicates and bulk insert the rest"""
+    existing = {}
+    for field, model, lookup, _ in UNIQUE_FIELDS:
+        values = {data[field] for _, data in batch}
+        existing[field] = set(
+            model.objects.filter(**{f'{lookup}__in': values}).order_by().values_list(lookup, flat=True)
+        )
+
+    accepted = []
+    for line_number, data in batch:
+        errors = {}
+        for field, _, _, message in UNIQUE_FIELDS:
+            if data[field] in existing[field]:
+                errors[field] = [message]
+            elif data[field] in seen[field]:
+                errors[field] = [f'Duplicate {field.replace("_", " ")} earlier in the file.']
+        if errors:
+            reject(line_number, errors)
+            continue
+        for field, *_ in UNIQUE_FIELDS:
+            seen[field].add(data[field])
+        accepted.append((line_number, data))
+
+    if not accepted:
+        return
+
+    try:
+        with transaction.atomic():
+            users = User.objects.bulk_create([
+                User(
+                    username=data['username'],
+                    first_name=data['first_name'],
+                    last_name=data['last_name'],
+                    email=data['email'],
+                    password=hashed_password,
+                )
+                for _, data in accepted
+            ])
+            if users[0].pk is None:
+                # Backends that cannot return inserted ids
+                ids = dict(User.objects.filter(
+                    username__in=[user.username for user in users]
+                ).values_list('username', 'pk'))
+                for user in users:
+                    user.pk = ids[user.username]
+            Employee.objects.bulk_create([
+                Employee(
+                    user=user,
+                    employee_id=data['employee_id'],
+                    phone_number=data['phone_number'] or None,
+                    address=data['address'] or None,
+                    department=data['department'],
+                    role=data['role'],
+                    hire_date=data['hire_date'],
+                    salary=data['salary'],
+                    is_active=data['is_active'],
+                )
+                for user, (_, data) in zip(users, accepted)
+            ])
+    except IntegrityError:
+        # Another writer inserted a conflicting row after the batch was checked
+        for line_number, _ in accepted:
+            reject(line_number, {'__all__': ['Conflicts with an employee created during the import; import this row again.']})
+        return
+
+    result['created'] += len(accepted)
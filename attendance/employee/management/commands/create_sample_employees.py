@@ -1,13 +1,24 @@
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
 from django.contrib.auth.models import User
 from employee.models import Employee
+from employee.seeding import bulk_seed_employees
 from datetime import date, datetime
 import random
+import time
 
 class Command(BaseCommand):
     help = 'Create sample employee data'
 
+    def add_arguments(self, parser):
+        parser.add_argument('--count', type=int, help='Generate this many synthetic employees in bulk instead of the 10 samples')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed for the synthetic employees')
+        parser.add_argument('--batch-size', type=int, default=5000, help='Employees per bulk insert transaction')
+        parser.add_argument('--password', default='password123', help='Password shared by every synthetic user')
+
     def handle(self, *args, **options):
+        if options['count'] is not None:
+            return self.create_bulk(options)
+
         self.stdout.write(self.style.SUCCESS('Creating sample employee data...'))
         
         # Sample data
@@ -178,3 +189,26 @@ class Command(BaseCommand):
         self.stdout.write(
             self.style.SUCCESS('Successfully created 10 employees: 1 Manager, 1 HR/Admin, 8 Staff')
         )
+
+    def create_bulk(self, options):
+        """Generate synthetic employees with batched bulk inserts"""
+        if options['count'] < 1:
+            raise CommandError('--count must be at least 1.')
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be at least 1.')
+
+        self.stdout.write(self.style.SUCCESS(f'Creating {options["count"]} synthetic employees (seed {options["seed"]})...'))
+        Employee.objects.all().delete()
+        User.objects.filter(is_superuser=False).delete()
+
+        started = time.perf_counter()
+        created = bulk_seed_employees(
+            options['count'],
+            seed=options['seed'],
+            password=options['password'],
+            batch_size=options['batch_size'],
+            progress=lambda done: self.stdout.write(f'  {done}/{options["count"]}'),
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'Successfully created {created} employees in {time.perf_counter() - started:.1f}s'
+        ))
@@ -0,0 +1,52 @@
+import csv
+import time
+from django.core.management.base import BaseCommand, CommandError
+from employee.importing import IMPORT_BATCH_SIZE, ImportFormatError, import_employees
+
+class Command(BaseCommand):
+    help = 'Import employees from a CSV file with one header row'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV file to import')
+        parser.add_argument('--password', help='Password for every imported user (default: unusable password)')
+        parser.add_argument('--batch-size', type=int, default=IMPORT_BATCH_SIZE, help='Rows validated and inserted together')
+        parser.add_argument('--errors', help='Write rejected rows to this CSV file instead of the console')
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be at least 1.')
+
+        error_file = open(options['errors'], 'w', newline='', encoding='utf-8') if options['errors'] else None
+        if error_file:
+            error_writer = csv.writer(error_file)
+            error_writer.writerow(['line', 'field', 'message'])
+
+        def on_error(line_number, errors):
+            for field, messages in errors.items():
+                for message in messages:
+                    if error_file:
+                        error_writer.writerow([line_number, field, message])
+                    else:
+                        self.stderr.write(f'line {line_number}: {field}: {message}')
+
+        started = time.perf_counter()
+        try:
+            with open(options['path'], newline='', encoding='utf-8-sig') as csv_file:
+                result = import_employees(
+                    csv_file,
+                    password=options['password'],
+                    batch_size=options['batch_size'],
+                    on_error=on_error,
+                )
+        except OSError as e:
+            raise CommandError(f'Could not read {options["path"]}: {e}')
+        except ImportFormatError as e:
+            raise CommandError(str(e))
+        finally:
+            if error_file:
+                error_file.close()
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Imported {result["created"]} of {result["rows"]} rows in {time.perf_counter() - started:.1f}s; '
+            f'{result["rejected"]} rejected'
+        ))
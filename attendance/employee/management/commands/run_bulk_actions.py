@@ -0,0 +1,35 @@
+from datetime import timedelta
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Q
+from django.utils import timezone
+from employee.bulk import claim_bulk_action, run_bulk_action
+from employee.models import BulkActionJob
+
+class Command(BaseCommand):
+    help = 'Run bulk action jobs left pending, or resume running ones whose worker has stopped'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--stale-minutes', type=int, default=10,
+                            help='Resume running jobs without progress for this many minutes')
+
+    def handle(self, *args, **options):
+        if options['stale_minutes'] < 0:
+            raise CommandError('--stale-minutes cannot be negative.')
+
+        stale_before = timezone.now() - timedelta(minutes=options['stale_minutes'])
+        jobs = BulkActionJob.objects.filter(
+            Q(status='pending') | Q(status='running', updated_at__lt=stale_before)
+        ).order_by('created_at')
+
+        count = 0
+        for job in jobs:
+            if not claim_bulk_action(job):
+                self.stdout.write(f'Job {job.pk}: skipped, picked up by another worker')
+                continue
+            job = run_bulk_action(job)
+            count += 1
+            if job.status == 'failed':
+                self.stderr.write(f'Job {job.pk} failed after {job.processed} employees: {job.error}')
+            else:
+                self.stdout.write(f'Job {job.pk}: {job.get_action_display().lower()}d {job.updated} of {job.processed} employees')
+        self.stdout.write(self.style.SUCCESS(f'Ran {count} bulk action job{"s" if count != 1 else ""}'))
@@ -0,0 +1,42 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.utils.functional import SimpleLazyObject
+from .cache import aget_cached_employee, get_cached_employee
+
+
+async def aget_employee(request):
+    """Get the logged-in user's Employee profile from an async view, once per request"""
+    if not hasattr(request, '_acached_employee'):
+        request._acached_employee = await aget_cached_employee(await request.auser())
+    return request._acached_employee
+
+
+class CurrentEmployeeMiddleware:
+    """Attach the logged-in user's Employee profile as a lazily loaded `request.employee`.
+
+    The profile comes from the per-process employee cache, so role checks,
+    views and templates share one lookup per request at most. It evaluates
+    to None for anonymous users and users without a profile. Async views
+    await `request.aemployee()` instead, which never blocks the event loop.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        self.attach(request)
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        self.attach(request)
+        return await self.get_response(request)
+
+    def attach(self, request):
+        request.employee = SimpleLazyObject(lambda: get_cached_employee(request.user))
+        request.aemployee = lambda: aget_employee(request)
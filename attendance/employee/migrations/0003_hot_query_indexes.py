@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-17 17:27
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employee', '0002_update_employee_fields'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='employee',
+            index=models.Index(fields=['department', 'role', 'is_active', 'employee_id'], name='employee_dept_role_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='employee',
+            index=models.Index(fields=['department', 'employee_id'], name='employee_dept_emp_id_idx'),
+        ),
+    ]
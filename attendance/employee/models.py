@@ -82,5 +82,62 @@ class Employee(models.Model):
     
     class Meta:
         ordering = ['employee_id']
+        indexes = [
+            # Headcount grouping and the department/role/status filters of the
+            # employee list, already sorted by the default ordering
+            models.Index(fields=['department', 'role', 'is_active', 'employee_id'], name='employee_dept_role_active_idx'),
+            # Department colleague lookups ordered by employee ID
+            models.Index(fields=['department', 'employee_id'], name='employee_dept_emp_id_idx'),
+        ]
         verbose_name = 'Employee'
         verbose_name_plural = 'Employees'
+
+
+class BulkActionJob(models.Model):
+    """An activate or deactivate run over many employees by the bulk action worker.
+
+    The employees are either an explicit list of employee IDs or the
+    employee list filters they matched. `position` is how far the job has
+    got: the index into `employee_ids`, or the last employee pk handled.
+    """
+    ACTION_CHOICES = [
+        ('activate', 'Activate'),
+        ('deactivate', 'Deactivate'),
+    ]
+    
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ]
+    
+    action = models.CharField(max_length=10, choices=ACTION_CHOICES)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    employee_ids = models.JSONField(blank=True, null=True)
+    filters = models.JSONField(blank=True, null=True)
+    requested_by = models.ForeignKey(User, on_delete=models.SET_NULL, blank=True, null=True, related_name='+')
+    total = models.PositiveIntegerField(blank=True, null=True)
+    processed = models.PositiveIntegerField(default=0)
+    updated = models.PositiveIntegerField(default=0)
+    position = models.BigIntegerField(default=0)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            # Unfinished jobs picked up by run_bulk_actions
+            models.Index(fields=['status', 'updated_at'], name='employee_bulk_status_idx'),
+        ]
+        verbose_name = 'Bulk Action Job'
+        verbose_name_plural = 'Bulk Action Jobs'
+    
+    def __str__(self):
+        return f"{self.get_action_display()} - {self.processed}/{self.total if self.total is not None else '?'} - {self.status}"
+    
+    @property
+    def is_finished(self):
+        return self.status in ('done', 'failed')
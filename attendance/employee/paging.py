@@ -0,0 +1,178 @@
+import base64
+import binascii
+import json
+import threading
+import time
+from collections import OrderedDict
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from .models import Employee
+
+# Keyset pagination of the employee list. A page is the next (or previous)
+# rows by employee_id from the cursor row, so every page is one indexed
+# range read whatever its position, unlike OFFSET. Cursors are opaque
+# tokens carrying a direction and the boundary employee ID; the list
+# filters travel in the query string next to them. The total shown above
+# the list comes from a per-process cache of counts keyed by the filters,
+# which expires after a short TTL and is cleared when an employee or user
+# is saved or deleted in this process.
+
+DEFAULT_SETTINGS = {
+    'PER_PAGE': 10,
+    'COUNT_TTL': 60,  # seconds
+    'COUNT_CACHE_SIZE': 256,
+}
+
+AFTER = 'a'
+BEFORE = 'b'
+
+
+def get_list_settings():
+    options = dict(DEFAULT_SETTINGS)
+    options.update(getattr(settings, 'EMPLOYEE_LIST', {}))
+    return options
+
+def encode_cursor(direction, employee_id):
+    """Opaque cursor of the rows after or before an employee ID"""
+    token = json.dumps([direction, employee_id], separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(token).decode().rstrip('=')
+
+def decode_cursor(cursor):
+    """Get the (direction, employee ID) of a cursor, or (AFTER, None) for the first page"""
+    if not cursor:
+        return AFTER, None
+    try:
+        token = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        direction, employee_id = json.loads(token)
+    except (binascii.Error, ValueError, TypeError):
+        return AFTER, None
+    if direction not in (AFTER, BEFORE) or not isinstance(employee_id, str):
+        return AFTER, None
+    return direction, employee_id
+
+# The last page is the rows before the end of the list
+LAST_CURSOR = encode_cursor(BEFORE, '')
+
+
+class EmployeePage:
+    """One keyset page of employees with the cursors of its neighbours"""
+
+    def __init__(self, object_list, count, previous_cursor=None, next_cursor=None):
+        self.object_list = object_list
+        self.count = count
+        self.previous_cursor = previous_cursor
+        self.next_cursor = next_cursor
+        self.last_cursor = LAST_CURSOR
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    @property
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_other_pages(self):
+        return self.has_previous or self.has_next
+
+
+def get_employee_page(employees, cursor=None, per_page=10, count=None):
+    """Get the page of an Employee queryset at a cursor, ordered by employee_id"""
+    direction, key = decode_cursor(cursor)
+    if direction == BEFORE:
+        if key:
+            employees = employees.filter(employee_id__lt=key)
+        rows = list(employees.order_by('-employee_id')[:per_page + 1])
+        more = len(rows) > per_page
+        rows = rows[:per_page][::-1]
+        has_previous, has_next = more, bool(key)
+    else:
+        if key:
+            employees = employees.filter(employee_id__gt=key)
+        rows = list(employees.order_by('employee_id')[:per_page + 1])
+        more = len(rows) > per_page
+        rows = rows[:per_page]
+        has_previous, has_next = key is not None, more
+
+    # A cursor past either end of the list still links back to the rows
+    first = rows[0].employee_id if rows else key
+    last = rows[-1].employee_id if rows else key
+    return EmployeePage(
+        rows,
+        count,
+        previous_cursor=encode_cursor(BEFORE, first) if has_previous and first else None,
+        next_cursor=encode_cursor(AFTER, last) if has_next and last else None,
+    )
+
+
+class CountCache:
+    def __init__(self, max_size=256, ttl=60):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        # Bumped on every change, so a count taken before the change is not kept
+        self.generation = 0
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        """Get the cached count of a filter set, or None"""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            expires, count = entry
+            if expires < time.monotonic():
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return count
+
+    def set(self, key, count, generation):
+        """Cache a count taken during `generation`, unless a change came since"""
+        if self.ttl <= 0:
+            return
+        with self.lock:
+            if generation != self.generation:
+                return
+            self.entries[key] = (time.monotonic() + self.ttl, count)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.generation += 1
+
+
+def _build_cache():
+    options = get_list_settings()
+    return CountCache(max_size=options['COUNT_CACHE_SIZE'], ttl=options['COUNT_TTL'])
+
+count_cache = _build_cache()
+
+def get_employee_count(employees, filters):
+    """Get the number of employees matching a filter set, counting only on a cache miss"""
+    key = tuple(sorted(filters.items()))
+    count = count_cache.get(key)
+    if count is None:
+        generation = count_cache.generation
+        count = employees.count()
+        count_cache.set(key, count, generation)
+    return count
+
+@receiver(post_save, sender=Employee)
+@receiver(post_delete, sender=Employee)
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_counts(sender, instance, **kwargs):
+    count_cache.clear()
@@ -0,0 +1,183 @@
+import re
+from django.db import connection, connections
+from django.db.models import Case, F, IntegerField, Q, Value, When
+from django.db.models.expressions import RawSQL
+from .models import Employee
+
+# Employee search by name, email and employee ID. On SQLite an FTS5 index
+# keyed by employee id holds those four columns; triggers on the employee
+# and user tables keep it in step with every write, including bulk inserts
+# and queryset updates, and every word of a search matches as a prefix.
+# Elsewhere the search falls back to case-insensitive LIKE filters, which
+# PostgreSQL serves from trigram indexes. The index, triggers and trigram
+# indexes are (re)installed after every migrate, since SQLite drops a
+# table's triggers whenever a migration rebuilds it.
+
+SEARCH_TABLE = 'employee_search_index'
+
+TYPEAHEAD_LIMIT = 10
+MAX_TYPEAHEAD_LIMIT = 50
+
+# bm25 weights of first name, last name, email and employee ID
+RANK_WEIGHTS = (10.0, 10.0, 2.0, 5.0)
+
+_INDEX_COLUMNS = 'rowid, first_name, last_name, email, employee_id'
+
+SQLITE_TABLE = f'''
+CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5(
+    first_name, last_name, email, employee_id,
+    tokenize = "unicode61 remove_diacritics 2",
+    prefix = '1 2 3'
+)
+'''
+
+SQLITE_TRIGGERS = {
+    'employee_search_employee_insert': f'''
+        AFTER INSERT ON employee_employee BEGIN
+            INSERT INTO {SEARCH_TABLE} ({_INDEX_COLUMNS})
+            SELECT NEW.id, u.first_name, u.last_name, u.email, NEW.employee_id FROM auth_user u WHERE u.id = NEW.user_id;
+        END
+    ''',
+    'employee_search_employee_update': f'''
+        AFTER UPDATE OF employee_id, user_id ON employee_employee BEGIN
+            DELETE FROM {SEARCH_TABLE} WHERE rowid = OLD.id;
+            INSERT INTO {SEARCH_TABLE} ({_INDEX_COLUMNS})
+            SELECT NEW.id, u.first_name, u.last_name, u.email, NEW.employee_id FROM auth_user u WHERE u.id = NEW.user_id;
+        END
+    ''',
+    'employee_search_employee_delete': f'''
+        AFTER DELETE ON employee_employee BEGIN
+            DELETE FROM {SEARCH_TABLE} WHERE rowid = OLD.id;
+        END
+    ''',
+    'employee_search_user_update': f'''
+        AFTER UPDATE OF first_name, last_name, email ON auth_user BEGIN
+            DELETE FROM {SEARCH_TABLE} WHERE rowid IN (SELECT id FROM employee_employee WHERE user_id = NEW.id);
+            INSERT INTO {SEARCH_TABLE} ({_INDEX_COLUMNS})
+            SELECT e.id, NEW.first_name, NEW.last_name, NEW.email, e.employee_id FROM employee_employee e WHERE e.user_id = NEW.id;
+        END
+    ''',
+}
+
+# Django's icontains compares UPPER(column::text), so the indexes use the
+# same expression
+POSTGRESQL_INDEXES = [
+    ('auth_user_first_name_trgm_idx', 'auth_user', 'first_name'),
+    ('auth_user_last_name_trgm_idx', 'auth_user', 'last_name'),
+    ('auth_user_email_trgm_idx', 'auth_user', 'email'),
+    ('employee_employee_id_trgm_idx', 'employee_employee', 'employee_id'),
+]
+
+def uses_search_index():
+    """Check whether searches go through the FTS5 index"""
+    return connection.vendor == 'sqlite'
+
+def rebuild_search_index(using='default'):
+    """Refill the SQLite search index from the employee and user tables"""
+    with connections[using].cursor() as cursor:
+        cursor.execute(f'DELETE FROM {SEARCH_TABLE}')
+        cursor.execute(
+            f'INSERT INTO {SEARCH_TABLE} ({_INDEX_COLUMNS}) '
+            f'SELECT e.id, u.first_name, u.last_name, u.email, e.employee_id '
+            f'FROM employee_employee e JOIN auth_user u ON u.id = e.user_id'
+        )
+
+def install_search_index(using='default'):
+    """Create whatever part of the search index is missing; returns True if anything was"""
+    db = connections[using]
+    with db.cursor() as cursor:
+        if db.vendor == 'sqlite':
+            cursor.execute(
+                "SELECT name FROM sqlite_master WHERE type IN ('table', 'trigger') AND name LIKE 'employee_search%'"
+            )
+            existing = {name for name, in cursor.fetchall()}
+            missing = [name for name in [SEARCH_TABLE, *SQLITE_TRIGGERS] if name not in existing]
+            if not missing:
+                return False
+            cursor.execute(SQLITE_TABLE)
+            for name, body in SQLITE_TRIGGERS.items():
+                cursor.execute(f'CREATE TRIGGER IF NOT EXISTS {name} {body}')
+            # Writes made while a trigger was missing were not indexed
+            rebuild_search_index(using)
+            return True
+        if db.vendor == 'postgresql':
+            cursor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+            for name, table, column in POSTGRESQL_INDEXES:
+                cursor.execute(f'CREATE INDEX IF NOT EXISTS {name} ON {table} USING gin (UPPER({column}::text) gin_trgm_ops)')
+            return True
+    return False
+
+def install_after_migrate(sender, using='default', **kwargs):
+    """post_migrate receiver that installs the search index"""
+    install_search_index(using)
+
+
+def match_query(search):
+    """FTS5 query matching every word of a search as a prefix, or '' when it has no words"""
+    return ' '.join(f'"{word}"*' for word in re.findall(r'\w+', search))
+
+def _contains(search):
+    return (
+        Q(user__first_name__icontains=search) |
+        Q(user__last_name__icontains=search) |
+        Q(user__email__icontains=search) |
+        Q(employee_id__icontains=search)
+    )
+
+def filter_employees(employees, search):
+    """Narrow an Employee queryset to the employees matching a search"""
+    query = match_query(search) if uses_search_index() else ''
+    if not query:
+        return employees.filter(_contains(search))
+    return employees.filter(pk__in=RawSQL(f'SELECT rowid FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s', [query]))
+
+def search_employees(search, limit=TYPEAHEAD_LIMIT):
+    """Get the best `limit` matches of a search in one query, best first.
+
+    Returns dicts with the employee's pk, employee_id, first_name,
+    last_name, email, department and is_active.
+    """
+    fields = ['pk', 'employee_id', 'first_name', 'last_name', 'email', 'department', 'is_active']
+    query = match_query(search) if uses_search_index() else ''
+    if query:
+        weights = ', '.join(str(weight) for weight in RANK_WEIGHTS)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT e.id, e.employee_id, u.first_name, u.last_name, u.email, e.department, e.is_active '
+                f'FROM {SEARCH_TABLE} '
+                f'JOIN employee_employee e ON e.id = {SEARCH_TABLE}.rowid '
+                f'JOIN auth_user u ON u.id = e.user_id '
+                f'WHERE {SEARCH_TABLE} MATCH %s '
+                f'ORDER BY bm25({SEARCH_TABLE}, {weights}), e.employee_id '
+                f'LIMIT %s',
+                [query, limit],
+            )
+            return [dict(zip(fields, (*row[:6], bool(row[6])))) for row in cursor.fetchall()]
+
+    # Without the index, names and IDs starting with the search rank first
+    search = search.strip()
+    rank = Case(
+        When(employee_id__istartswith=search, then=Value(0)),
+        When(Q(user__first_name__istartswith=search) | Q(user__last_name__istartswith=search), then=Value(1)),
+        default=Value(2),
+        output_field=IntegerField(),
+    )
+    return list(
+        Employee.objects.filter(_contains(search))
+        .annotate(rank=rank)
+        .order_by('rank', 'employee_id')
+        .values('pk', 'employee_id', 'department', 'is_active',
+                first_name=F('user__first_name'), last_name=F('user__last_name'), email=F('user__email'))[:limit]
+    )
+
+def filter_employee_list(employees, filters):
+    """Apply the employee list filters (cleaned EmployeeSearchForm values) to a queryset"""
+    if filters.get('search'):
+        employees = filter_employees(employees, filters['search'])
+    if filters.get('department'):
+        employees = employees.filter(department=filters['department'])
+    if filters.get('role'):
+        employees = employees.filter(role=filters['role'])
+    if filters.get('is_active'):
+        employees = employees.filter(is_active=filters['is_active'].lower() == 'true')
+    return employees
@@ -0,0 +1,129 @@
+import random
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import transaction
+from datetime import date, timedelta
+from decimal import Decimal
+from .cache import employee_cache
+from .fragments import bump_employee_fragments
+from .models import Employee
+from .paging import count_cache
+
+# Synthetic employees for load tests, benchmarks and staging environments.
+
+def seed_employees(count, password='password123'):
+    """Bulk create employees spread across every department and role"""
+    departments = [value for value, _ in Employee.DEPARTMENT_CHOICES]
+    roles = [value for value, _ in Employee.ROLE_CHOICES]
+    hashed_password = make_password(password)
+    # bulk_create sends no signals, so drop profiles cached under reused user ids
+    # and the employee list counts
+    employee_cache.clear()
+    count_cache.clear()
+    bump_employee_fragments()
+
+    users = User.objects.bulk_create([
+        User(
+            username=f'seed{index}',
+            first_name='Seed',
+            last_name=f'Employee{index}',
+            email=f'seed{index}@company.com',
+            password=hashed_password,
+        )
+        for index in range(1, count + 1)
+    ])
+    return Employee.objects.bulk_create([
+        Employee(
+            user=user,
+            employee_id=f'EMP{index:05d}',
+            department=departments[index % len(departments)],
+            role=roles[index % len(roles)],
+            hire_date=date(2022, 1, 1),
+        )
+        for index, user in enumerate(users, start=1)
+    ])
+
+
+FIRST_NAMES = [
+    'James', 'Mary', 'Robert', 'Patricia', 'John', 'Jennifer', 'Michael', 'Linda', 'David', 'Elizabeth',
+    'William', 'Barbara', 'Richard', 'Susan', 'Joseph', 'Jessica', 'Thomas', 'Sarah', 'Daniel', 'Karen',
+    'Budi', 'Siti', 'Agus', 'Dewi', 'Rizky', 'Putri', 'Andi', 'Ayu', 'Hendra', 'Rina',
+]
+
+LAST_NAMES = [
+    'Smith', 'Johnson', 'Williams', 'Brown', 'Jones', 'Garcia', 'Miller', 'Davis', 'Martinez', 'Wilson',
+    'Anderson', 'Taylor', 'Thomas', 'Moore', 'Jackson', 'Santoso', 'Wijaya', 'Saputra', 'Hidayat', 'Lestari',
+]
+
+# One manager per 20 employees and one HR/Admin per 50; everyone else is staff
+ROLE_WEIGHTS = [('manager', 5), ('hr_admin', 2), ('staff', 93)]
+
+def generate_employee_rows(count, seed=0, start=1):
+    """Yield deterministic (user fields, employee fields) pairs for synthetic employees.
+
+    The same seed always produces the same people; usernames, emails and
+    employee IDs come from the running index, so they are unique without
+    looking at the database.
+    """
+    rng = random.Random(seed)
+    departments = [value for value, _ in Employee.DEPARTMENT_CHOICES]
+    roles = [role for role, _ in ROLE_WEIGHTS]
+    weights = [weight for _, weight in ROLE_WEIGHTS]
+    first_hire_date = date(2015, 1, 1)
+
+    for index in range(start, start + count):
+        first_name = rng.choice(FIRST_NAMES)
+        last_name = rng.choice(LAST_NAMES)
+        username = f'{first_name}.{last_name}{index}'.lower()
+        user_fields = {
+            'username': username,
+            'first_name': first_name,
+            'last_name': last_name,
+            'email': f'{username}@company.com',
+        }
+        employee_fields = {
+            'employee_id': f'EMP{index:05d}',
+            'phone_number': f'+62812{index:07d}',
+            'department': rng.choice(departments),
+            'role': rng.choices(roles, weights)[0],
+            'hire_date': first_hire_date + timedelta(days=rng.randrange(3650)),
+            'salary': Decimal(rng.randrange(4000, 15000)) * 10,
+        }
+        yield user_fields, employee_fields
+
+def bulk_seed_employees(count, seed=0, password='password123', batch_size=5000, start=1, progress=None):
+    """Create `count` synthetic employees with bulk inserts, one transaction per batch.
+
+    The password is hashed once and shared by every user. `progress` is
+    called with the number of employees created so far after each batch.
+    Returns the number of employees created.
+    """
+    hashed_password = make_password(password)
+    employee_cache.clear()
+    count_cache.clear()
+    bump_employee_fragments()
+    rows = generate_employee_rows(count, seed=seed, start=start)
+    created = 0
+
+    while created < count:
+        batch = [next(rows) for _ in range(min(batch_size, count - created))]
+        with transaction.atomic():
+            users = User.objects.bulk_create([
+                User(password=hashed_password, **user_fields) for user_fields, _ in batch
+            ])
+            if users and users[0].pk is None:
+                # Backends that cannot return inserted ids
+                ids = dict(User.objects.filter(
+                    username__in=[user.username for user in users]
+                ).values_list('username', 'pk'))
+                for user in users:
+                    user.pk = ids[user.username]
+            Employee.objects.bulk_create([
+                Employee(user=user, **employee_fields)
+                for user, (_, employee_fields) in zip(users, batch)
+            ])
+        created += len(batch)
+        if progress:
+            progress(created)
+
+    return created
@@ -1,3 +1,542 @@
-from django.test import TestCase
+from django.test import TestCase, override_settings
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from datetime import date, timedelta
+from io import StringIO
+from .cache import EmployeeCache, employee_cache, get_cached_employee
+from .importing import IMPORT_BATCH_SIZE, ImportFormatError, import_employees
+from .bulk import claim_bulk_action, run_bulk_action, start_bulk_action
+from .models import BulkActionJob, Employee
+from .paging import LAST_CURSOR, count_cache, decode_cursor, encode_cursor, get_employee_page
+from .search import filter_employees, match_query, search_employees
+from .seeding import generate_employee_rows, seed_employees
 
 # Create your tests here.
+
+@override_settings(QUERY_BUDGET_RAISE=True)
+class EmployeeViewQueryCountTests(TestCase):
+    """Pin the query count of every employee view against a large data set"""
+
+    @classmethod
+    def setUpTestData(cls):
+        seed_employees(1000)
+        cls.hr = Employee.objects.filter(role='hr_admin').select_related('user').first()
+        cls.staff = Employee.objects.filter(role='staff').select_related('user').first()
+        cls.target = Employee.objects.filter(role='staff').last()
+
+    def setUp(self):
+        self.client.force_login(self.hr.user)
+
+    def assertQueries(self, num, method, url, data=None, status=None):
+        # Measure the cold path, before the employee profile and list counts are cached
+        employee_cache.clear()
+        count_cache.clear()
+        with self.assertNumQueries(num):
+            response = getattr(self.client, method)(url, data or {})
+        self.assertEqual(response.status_code, status or (302 if method == 'post' else 200))
+        return response
+
+    def test_employee_list(self):
+        self.assertQueries(5, 'get', reverse('employee_list'))
+        self.assertQueries(5, 'get', reverse('employee_list'), {'search': 'Employee1', 'cursor': encode_cursor('a', 'EMP00500')})
+        self.assertQueries(5, 'get', reverse('employee_list'), {'cursor': LAST_CURSOR, 'department': 'finance'})
+
+    def test_employee_search(self):
+        response = self.assertQueries(4, 'get', reverse('employee_search'), {'q': 'employee12'})
+        self.assertEqual(len(response.json()['results']), 10)
+
+    def test_employee_detail(self):
+        self.assertQueries(5, 'get', reverse('employee_detail', args=[self.target.employee_id]))
+
+    def test_employee_create(self):
+        self.assertQueries(3, 'get', reverse('employee_create'))
+        self.assertQueries(9, 'post', reverse('employee_create'), {
+            'first_name': 'New', 'last_name': 'Hire', 'email': 'new.hire@company.com',
+            'username': 'new.hire', 'employee_id': 'EMP99999', 'department': 'sales',
+            'role': 'staff', 'hire_date': '2024-01-15', 'is_active': 'on',
+        })
+
+    def test_employee_import(self):
+        self.assertQueries(3, 'get', reverse('employee_import'))
+        upload = SimpleUploadedFile('employees.csv', (
+            'username,first_name,last_name,email,employee_id,department,role,hire_date,salary,is_active\n'
+            'ann,Ann,Lee,ann@company.com,EMP90001,finance,staff,2023-01-02,5000,true\n'
+            'bob,Bob,Ray,bob@company.com,EMP90002,sales,manager,2023-01-02,,\n'
+            'seed1,Seed,Clash,clash@company.com,EMP90003,finance,staff,2023-01-02,,\n'
+        ).encode(), content_type='text/csv')
+        # Session, user and profile, then per batch: one IN query per unique
+        # field, a savepoint and two inserts
+        response = self.assertQueries(3 + 7, 'post', reverse('employee_import'), {'file': upload}, status=200)
+        self.assertEqual(response.context['result'], {'rows': 3, 'created': 2, 'rejected': 1})
+
+    def test_employee_import_of_several_batches(self):
+        rows = ''.join(
+            f'bulk{index},Bulk,Row,bulk{index}@company.com,EMP9{index:04d},sales,staff,2023-01-02\n'
+            for index in range(IMPORT_BATCH_SIZE + 1)
+        )
+        upload = SimpleUploadedFile('employees.csv', (
+            'username,first_name,last_name,email,employee_id,department,role,hire_date\n' + rows
+        ).encode(), content_type='text/csv')
+        response = self.client.post(reverse('employee_import'), {'file': upload})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['result']['created'], IMPORT_BATCH_SIZE + 1)
+
+    def test_employee_edit(self):
+        url = reverse('employee_edit', args=[self.target.employee_id])
+        self.assertQueries(4, 'get', url)
+        self.assertQueries(10, 'post', url, {
+            'first_name': 'Renamed', 'last_name': 'Employee', 'email': self.target.user.email,
+            'username': self.target.user.username, 'employee_id': self.target.employee_id,
+            'department': 'finance', 'role': 'staff', 'hire_date': '2022-01-01', 'is_active': 'on',
+        })
+
+    def test_employee_deactivate_and_activate(self):
+        self.assertQueries(6, 'post', reverse('employee_delete', args=[self.target.employee_id]))
+        self.assertQueries(6, 'post', reverse('employee_activate', args=[self.target.employee_id]))
+
+    def test_employee_bulk_actions(self):
+        # The request only records the job; the worker does the updates
+        ids = list(Employee.objects.filter(role='staff').values_list('employee_id', flat=True)[:200])
+        self.assertQueries(4, 'post', reverse('employee_bulk_actions'), {'action': 'deactivate', 'employee_ids': ids})
+        self.assertQueries(4, 'post', reverse('employee_bulk_actions'), {
+            'action': 'activate', 'select_all_matching': '1', 'department': 'sales', 'is_active': 'false',
+        })
+        job = BulkActionJob.objects.first()
+        self.assertQueries(4, 'get', reverse('employee_bulk_action_status', args=[job.pk]))
+
+    def test_profile_view_and_edit(self):
+        self.client.force_login(self.staff.user)
+        self.assertQueries(3, 'get', reverse('employee_profile_view'))
+        self.assertQueries(3, 'get', reverse('employee_profile_edit'))
+        self.assertQueries(6, 'post', reverse('employee_profile_edit'), {
+            'first_name': 'Seed', 'last_name': 'Updated', 'email': self.staff.user.email,
+            'phone_number': '+1234567890', 'address': '1 Main St',
+        })
+
+
+class EmployeeCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        seed_employees(3)
+
+    def setUp(self):
+        employee_cache.clear()
+        self.user = User.objects.get(username='seed1')
+
+    def test_repeated_lookups_hit_cache(self):
+        with self.assertNumQueries(1):
+            first = get_cached_employee(self.user)
+            second = get_cached_employee(self.user)
+        self.assertEqual(first.employee_id, 'EMP00001')
+        self.assertIsNot(first, second)
+        self.assertIs(second.user, self.user)
+
+    def test_save_invalidates(self):
+        employee = get_cached_employee(self.user)
+        employee.role = 'manager'
+        employee.save()
+        self.assertEqual(get_cached_employee(self.user).role, 'manager')
+
+    def test_missing_profile_is_cached(self):
+        user = User.objects.create(username='no.profile')
+        with self.assertNumQueries(1):
+            self.assertIsNone(get_cached_employee(user))
+            self.assertIsNone(get_cached_employee(user))
+
+    def test_ttl_and_lru_eviction(self):
+        cache = EmployeeCache(max_size=2, ttl=30)
+        cache.set(1, 'a')
+        cache.set(2, 'b')
+        cache.get(1)
+        cache.set(3, 'c')
+        self.assertEqual(cache.get(1), 'a')
+        self.assertNotEqual(cache.get(2), 'b')
+
+        expired = EmployeeCache(ttl=-1)
+        expired.entries[1] = (0, 'a')
+        self.assertNotEqual(expired.get(1), 'a')
+
+    def test_profile_edit_keeps_changes_made_behind_the_cache(self):
+        self.client.force_login(self.user)
+        self.client.get(reverse('employee_profile_edit'))
+        # As if HR changed the row in another process, whose cache is not ours
+        Employee.objects.filter(user=self.user).update(is_active=False, role='manager', department='sales')
+        self.client.post(reverse('employee_profile_edit'), {
+            'first_name': 'Seed', 'last_name': 'Edited', 'email': self.user.email,
+            'phone_number': '+1234567890', 'address': '1 Main St',
+        })
+        employee = Employee.objects.select_related('user').get(user=self.user)
+        self.assertEqual((employee.is_active, employee.role, employee.department), (False, 'manager', 'sales'))
+        self.assertEqual((employee.phone_number, employee.user.last_name), ('+1234567890', 'Edited'))
+        # The saved row replaces the cached copy
+        self.assertEqual(get_cached_employee(self.user).role, 'manager')
+
+    def test_middleware_attaches_lazy_employee(self):
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('employee_profile_view'))
+        self.assertEqual(response.wsgi_request.employee.employee_id, 'EMP00001')
+
+
+class ConditionalEmployeePageTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        seed_employees(6)
+
+    def setUp(self):
+        employee_cache.clear()
+        self.hr = Employee.objects.filter(role='hr_admin').select_related('user').first()
+        self.target = Employee.objects.filter(role='staff').select_related('user').first()
+        self.client.force_login(self.hr.user)
+        self.url = reverse('employee_detail', args=[self.target.employee_id])
+
+    def test_unchanged_detail_is_not_rendered_again(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['ETag'].startswith('W/"'))
+        self.assertIn('Last-Modified', response)
+        self.assertIn('private', response['Cache-Control'])
+        self.assertIn('no-cache', response['Cache-Control'])
+
+        # The session, user and employee timestamp only
+        with self.assertNumQueries(3):
+            again = self.client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(again.status_code, 304)
+        self.assertEqual(again['ETag'], response['ETag'])
+        self.assertEqual(again.templates, [])
+        self.assertEqual(self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']).status_code, 304)
+
+    def test_detail_changes_with_the_employee_and_the_viewer(self):
+        etag = self.client.get(self.url)['ETag']
+        self.target.user.email = 'moved@company.com'
+        self.target.user.save()
+        changed = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(changed.status_code, 200)
+        self.assertContains(changed, 'moved@company.com')
+
+        # Another viewer, or another CSRF secret, gets its own ETag
+        other = Employee.objects.filter(role='hr_admin').exclude(pk=self.hr.pk).first()
+        self.client.force_login(other.user)
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=changed['ETag']).status_code, 200)
+
+    def test_pending_messages_are_rendered(self):
+        self.client.force_login(self.target.user)
+        url = reverse('employee_profile_view')
+        etag = self.client.get(url)['ETag']
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        # Staff are turned away from the employee list with a message
+        self.client.get(reverse('employee_list'))
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "You don&#x27;t have permission")
+
+    def test_profile_edit_changes_the_profile_etag(self):
+        self.client.force_login(self.target.user)
+        url = reverse('employee_profile_view')
+        etag = self.client.get(url)['ETag']
+        self.client.post(reverse('employee_profile_edit'), {
+            'first_name': 'Seed', 'last_name': 'Renamed', 'email': self.target.user.email,
+            'phone_number': '', 'address': '',
+        })
+        self.client.get(reverse('dashboard'))  # Shows the saved message
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+
+class EmployeeSearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        seed_employees(30)
+
+    def search(self, text):
+        return [match['employee_id'] for match in search_employees(text, limit=50)]
+
+    def test_words_match_as_prefixes(self):
+        self.assertEqual(match_query('Ann  o\'Neil'), '"Ann"* "o"* "Neil"*')
+        self.assertEqual(match_query('"*'), '')
+        self.assertEqual(self.search('seed employee2'), ['EMP00002'] + [f'EMP{index:05d}' for index in range(20, 30)])
+        self.assertEqual(self.search('emp0001'), [f'EMP{index:05d}' for index in range(10, 20)])
+        self.assertEqual(self.search('seed7@company'), ['EMP00007'])
+        self.assertEqual(self.search('nobody'), [])
+
+    def test_filter_matches_search(self):
+        employees = filter_employees(Employee.objects.order_by('employee_id'), 'Employee3')
+        self.assertEqual(list(employees.values_list('employee_id', flat=True)), ['EMP00003', 'EMP00030'])
+        # Input without any words falls back to a plain contains filter
+        self.assertEqual(filter_employees(Employee.objects.all(), '@').count(), 30)
+
+    def test_index_follows_writes(self):
+        user = User.objects.get(username='seed5')
+        user.last_name = 'Zimmerman'
+        user.save()
+        self.assertEqual(self.search('zimmer'), ['EMP00005'])
+        self.assertEqual(self.search('employee5'), [])
+
+        Employee.objects.filter(employee_id='EMP00005').update(employee_id='EMP77777')
+        self.assertEqual(self.search('emp77'), ['EMP77777'])
+
+        Employee.objects.get(employee_id='EMP77777').delete()
+        self.assertEqual(self.search('zimmer'), [])
+
+        new_user = User.objects.create(username='zed', first_name='Zed', last_name='Zimmer', email='zed@company.com')
+        Employee.objects.bulk_create([Employee(user=new_user, employee_id='EMP88888', hire_date=date(2023, 1, 1))])
+        self.assertEqual(self.search('zimmer'), ['EMP88888'])
+
+    def test_endpoint(self):
+        self.client.force_login(User.objects.get(username='seed1'))
+        url = reverse('employee_search')
+
+        results = self.client.get(url, {'q': 'seed12'}).json()['results']
+        self.assertEqual(results, [{
+            'employee_id': 'EMP00012',
+            'name': 'Seed Employee12',
+            'email': 'seed12@company.com',
+            'department_display': dict(Employee.DEPARTMENT_CHOICES)[Employee.objects.get(employee_id='EMP00012').department],
+            'is_active': True,
+            'url': reverse('employee_detail', args=['EMP00012']),
+        }])
+        self.assertEqual(len(self.client.get(url, {'q': 'seed'}).json()['results']), 10)
+        self.assertEqual(len(self.client.get(url, {'q': 'seed', 'limit': 3}).json()['results']), 3)
+        self.assertEqual(len(self.client.get(url, {'q': 'seed', 'limit': 'x'}).json()['results']), 10)
+        self.assertEqual(self.client.get(url, {'q': '  '}).json()['results'], [])
+
+        # Staff are turned away
+        self.client.force_login(User.objects.get(username='seed2'))
+        self.assertEqual(self.client.get(url, {'q': 'seed'}).status_code, 302)
+
+
+class EmployeeListPagingTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        seed_employees(25)
+
+    def setUp(self):
+        count_cache.clear()
+        self.client.force_login(User.objects.get(username='seed1'))
+
+    def ids(self, page):
+        return [employee.employee_id for employee in page]
+
+    def test_cursor_round_trip(self):
+        cursor = encode_cursor('a', 'EMP00010')
+        self.assertEqual(decode_cursor(cursor), ('a', 'EMP00010'))
+        self.assertNotIn('EMP00010', cursor)
+        for invalid in ['', 'not a cursor', encode_cursor('x', 'EMP00010'), 'WzEsMl0']:
+            self.assertEqual(decode_cursor(invalid), ('a', None))
+
+    def test_pages_forwards_and_backwards(self):
+        employees = Employee.objects.all()
+        first = get_employee_page(employees, per_page=10)
+        self.assertEqual(self.ids(first), [f'EMP{index:05d}' for index in range(1, 11)])
+        self.assertFalse(first.has_previous)
+
+        second = get_employee_page(employees, first.next_cursor, per_page=10)
+        self.assertEqual(self.ids(second)[0], 'EMP00011')
+        third = get_employee_page(employees, second.next_cursor, per_page=10)
+        self.assertEqual(self.ids(third), [f'EMP{index:05d}' for index in range(21, 26)])
+        self.assertFalse(third.has_next)
+
+        back = get_employee_page(employees, third.previous_cursor, per_page=10)
+        self.assertEqual(self.ids(back), self.ids(second))
+        self.assertTrue(back.has_next and back.has_previous)
+        self.assertEqual(self.ids(get_employee_page(employees, back.previous_cursor, per_page=10)), self.ids(first))
+
+        last = get_employee_page(employees, LAST_CURSOR, per_page=10)
+        self.assertEqual(self.ids(last), [f'EMP{index:05d}' for index in range(16, 26)])
+        self.assertFalse(last.has_next)
+
+    def test_cursor_past_the_end_links_back(self):
+        page = get_employee_page(Employee.objects.all(), encode_cursor('a', 'EMP99999'), per_page=10)
+        self.assertEqual(len(page), 0)
+        self.assertEqual(self.ids(get_employee_page(Employee.objects.all(), page.previous_cursor, per_page=10))[-1], 'EMP00025')
+
+    def test_view_keeps_filters_and_caches_counts(self):
+        url = reverse('employee_list')
+        response = self.client.get(url, {'department': 'finance'})
+        finance = Employee.objects.filter(department='finance').count()
+        self.assertEqual(response.context['page_obj'].count, finance)
+        self.assertEqual(response.context['query_string'], 'department=finance')
+
+        # Served from the count cache, so only the page is read
+        with self.assertNumQueries(3):
+            response = self.client.get(url, {'department': 'finance', 'cursor': encode_cursor('a', 'EMP00005')})
+        self.assertTrue(all(employee.department == 'finance' for employee in response.context['employees']))
+        self.assertTrue(all(employee.employee_id > 'EMP00005' for employee in response.context['employees']))
+
+        # Saving an employee drops the cached counts
+        employee = Employee.objects.exclude(department='finance').first()
+        employee.department = 'finance'
+        employee.save()
+        self.assertEqual(self.client.get(url, {'department': 'finance'}).context['page_obj'].count, finance + 1)
+
+    @override_settings(EMPLOYEE_BULK_ACTIONS={'BACKGROUND': False}, QUERY_BUDGET_RAISE=True)
+    def test_bulk_action_drops_cached_counts(self):
+        url = reverse('employee_list')
+        self.assertEqual(self.client.get(url, {'is_active': 'false'}).context['page_obj'].count, 0)
+        self.client.post(reverse('employee_bulk_actions'), {'action': 'deactivate', 'employee_ids': ['EMP00002', 'EMP00003']})
+        self.assertEqual(self.client.get(url, {'is_active': 'false'}).context['page_obj'].count, 2)
+
+
+@override_settings(EMPLOYEE_BULK_ACTIONS={'BACKGROUND': False, 'CHUNK_SIZE': 4}, QUERY_BUDGET_RAISE=True)
+class EmployeeBulkActionTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        seed_employees(20)
+        cls.hr = User.objects.get(username='seed1')
+
+    def setUp(self):
+        self.client.force_login(self.hr)
+
+    def active_ids(self):
+        return set(Employee.objects.filter(is_active=True).values_list('employee_id', flat=True))
+
+    def test_explicit_ids_in_chunks(self):
+        ids = [f'EMP{index:05d}' for index in range(5, 15)] + ['EMP99999']
+        # Per chunk: read the pks, then update employees, users and the job
+        # inside a savepoint
+        with self.assertNumQueries(2 + 3 * (1 + 5) + 1):
+            job = start_bulk_action('deactivate', self.hr, employee_ids=ids)
+
+        self.assertEqual((job.status, job.total, job.processed, job.updated), ('done', 11, 11, 10))
+        self.assertEqual(self.active_ids(), {f'EMP{index:05d}' for index in [*range(1, 5), *range(15, 21)]})
+        self.assertFalse(User.objects.get(username='seed5').is_active)
+        self.assertTrue(User.objects.get(username='seed4').is_active)
+
+    def test_filters_select_all_matching(self):
+        response = self.client.post(reverse('employee_bulk_actions'), {
+            'action': 'deactivate', 'select_all_matching': '1', 'department': 'finance',
+        })
+        job = BulkActionJob.objects.get()
+        self.assertRedirects(response, f"{reverse('employee_list')}?bulk_job={job.pk}", fetch_redirect_response=False)
+
+        finance = set(Employee.objects.filter(department='finance').values_list('employee_id', flat=True))
+        self.assertEqual(job.filters, {'department': 'finance'})
+        self.assertEqual((job.status, job.total, job.updated), ('done', len(finance), len(finance)))
+        self.assertFalse(self.active_ids() & finance)
+        self.assertFalse(User.objects.filter(employee_profile__department='finance', is_active=True).exists())
+
+        status = self.client.get(reverse('employee_bulk_action_status', args=[job.pk])).json()
+        self.assertEqual((status['status'], status['processed'], status['finished']), ('done', len(finance), True))
+
+    def test_resume_from_position(self):
+        job = BulkActionJob.objects.create(action='deactivate', filters={'search': 'seed'})
+        first_chunk = list(Employee.objects.order_by('pk').values_list('pk', flat=True)[:4])
+        job.status, job.total, job.processed, job.position = 'running', 20, 4, first_chunk[-1]
+        job.save()
+
+        run_bulk_action(job)
+
+        self.assertEqual((job.status, job.processed, job.updated), ('done', 20, 16))
+        self.assertEqual(Employee.objects.filter(is_active=True).count(), 4)
+
+    def test_background_mode_records_a_pending_job(self):
+        with self.settings(EMPLOYEE_BULK_ACTIONS={'BACKGROUND': True}):
+            with self.captureOnCommitCallbacks() as callbacks:
+                self.client.post(reverse('employee_bulk_actions'), {'action': 'deactivate', 'employee_ids': ['EMP00002']})
+        self.assertEqual(len(callbacks), 1)
+        self.assertEqual(BulkActionJob.objects.get().status, 'pending')
+        self.assertEqual(len(self.active_ids()), 20)
+
+    def test_run_bulk_actions_command(self):
+        BulkActionJob.objects.create(action='deactivate', employee_ids=['EMP00002', 'EMP00003'])
+        out = StringIO()
+        call_command('run_bulk_actions', stdout=out)
+        self.assertIn('Ran 1 bulk action job', out.getvalue())
+        self.assertEqual(BulkActionJob.objects.get().status, 'done')
+        self.assertEqual(len(self.active_ids()), 18)
+
+    def test_jobs_are_claimed_once(self):
+        job = BulkActionJob.objects.create(action='deactivate', employee_ids=['EMP00002'])
+        other = BulkActionJob.objects.get(pk=job.pk)
+        self.assertTrue(claim_bulk_action(job))
+        self.assertFalse(claim_bulk_action(other))
+
+        # A stale running job is only resumed by one runner, and not at all
+        # once its worker makes progress
+        BulkActionJob.objects.filter(pk=job.pk).update(updated_at=timezone.now() - timedelta(hours=1))
+        stale = BulkActionJob.objects.get(pk=job.pk)
+        job.save(update_fields=['updated_at'])
+        self.assertFalse(claim_bulk_action(stale))
+        out = StringIO()
+        call_command('run_bulk_actions', stdout=out)
+        self.assertIn('Ran 0 bulk action jobs', out.getvalue())
+        self.assertEqual(len(self.active_ids()), 20)
+
+    def test_invalid_requests(self):
+        url = reverse('employee_bulk_actions')
+        self.client.post(url, {'action': 'delete', 'employee_ids': ['EMP00002']})
+        self.client.post(url, {'action': 'deactivate'})
+        self.client.post(url, {'action': 'deactivate', 'select_all_matching': '1', 'role': 'boss'})
+        self.assertFalse(BulkActionJob.objects.exists())
+        self.assertEqual(len(self.active_ids()), 20)
+
+
+class BulkSeedingTests(TestCase):
+    def test_same_seed_generates_same_employees(self):
+        self.assertEqual(list(generate_employee_rows(20, seed=3)), list(generate_employee_rows(20, seed=3)))
+        self.assertNotEqual(list(generate_employee_rows(20, seed=3)), list(generate_employee_rows(20, seed=4)))
+
+    def test_command_creates_employees_in_batches(self):
+        call_command('create_sample_employees', count=25, seed=7, batch_size=10, stdout=StringIO())
+
+        self.assertEqual(Employee.objects.count(), 25)
+        self.assertEqual(
+            list(Employee.objects.values_list('employee_id', flat=True)[:2]),
+            ['EMP00001', 'EMP00002'],
+        )
+        # The shared password hash works for every user
+        username = Employee.objects.select_related('user').last().user.username
+        self.assertTrue(self.client.login(username=username, password='password123'))
+
+
+class EmployeeImportTests(TestCase):
+    HEADER = 'username,first_name,last_name,email,employee_id,department,role,hire_date,salary,is_active\n'
+
+    def setUp(self):
+        seed_employees(2)
+
+    def csv_lines(self, *rows):
+        return StringIO(self.HEADER + ''.join(row + '\n' for row in rows))
+
+    def test_import_reports_every_rejected_row(self):
+        errors = {}
+        lines = self.csv_lines(
+            'ann,Ann,Lee,ann@company.com,EMP10001,finance,staff,2023-01-02,5000,true',
+            'bob,Bob,Ray,bob@company.com,EMP10002,sales,manager,2023-01-02,,',
+            'ann,Ann,Again,ann2@company.com,EMP10003,finance,staff,2023-01-02,,',
+            'seed1,Seed,Clash,new@company.com,EMP10004,finance,staff,2023-01-02,,',
+            'carl,Carl,Bad,not-an-email,XYZ1,finance,boss,2023-01-02,,',
+        )
+
+        # Per batch: one IN query per unique field, then a savepoint and two
+        # inserts; the second batch has nothing left to insert
+        with self.assertNumQueries(3 + 4 + 3):
+            result = import_employees(lines, batch_size=3, on_error=lambda line, row_errors: errors.update({line: row_errors}))
+
+        self.assertEqual(result, {'rows': 5, 'created': 2, 'rejected': 3})
+        self.assertEqual(set(errors), {4, 5, 6})
+        self.assertIn('username', errors[4])
+        self.assertIn('username', errors[5])
+        self.assertEqual(set(errors[6]), {'email', 'employee_id', 'role'})
+        bob = Employee.objects.select_related('user').get(employee_id='EMP10002')
+        self.assertEqual((bob.user.username, bob.role, bob.is_active), ('bob', 'manager', True))
+        self.assertFalse(bob.user.has_usable_password())
+
+    def test_missing_columns_are_rejected(self):
+        with self.assertRaises(ImportFormatError):
+            import_employees(StringIO('username,email\nann,ann@company.com\n'))
+
+    def test_upload_view(self):
+        self.client.force_login(User.objects.get(username='seed1'))
+        upload = SimpleUploadedFile(
+            'staff.csv',
+            (self.HEADER + 'ann,Ann,Lee,ann@company.com,EMP10001,finance,staff,2023-01-02,,\n').encode(),
+            content_type='text/csv',
+        )
+
+        response = self.client.post(reverse('employee_import'), {'file': upload})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['result']['created'], 1)
+        self.assertTrue(Employee.objects.filter(employee_id='EMP10001').exists())
@@ -4,6 +4,8 @@ from . import views
 urlpatterns = [
     path('', views.employee_list, name='employee_list'),
     path('create/', views.employee_create, name='employee_create'),
+    path('import/', views.employee_import, name='employee_import'),
+    path('search/', views.employee_search, name='employee_search'),
     path('profile/', views.employee_profile_view, name='employee_profile_view'),
     path('profile/edit/', views.employee_profile_edit, name='employee_profile_edit'),
     path('<str:employee_id>/', views.employee_detail, name='employee_detail'),
@@ -11,4 +13,5 @@ urlpatterns = [
     path('<str:employee_id>/delete/', views.employee_delete, name='employee_delete'),
     path('<str:employee_id>/activate/', views.employee_activate, name='employee_activate'),
     path('bulk/actions/', views.employee_bulk_actions, name='employee_bulk_actions'),
+    path('bulk/actions/<int:job_id>/', views.employee_bulk_action_status, name='employee_bulk_action_status'),
 ]
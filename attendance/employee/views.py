@@ -1,68 +1,106 @@
+import csv
+import io
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.core.paginator import Paginator
-from django.db.models import Q
 from django.http import JsonResponse
+from django.urls import reverse
+from django.utils import timezone
 from django.views.decorators.http import require_http_methods
-from django.contrib.auth.models import User
-from .models import Employee
-from .forms import EmployeeForm, EmployeeSearchForm, EmployeeProfileForm
+from .models import BulkActionJob, Employee
+from .forms import EmployeeForm, EmployeeImportForm, EmployeeSearchForm, EmployeeProfileForm
+from .bulk import get_bulk_settings, start_bulk_action
+from .paging import get_employee_count, get_employee_page, get_list_settings
+from .importing import IMPORT_BATCH_SIZE, IMPORT_COLUMNS, REQUIRED_COLUMNS, ImportFormatError, import_employees
 from .decorators import hr_admin_required
+from .search import MAX_TYPEAHEAD_LIMIT, TYPEAHEAD_LIMIT, filter_employee_list, search_employees
+from attendance.conditional import conditional_page, start_of_today
+from attendance.middleware import query_budget
 
+@query_budget(5)
 @login_required
 @hr_admin_required
 def employee_list(request):
     """List all employees with search and filter functionality"""
     form = EmployeeSearchForm(request.GET)
-    employees = Employee.objects.select_related('user').all()
-    
+    filters = {}
     if form.is_valid():
-        search = form.cleaned_data.get('search')
-        department = form.cleaned_data.get('department')
-        role = form.cleaned_data.get('role')
-        is_active = form.cleaned_data.get('is_active')
-        
-        if search:
-            employees = employees.filter(
-                Q(user__first_name__icontains=search) |
-                Q(user__last_name__icontains=search) |
-                Q(user__email__icontains=search) |
-                Q(employee_id__icontains=search)
-            )
-        
-        if department:
-            employees = employees.filter(department=department)
-        
-        if role:
-            employees = employees.filter(role=role)
-        
-        if is_active:
-            employees = employees.filter(is_active=is_active.lower() == 'true')
+        filters = {name: value for name, value in form.cleaned_data.items() if value}
+    employees = filter_employee_list(Employee.objects.select_related('user').all(), filters)
     
-    # Pagination
-    paginator = Paginator(employees, 10)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    # Keyset pagination by employee_id, with the total from the count cache
+    page_obj = get_employee_page(
+        employees,
+        request.GET.get('cursor'),
+        per_page=get_list_settings()['PER_PAGE'],
+        count=get_employee_count(employees, filters),
+    )
     
+    query = request.GET.copy()
+    query.pop('cursor', None)
+    query.pop('page', None)
+    bulk_job = query.pop('bulk_job', [''])[-1]
     context = {
         'form': form,
         'page_obj': page_obj,
         'employees': page_obj,
+        'query_string': query.urlencode(),
+        'bulk_job_url': reverse('employee_bulk_action_status', args=[bulk_job]) if bulk_job.isdigit() else None,
     }
     return render(request, 'employee/employee_list.html', context)
 
+@query_budget(4)
+@login_required
+@hr_admin_required
+def employee_search(request):
+    """Best matches of a name, email or employee ID search as JSON, for the typeahead"""
+    search = request.GET.get('q', '').strip()[:100]
+    try:
+        limit = min(max(int(request.GET.get('limit', TYPEAHEAD_LIMIT)), 1), MAX_TYPEAHEAD_LIMIT)
+    except ValueError:
+        limit = TYPEAHEAD_LIMIT
+    if not search:
+        return JsonResponse({'results': []})
+
+    departments = dict(Employee.DEPARTMENT_CHOICES)
+    results = [
+        {
+            'employee_id': match['employee_id'],
+            'name': f"{match['first_name']} {match['last_name']}".strip(),
+            'email': match['email'],
+            'department_display': departments.get(match['department'], match['department']),
+            'is_active': match['is_active'],
+            'url': reverse('employee_detail', args=[match['employee_id']]),
+        }
+        for match in search_employees(search, limit)
+    ]
+    return JsonResponse({'results': results})
+
+def employee_detail_validators(request, employee_id):
+    """Conditional GET validators of an employee's details: their rows' fields and who views them"""
+    row = Employee.objects.filter(employee_id=employee_id).values_list(
+        'pk', 'updated_at', 'user__first_name', 'user__last_name', 'user__email', 'user__username',
+    ).first()
+    if row is None:
+        return None
+    viewer = request.employee
+    parts = [row, viewer.pk, viewer.role, viewer.updated_at, timezone.localdate()]
+    return parts, max(row[1], viewer.updated_at, start_of_today())
+
+@query_budget(5)
 @login_required
 @hr_admin_required
+@conditional_page(employee_detail_validators)
 def employee_detail(request, employee_id):
     """View employee details"""
-    employee = get_object_or_404(Employee, employee_id=employee_id)
+    employee = get_object_or_404(Employee.objects.select_related('user'), employee_id=employee_id)
     
     context = {
         'employee': employee,
     }
     return render(request, 'employee/employee_detail.html', context)
 
+@query_budget(9)
 @login_required
 @hr_admin_required
 def employee_create(request):
@@ -87,11 +125,59 @@ def employee_create(request):
     }
     return render(request, 'employee/employee_form.html', context)
 
+# Rejected rows listed on the import result page; the rest are only counted
+MAX_REPORTED_IMPORT_ERRORS = 500
+
+@query_budget(10)
+@login_required
+@hr_admin_required
+def employee_import(request):
+    """Import employees from an uploaded CSV file"""
+    result = None
+    errors = []
+    if request.method == 'POST':
+        form = EmployeeImportForm(request.POST, request.FILES)
+        if form.is_valid():
+            def on_error(line_number, row_errors):
+                if len(errors) < MAX_REPORTED_IMPORT_ERRORS:
+                    errors.append({'line': line_number, 'errors': row_errors})
+
+            # Large uploads are streamed from a temporary file, one batch at a time
+            lines = io.TextIOWrapper(form.cleaned_data['file'].file, encoding='utf-8-sig', newline='')
+            try:
+                result = import_employees(lines, on_error=on_error)
+            except (ImportFormatError, UnicodeDecodeError, csv.Error) as e:
+                # A bad line may only be reached after earlier batches were imported
+                request.query_budget = None
+                messages.error(request, f'❌ Could not import the file: {e}')
+            else:
+                if result['rows'] > IMPORT_BATCH_SIZE:
+                    # The budget covers one batch, and every further batch
+                    # runs the same queries again
+                    request.query_budget = None
+                if result['created']:
+                    messages.success(request, f'✅ Imported {result["created"]} of {result["rows"]} employees.')
+                if result['rejected']:
+                    messages.warning(request, f'⚠️ {result["rejected"]} rows were rejected. See the report below.')
+    else:
+        form = EmployeeImportForm()
+
+    context = {
+        'form': form,
+        'result': result,
+        'errors': errors,
+        'columns': IMPORT_COLUMNS,
+        'required_columns': REQUIRED_COLUMNS,
+        'more_errors': result['rejected'] - len(errors) if result else 0,
+    }
+    return render(request, 'employee/employee_import.html', context)
+
+@query_budget(10)
 @login_required
 @hr_admin_required
 def employee_edit(request, employee_id):
     """Edit existing employee"""
-    employee = get_object_or_404(Employee, employee_id=employee_id)
+    employee = get_object_or_404(Employee.objects.select_related('user'), employee_id=employee_id)
     
     if request.method == 'POST':
         form = EmployeeForm(request.POST, instance=employee)
@@ -114,12 +200,13 @@ def employee_edit(request, employee_id):
     }
     return render(request, 'employee/employee_form.html', context)
 
+@query_budget(6)
 @login_required
 @hr_admin_required
 @require_http_methods(["POST"])
 def employee_delete(request, employee_id):
     """Delete employee (soft delete by setting is_active to False)"""
-    employee = get_object_or_404(Employee, employee_id=employee_id)
+    employee = get_object_or_404(Employee.objects.select_related('user'), employee_id=employee_id)
     
     try:
         # Soft delete - set is_active to False
@@ -138,12 +225,13 @@ def employee_delete(request, employee_id):
     
     return redirect('employee_list')
 
+@query_budget(6)
 @login_required
 @hr_admin_required
 @require_http_methods(["POST"])
 def employee_activate(request, employee_id):
     """Reactivate employee"""
-    employee = get_object_or_404(Employee, employee_id=employee_id)
+    employee = get_object_or_404(Employee.objects.select_related('user'), employee_id=employee_id)
     
     try:
         employee.is_active = True
@@ -161,47 +249,89 @@ def employee_activate(request, employee_id):
     
     return redirect('employee_detail', employee_id=employee_id)
 
+@query_budget(5)
 @login_required
 @hr_admin_required
 def employee_bulk_actions(request):
-    """Handle bulk actions on employees"""
+    """Start a bulk action on the selected employees, or on every employee matching the list filters"""
     if request.method == 'POST':
         action = request.POST.get('action')
-        employee_ids = request.POST.getlist('employee_ids')
-        
-        if not employee_ids:
-            messages.error(request, '⚠️ No employees selected. Please select at least one employee to perform bulk actions.')
+        if action not in ('activate', 'deactivate'):
+            messages.error(request, '❌ Invalid action selected. Please choose a valid bulk action.')
             return redirect('employee_list')
+        if not get_bulk_settings()['BACKGROUND']:
+            # The job runs inline, with queries growing by the chunk, so the
+            # budget only holds for the background path
+            request.query_budget = None
         
-        employees = Employee.objects.filter(employee_id__in=employee_ids)
-        employee_count = len(employee_ids)
-        
-        if action == 'deactivate':
-            employees.update(is_active=False)
-            User.objects.filter(employee_profile__in=employees).update(is_active=False)
-            success_msg = f'🚫 Successfully deactivated {employee_count} employee{"s" if employee_count > 1 else ""}. '
-            success_msg += f'They will no longer be able to access the system until reactivated.'
-            messages.success(request, success_msg)
+        if request.POST.get('select_all_matching') == '1':
+            form = EmployeeSearchForm(request.POST)
+            if not form.is_valid():
+                messages.error(request, '⚠️ The employee filters are not valid. Please search again and retry.')
+                return redirect('employee_list')
+            filters = {name: value for name, value in form.cleaned_data.items() if value}
+            job = start_bulk_action(action, request.user, filters=filters)
+        else:
+            employee_ids = request.POST.getlist('employee_ids')
+            if not employee_ids:
+                messages.error(request, '⚠️ No employees selected. Please select at least one employee to perform bulk actions.')
+                return redirect('employee_list')
+            job = start_bulk_action(action, request.user, employee_ids=employee_ids)
         
-        elif action == 'activate':
-            employees.update(is_active=True)
-            User.objects.filter(employee_profile__in=employees).update(is_active=True)
-            success_msg = f'✅ Successfully activated {employee_count} employee{"s" if employee_count > 1 else ""}. '
-            success_msg += f'They can now access the system with their existing credentials.'
+        if job.status == 'done':
+            employee_count = job.processed
+            if action == 'deactivate':
+                success_msg = f'🚫 Successfully deactivated {employee_count} employee{"s" if employee_count != 1 else ""}. '
+                success_msg += f'They will no longer be able to access the system until reactivated.'
+            else:
+                success_msg = f'✅ Successfully activated {employee_count} employee{"s" if employee_count != 1 else ""}. '
+                success_msg += f'They can now access the system with their existing credentials.'
             messages.success(request, success_msg)
-        
+        elif job.status == 'failed':
+            messages.error(request, f'❌ The bulk action stopped after {job.processed} employees: {job.error}')
         else:
-            messages.error(request, '❌ Invalid action selected. Please choose a valid bulk action.')
+            verb = 'Deactivating' if action == 'deactivate' else 'Activating'
+            messages.info(request, f'⏳ {verb} the selected employees in the background. Progress is shown below.')
+        return redirect(f"{reverse('employee_list')}?bulk_job={job.pk}")
     
     return redirect('employee_list')
 
+@query_budget(4)
+@login_required
+@hr_admin_required
+def employee_bulk_action_status(request, job_id):
+    """Progress of a bulk action job as JSON"""
+    job = get_object_or_404(BulkActionJob, pk=job_id)
+    return JsonResponse({
+        'id': job.pk,
+        'action': job.action,
+        'status': job.status,
+        'total': job.total,
+        'processed': job.processed,
+        'updated': job.updated,
+        'error': job.error,
+        'finished': job.is_finished,
+    })
+
+
+def employee_profile_validators(request):
+    """Conditional GET validators of the own profile, all from the cached employee"""
+    employee = request.employee
+    if not employee:
+        return None
+    parts = [employee.pk, employee.updated_at, timezone.localdate()]
+    changes = [employee.updated_at, start_of_today()]
+    if request.user.last_login:
+        changes.append(request.user.last_login)
+    return parts, max(changes)
 
+@query_budget(3)
 @login_required
+@conditional_page(employee_profile_validators)
 def employee_profile_view(request):
     """View employee's own profile"""
-    try:
-        employee = request.user.employee_profile
-    except Employee.DoesNotExist:
+    employee = request.employee
+    if not employee:
         messages.error(request, '❌ Employee profile not found. Please contact administrator.')
         return redirect('dashboard')
     
@@ -211,12 +341,17 @@ def employee_profile_view(request):
     return render(request, 'employee/profile_view.html', context)
 
 
+@query_budget(6)
 @login_required
 def employee_profile_edit(request):
     """Edit employee's own profile"""
-    try:
-        employee = request.user.employee_profile
-    except Employee.DoesNotExist:
+    if request.method == 'POST':
+        # request.employee may be a cached copy up to its TTL old; save over
+        # the current row so changes HR made meanwhile are kept
+        employee = Employee.objects.select_related('user').filter(user=request.user).first()
+    else:
+        employee = request.employee
+    if not employee:
         messages.error(request, '❌ Employee profile not found. Please contact administrator.')
         return redirect('dashboard')
     
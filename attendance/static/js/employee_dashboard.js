@@ -1,5 +1,8 @@
 $(document).ready(function() {
     // Employee dashboard initialization
+    // The cached colleague list is shared by the department; drop the
+    // viewer's own row so the striping stays even
+    $('#departmentColleagues tr[data-colleague="' + currentEmployeePk + '"]').remove();
 });
 
 function showNotification(message, type) {
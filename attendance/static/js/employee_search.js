@@ -0,0 +1,92 @@
+/**
+ * Employee search typeahead using jQuery
+ * Shows the best matches from the employee search endpoint under a search
+ * box as the user types; choosing one opens the employee's page.
+ * Requires escapeHtml from employee_table.js.
+ */
+
+/**
+ * options.url   - the employee search endpoint
+ * options.input - selector of the search box
+ * options.menu  - selector of the .dropdown-menu the matches are shown in
+ * options.delay - milliseconds to wait after the last keystroke (default 150)
+ */
+function initEmployeeTypeahead(options) {
+    const $input = $(options.input);
+    const $menu = $(options.menu);
+    const delay = options.delay || 150;
+    let timer = null;
+    let pending = null;
+
+    function hide() {
+        $menu.removeClass('show').empty();
+    }
+
+    function render(results) {
+        if (!results.length) {
+            hide();
+            return;
+        }
+        $menu.html(results.map(row => `
+            <a class="dropdown-item d-flex justify-content-between align-items-center" href="${escapeHtml(row.url)}">
+                <span><strong>${escapeHtml(row.name)}</strong>
+                    <small class="text-muted">${escapeHtml(row.employee_id)} &middot; ${escapeHtml(row.email)}</small></span>
+                <small class="${row.is_active ? 'text-muted' : 'text-danger'}">${escapeHtml(row.department_display)}</small>
+            </a>`).join('')).addClass('show');
+    }
+
+    function search() {
+        const query = $input.val().trim();
+        if (pending) {
+            pending.abort();
+        }
+        if (!query) {
+            hide();
+            return;
+        }
+        pending = $.getJSON(options.url, {q: query})
+            .done(function(data) {
+                // Ignore answers to a query the user has typed past
+                if ($input.val().trim() === query) {
+                    render(data.results);
+                }
+            })
+            .always(function() {
+                pending = null;
+            });
+    }
+
+    $input.on('input', function() {
+        clearTimeout(timer);
+        timer = setTimeout(search, delay);
+    });
+
+    $input.on('keydown', function(event) {
+        if (event.key === 'Escape') {
+            hide();
+        } else if (event.key === 'ArrowDown' && $menu.hasClass('show')) {
+            event.preventDefault();
+            $menu.find('.dropdown-item').first().trigger('focus');
+        }
+    });
+
+    $menu.on('keydown', '.dropdown-item', function(event) {
+        if (event.key === 'ArrowDown') {
+            event.preventDefault();
+            $(this).next('.dropdown-item').trigger('focus');
+        } else if (event.key === 'ArrowUp') {
+            event.preventDefault();
+            const $previous = $(this).prev('.dropdown-item');
+            ($previous.length ? $previous : $input).trigger('focus');
+        } else if (event.key === 'Escape') {
+            hide();
+            $input.trigger('focus');
+        }
+    });
+
+    $(document).on('click', function(event) {
+        if (!$(event.target).closest(options.input + ', ' + options.menu).length) {
+            hide();
+        }
+    });
+}
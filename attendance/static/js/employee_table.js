@@ -0,0 +1,115 @@
+/**
+ * Incrementally loaded employee tables using jQuery
+ * Fetches keyset-paginated rows from the dashboard employee endpoint
+ * as the end of the table scrolls into view.
+ */
+
+function escapeHtml(value) {
+    return String(value === null || value === undefined ? '' : value)
+        .replace(/&/g, '&amp;')
+        .replace(/</g, '&lt;')
+        .replace(/>/g, '&gt;')
+        .replace(/"/g, '&quot;')
+        .replace(/'/g, '&#39;');
+}
+
+function roleBadge(row) {
+    let badgeClass = 'bg-primary';
+    if (row.role === 'manager') {
+        badgeClass = 'bg-warning';
+    } else if (row.role === 'hr_admin') {
+        badgeClass = 'bg-info';
+    }
+    return `<span class="badge ${badgeClass}">${escapeHtml(row.role_display)}</span>`;
+}
+
+function activeBadge(row) {
+    return row.is_active
+        ? '<span class="badge bg-success">Active</span>'
+        : '<span class="badge bg-danger">Inactive</span>';
+}
+
+function attendanceBadge(row) {
+    switch (row.attendance_status) {
+        case 'present':
+            return `<span class="badge bg-success">Present ${escapeHtml(row.check_in_time)}</span>`;
+        case 'late':
+            return `<span class="badge bg-warning">Late ${escapeHtml(row.check_in_time)}</span>`;
+        default:
+            return '<span class="badge bg-secondary">Absent</span>';
+    }
+}
+
+/**
+ * Load employee rows into a table body page by page.
+ *
+ * options.tbody     - selector of the <tbody> to append rows to
+ * options.sentinel  - selector of an element placed after the table
+ * options.url       - endpoint returning {results, next_cursor}
+ * options.renderRow - function(row) returning the <tr> HTML for one row
+ * options.pageSize  - number of rows per request (default 50)
+ */
+function initEmployeeTable(options) {
+    const $tbody = $(options.tbody);
+    const $sentinel = $(options.sentinel);
+    const pageSize = options.pageSize || 50;
+    let cursor = null;
+    let loading = false;
+    let finished = false;
+
+    function loadNextPage() {
+        if (loading || finished) {
+            return;
+        }
+        loading = true;
+        $sentinel.find('.loading-indicator').show();
+
+        const params = {limit: pageSize};
+        if (cursor) {
+            params.cursor = cursor;
+        }
+
+        $.getJSON(options.url, params)
+            .done(function(data) {
+                $tbody.append(data.results.map(options.renderRow).join(''));
+                cursor = data.next_cursor;
+                finished = !cursor;
+                if (finished) {
+                    $sentinel.hide();
+                }
+            })
+            .fail(function() {
+                showNotification('Could not load employees. Please refresh the page.', 'error');
+                finished = true;
+            })
+            .always(function() {
+                loading = false;
+                $sentinel.find('.loading-indicator').hide();
+                // Keep loading while the sentinel is still visible on tall screens
+                if (!finished && isVisible($sentinel[0])) {
+                    loadNextPage();
+                }
+            });
+    }
+
+    function isVisible(element) {
+        const rect = element.getBoundingClientRect();
+        return rect.top < window.innerHeight && rect.bottom >= 0;
+    }
+
+    if ('IntersectionObserver' in window) {
+        const observer = new IntersectionObserver(function(entries) {
+            if (entries.some(entry => entry.isIntersecting)) {
+                loadNextPage();
+            }
+        }, {rootMargin: '200px'});
+        observer.observe($sentinel[0]);
+    } else {
+        $(window).on('scroll', function() {
+            if (isVisible($sentinel[0])) {
+                loadNextPage();
+            }
+        });
+        loadNextPage();
+    }
+}
@@ -0,0 +1,72 @@
+/**
+ * Live dashboard counters and check-ins using Server-Sent Events
+ * Starts from the snapshot sent when the stream opens and applies the
+ * counter deltas of every check-in and check-out after that. The browser
+ * reconnects on its own and gets a fresh snapshot each time.
+ * Requires escapeHtml from employee_table.js.
+ */
+
+/**
+ * options.url      - the live feed endpoint
+ * options.list     - selector of a <ul> that new check-ins are prepended to
+ * options.maxItems - number of check-ins kept in the list (default 20)
+ *
+ * Counters are the elements with a data-live-counter attribute naming
+ * the counter they show (present_count, late_count or absent_count).
+ */
+function initLiveFeed(options) {
+    if (!window.EventSource) {
+        return;
+    }
+    const $list = $(options.list);
+    const maxItems = options.maxItems || 20;
+    const source = new EventSource(options.url);
+
+    function setCounter(name, value) {
+        $(`[data-live-counter="${name}"]`).text(value);
+    }
+
+    function applyDelta(delta) {
+        $.each(delta, function(name, change) {
+            const $counter = $(`[data-live-counter="${name}"]`);
+            if ($counter.length) {
+                $counter.text((parseInt($counter.first().text(), 10) || 0) + change);
+            }
+        });
+    }
+
+    function prependItem(data, label, badgeClass) {
+        $list.find('.live-feed-empty').remove();
+        $list.prepend(`<li class="list-group-item d-flex justify-content-between align-items-center">
+            <span><strong>${escapeHtml(data.name)}</strong>
+                <small class="text-muted">${escapeHtml(data.employee_id)} &middot; ${escapeHtml(data.department_display)}</small></span>
+            <span class="badge ${badgeClass}">${label} ${escapeHtml(data.time)}</span>
+        </li>`);
+        $list.children('li').slice(maxItems).remove();
+    }
+
+    source.addEventListener('snapshot', function(event) {
+        const data = JSON.parse(event.data);
+        setCounter('present_count', data.present_count);
+        setCounter('late_count', data.late_count);
+        setCounter('absent_count', data.absent_count);
+    });
+
+    source.addEventListener('check_in', function(event) {
+        const data = JSON.parse(event.data);
+        applyDelta(data.delta);
+        if (data.status === 'late') {
+            prependItem(data, 'Late', 'bg-warning');
+        } else {
+            prependItem(data, 'In', 'bg-success');
+        }
+    });
+
+    source.addEventListener('check_out', function(event) {
+        const data = JSON.parse(event.data);
+        applyDelta(data.delta);
+        prependItem(data, 'Out', 'bg-secondary');
+    });
+
+    return source;
+}